@@ -0,0 +1,113 @@
+"""Executa os benchmarks e compara resultados entre versões.
+
+Examples:
+    $ python -m benchmarks --output main.json
+    $ python -m benchmarks --output branch.json
+    $ python -m benchmarks compare main.json branch.json
+"""
+
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime
+from typing import Any
+
+import openiziai
+
+from .suites import bench_agent_prompt, bench_context, bench_train_data
+
+# Métricas em que um valor maior é melhor. Nas demais, menor é melhor.
+HIGHER_IS_BETTER = {'examples_per_second'}
+# Campos que identificam um resultado entre execuções.
+KEYS = ('name', 'n_batch', 'history_size')
+
+
+def run(quick: bool = False) -> dict[str, Any]:
+    """Executa todas as suites de benchmark."""
+    scale = 1 if quick else 10
+    latency = (0.001, 0.005) if quick else (0.01, 0.05)
+    history_sizes = [0, 10 * scale, 100 * scale]
+
+    results = [
+        *bench_train_data(50 * scale, [1, 4, 16], latency),
+        *bench_agent_prompt(100 * scale, history_sizes),
+        *bench_context([10 * scale, 100 * scale, 1000 * scale]),
+    ]
+
+    return {
+        'version': openiziai.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': datetime.now().isoformat(),
+        'results': results,
+    }
+
+
+def _key(result: dict[str, Any]) -> tuple:
+    return tuple(result.get(key) for key in KEYS)
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> list[str]:
+    """Lista as métricas que pioraram mais que `threshold` (relativo)."""
+    previous = {_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(_key(result))
+        if not old:
+            continue
+        for metric, value in result.items():
+            if metric in KEYS or not isinstance(value, (int, float)):
+                continue
+            if not old.get(metric):
+                continue
+            change = (value - old[metric]) / old[metric]
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > threshold:
+                regressions.append(
+                    f'{_key(result)} {metric}: {old[metric]:.6g} -> '
+                    f'{value:.6g} ({change:+.1%})'
+                )
+
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--output', help='Arquivo json dos resultados.')
+    parser.add_argument(
+        '--quick', action='store_true', help='Executa uma versão reduzida.'
+    )
+    subparsers = parser.add_subparsers(dest='command')
+    compare_parser = subparsers.add_parser(
+        'compare', help='Compara dois resultados.'
+    )
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        with open(args.current, encoding='utf-8') as file:
+            current = json.load(file)
+        regressions = compare(baseline, current, args.threshold)
+        for regression in regressions:
+            print(regression)
+        return 1 if regressions else 0
+
+    report = json.dumps(run(args.quick), indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(report)
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
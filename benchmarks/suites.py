@@ -0,0 +1,152 @@
+"""Benchmarks dos caminhos críticos do openiziai.
+
+Todos os benchmarks rodam offline com o `FakeClient`, de forma que medem
+apenas o overhead do openiziai somado à latência simulada.
+"""
+
+import contextlib
+import functools
+import pickle
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from openiziai.agents import Agent
+from openiziai.backends import FakeClient
+from openiziai.contexts import ContextHandler
+from openiziai.schemas import GPTModel, Message
+from openiziai.task import Task
+from openiziai.tools import TrainDataTool
+
+TASK = Task(
+    backstory='Assistente que responde dúvidas sobre o openiziai.',
+    short_backstory='Assistente do openiziai',
+    role='Suporte',
+    goal='Responder dúvidas sobre a biblioteca',
+)
+DATA = {'data': {'descricao': 'Biblioteca para criar agentes com LLMs.'}}
+
+
+def measure(func: Callable[[], Any]) -> tuple[float, int]:
+    """Executa `func` medindo o tempo e o pico de memória alocada.
+
+    A primeira execução aquece imports e caches e não é medida. O tempo é
+    medido na segunda execução e o pico de memória em uma terceira, já que
+    o `tracemalloc` deixa as alocações mais lentas.
+
+    Returns:
+        tuple[float, int]: Tempo em segundos e pico de memória em bytes.
+    """
+    func()
+
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def bench_train_data(
+    n_examples: int,
+    n_batches: Iterable[int],
+    latency: tuple[float, float],
+) -> list[dict[str, Any]]:
+    """Mede exemplos/s do `create_train_data` para cada `n_batch`."""
+    results = []
+    for n_batch in n_batches:
+        with tempfile.TemporaryDirectory() as tmp, contextlib.chdir(tmp):
+            tool = TrainDataTool(
+                client=FakeClient(latency=latency), data=DATA, task=TASK
+            )
+            elapsed, peak = measure(
+                functools.partial(tool.execute, n_examples, n_batch)
+            )
+
+        results.append({
+            'name': 'train_data',
+            'n_batch': n_batch,
+            'n_examples': n_examples,
+            'seconds': elapsed,
+            'examples_per_second': n_examples / elapsed,
+            'peak_memory_bytes': peak,
+        })
+
+    return results
+
+
+def bench_agent_prompt(
+    n_prompts: int, history_sizes: Iterable[int]
+) -> list[dict[str, Any]]:
+    """Mede o overhead por prompt do `Agent.prompt` sem latência de rede."""
+    agent = Agent(
+        client=FakeClient(), task=TASK, fine_tuned_model='ft:gpt-3.5-turbo'
+    )
+    results = []
+    for size in history_sizes:
+        history = [
+            Message(role='user' if i % 2 else 'assistant', content=f'Msg {i}')
+            for i in range(size)
+        ]
+
+        def run(history: list[Message] = history) -> None:
+            for _ in range(n_prompts):
+                agent.prompt('Como instalar?', history=history or None)
+
+        elapsed, peak = measure(run)
+        results.append({
+            'name': 'agent_prompt',
+            'history_size': size,
+            'n_prompts': n_prompts,
+            'seconds': elapsed,
+            'seconds_per_prompt': elapsed / n_prompts,
+            'peak_memory_bytes': peak,
+        })
+
+    return results
+
+
+def bench_context(history_sizes: Iterable[int]) -> list[dict[str, Any]]:
+    """Mede o tempo de salvar e carregar o contexto pelo tamanho do
+    histórico.
+    """
+    model = GPTModel(name='ft:gpt-3.5-turbo', task=TASK)
+    results = []
+    for size in history_sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            handler = ContextHandler(
+                max_context_length=10,
+                context_store=Path(tmp),
+                agent_model=model,
+            )
+            for i in range(size):
+                handler.add(Message(content=f'Mensagem {i}'))
+
+            save, save_peak = measure(handler.save)
+            file = Path(tmp) / f'context_{handler.context.id}.pkl'
+
+            def load(file: Path = file) -> None:
+                with open(file, 'rb') as f:
+                    pickle.load(f)
+
+            load_time, load_peak = measure(load)
+            size_bytes = file.stat().st_size
+
+        results.append({
+            'name': 'context',
+            'history_size': size,
+            'save_seconds': save,
+            'load_seconds': load_time,
+            'file_bytes': size_bytes,
+            'peak_memory_bytes': max(save_peak, load_peak),
+        })
+
+    return results
@@ -1,11 +1,15 @@
 """Módulo que define o principal Agente."""
 
+import functools
 from typing import Any, Optional, Self
 
-from openai import OpenAI
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 from pydantic.dataclasses import dataclass
 
+from openiziai.backends import LLMClient
+from openiziai.ledger import UsageLedger
+from openiziai.metrics import EventType, Hook, emit, timed, usage_fields
+from openiziai.rate_limit import RateLimiter
 from openiziai.schemas import GPTModel, Message
 from openiziai.task import Task
 
@@ -25,7 +29,7 @@ class PromptResponse:
 class Agent(BaseModel):
     """Classe que constrói o Agente especializado utilizando um modelo GPT."""
 
-    client: OpenAI = Field(description='Client da OpenAI.')
+    client: LLMClient = Field(description='Client da OpenAI.')
     model: Optional[GPTModel] = Field(
         default=None, description='A entidade do modelo fine tuned.'
     )
@@ -36,6 +40,18 @@ class Agent(BaseModel):
     task: Optional[Task] = Field(
         default=None, description='Task a ser executada pelo Agente.'
     )
+    rate_limiter: Optional[RateLimiter] = Field(
+        default=None,
+        description='Rate limiter compartilhado entre as requisições.',
+    )
+    hooks: list[Hook] = Field(
+        default_factory=list,
+        description='Hooks que recebem os eventos das requisições.',
+    )
+    ledger: Optional[UsageLedger] = Field(
+        default=None,
+        description='Ledger que registra o uso e aplica os limites.',
+    )
     _template: str
     _full_context: list[dict[str, Any]]
     _context: list[dict[str, Any]]
@@ -47,10 +63,18 @@ class Agent(BaseModel):
         """Cria um novo agente analisando e validando o input.
 
         Parameters:
-            client (OpenAI): Client da OpenAI.
+            client (LLMClient): Client da OpenAI ou outro backend que
+                implemente `LLMClient`.
             model (GPTModel): A entidade do modelo fine tuned.
             fine_tuned_model (str): Modelo que será utilizado no Agente.
             task (Task): Task a ser executada pelo Agente.
+            rate_limiter (RateLimiter | None): Rate limiter compartilhado
+                entre as requisições.
+            hooks (list[Hook]): Hooks chamados no início, fim e erro de cada
+                requisição.
+            ledger (UsageLedger | None): Registra o uso de tokens de cada
+                prompt. Prompts que ultrapassariam o limite do ledger são
+                recusados com `BudgetExceeded`.
 
         Examples:
             >>> from openai import OpenAI
@@ -150,11 +174,34 @@ class Agent(BaseModel):
         else:
             raise ValueError('`prompt` ou `history` precisam ser passados.')
 
-        result = self.client.chat.completions.create(
-            messages=messages,  # pyright: ignore
-            model=self._fine_tuned_model,
-            temperature=temperature,
-            max_tokens=max_tokens,
+        create = (
+            functools.partial(self.rate_limiter.chat_completion, self.client)
+            if self.rate_limiter
+            else self.client.chat.completions.create
+        )
+        if self.ledger is not None:
+            create = functools.partial(
+                self.ledger.chat_completion,
+                create,
+                task=self.model.task.role,  # pyright: ignore
+            )
+        emit(self.hooks, EventType.REQUEST_START)
+        try:
+            result, latency = timed(
+                create,
+                messages=messages,  # pyright: ignore
+                model=self._fine_tuned_model,
+                temperature=temperature,
+                max_tokens=max_tokens,
+            )
+        except Exception as e:
+            emit(self.hooks, EventType.REQUEST_ERROR, error=type(e).__name__)
+            raise
+        emit(
+            self.hooks,
+            EventType.REQUEST_END,
+            latency=latency,
+            **usage_fields(result),
         )
 
         response = PromptResponse(
@@ -0,0 +1,548 @@
+"""Backends de LLM aceitos pelo openiziai."""
+
+import contextlib
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import count
+from types import SimpleNamespace
+from typing import (
+    Any,
+    Callable,
+    Mapping,
+    Optional,
+    Protocol,
+    runtime_checkable,
+)
+
+from openai import (
+    APIStatusError,
+    AuthenticationError,
+    BadRequestError,
+    InternalServerError,
+    NotFoundError,
+    RateLimitError,
+)
+from openai.types import (
+    Batch,
+    BatchRequestCounts,
+    CompletionUsage,
+    FileObject,
+    Upload,
+)
+from openai.types.chat import ChatCompletion, ChatCompletionMessage
+from openai.types.chat.chat_completion import Choice
+from openai.types.fine_tuning import FineTuningJob, FineTuningJobEvent
+from openai.types.uploads import UploadPart
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from openiziai.utils import count_message_tokens
+
+FINE_TUNING_STATUSES = ('validating_files', 'queued', 'running', 'succeeded')
+BATCH_STATUSES = ('validating', 'in_progress', 'finalizing', 'completed')
+# Segundos até um upload em partes expirar, como na Uploads API.
+UPLOAD_TTL = 3600
+STATUS_ERRORS: dict[int, type[APIStatusError]] = {
+    400: BadRequestError,
+    401: AuthenticationError,
+    404: NotFoundError,
+    429: RateLimitError,
+    500: InternalServerError,
+}
+
+
+@runtime_checkable
+class LLMClient(Protocol):
+    """Interface mínima de um client de LLM.
+
+    Segue a interface do client da OpenAI: `chat.completions` para chat
+    completion, `files` para o upload de arquivos e `fine_tuning.jobs` para
+    os jobs de fine tuning. O próprio `openai.OpenAI` e o `FakeClient`
+    implementam essa interface. A Batch API (`TrainDataTool.execute_batch`)
+    também utiliza `batches`.
+    """
+
+    chat: Any
+    files: Any
+    fine_tuning: Any
+
+
+@dataclass
+class _FakeResponse:
+    """Resposta HTTP mínima usada nos erros e no `with_raw_response`."""
+
+    status_code: int = 200
+    headers: Mapping[str, str] = field(default_factory=dict)
+    request: Any = None
+    _parsed: Any = None
+
+    def parse(self) -> Any:
+        return self._parsed
+
+
+def _default_content(index: int, messages: list[dict[str, Any]]) -> str:
+    return json.dumps({
+        'prompt': f'Pergunta {index}',
+        'response': f'Resposta {index}',
+    })
+
+
+class FakeClient(BaseModel):
+    """Backend local e determinístico que simula a API da OpenAI.
+
+    Não faz nenhuma chamada de rede. A latência, a taxa de erros e o
+    `usage` das respostas seguem distribuições uniformes configuráveis e
+    reproduzíveis pela `seed`, permitindo medir o overhead do openiziai em
+    milhares de requisições por segundo.
+
+    Examples:
+        >>> client = FakeClient(latency=(0.05, 0.2), error_rate=0.01)
+        >>> tool = TrainDataTool(client=client, data=data, task=task)
+    """
+
+    latency: tuple[float, float] = Field(
+        default=(0.0, 0.0),
+        description='Intervalo da latência de cada requisição, em segundos.',
+    )
+    error_rate: float = Field(
+        default=0.0, ge=0, le=1, description='Probabilidade de erro.'
+    )
+    error_status: int = Field(
+        default=500, description='Status HTTP dos erros simulados.'
+    )
+    completion_tokens: tuple[int, int] = Field(
+        default=(50, 200),
+        description='Intervalo de tokens de cada resposta.',
+    )
+    content: Callable[[int, list[dict[str, Any]]], str] = Field(
+        default=_default_content,
+        description='Gera o conteúdo de cada resposta.',
+    )
+    seed: Optional[int] = Field(default=0, description='Semente do backend.')
+    _rng: random.Random = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _ids: Any = PrivateAttr(default_factory=count)
+    _files: dict[str, bytes] = PrivateAttr(default_factory=dict)
+    _jobs: dict[str, FineTuningJob] = PrivateAttr(default_factory=dict)
+    _batches: dict[str, Batch] = PrivateAttr(default_factory=dict)
+    _events: dict[str, list[FineTuningJobEvent]] = PrivateAttr(
+        default_factory=dict
+    )
+    _uploads: dict[str, Upload] = PrivateAttr(default_factory=dict)
+    _parts: dict[str, bytes] = PrivateAttr(default_factory=dict)
+    _usage: Counter[str] = PrivateAttr(default_factory=Counter)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, **data: Any) -> None:
+        """Cria um novo backend local.
+
+        Args:
+            latency (tuple[float, float]): Intervalo da latência de cada
+                requisição, em segundos. Padrão sem latência.
+            error_rate (float): Probabilidade de uma requisição falhar.
+                Padrão 0.
+            error_status (int): Status HTTP dos erros simulados. Padrão 500.
+            completion_tokens (tuple[int, int]): Intervalo de tokens de cada
+                resposta. Padrão (50, 200).
+            content (Callable): Recebe o índice da resposta e as mensagens e
+                retorna o conteúdo. Padrão um par prompt/response em json.
+            seed (int | None): Semente do backend. Padrão 0.
+        """
+        super().__init__(**data)
+        self._rng = random.Random(self.seed)
+
+    @property
+    def chat(self) -> SimpleNamespace:
+        """Recurso de chat completion."""
+        return SimpleNamespace(
+            completions=SimpleNamespace(
+                create=self._chat_completion,
+                with_raw_response=SimpleNamespace(
+                    create=self._raw_chat_completion
+                ),
+            )
+        )
+
+    @property
+    def files(self) -> SimpleNamespace:
+        """Recurso de arquivos."""
+        return SimpleNamespace(
+            create=self._create_file,
+            retrieve=self._retrieve_file,
+            with_streaming_response=SimpleNamespace(
+                content=self._stream_file_content
+            ),
+        )
+
+    @property
+    def uploads(self) -> SimpleNamespace:
+        """Recurso de uploads em partes."""
+        return SimpleNamespace(
+            create=self._create_upload,
+            parts=SimpleNamespace(create=self._create_upload_part),
+            complete=self._complete_upload,
+        )
+
+    @property
+    def fine_tuning(self) -> SimpleNamespace:
+        """Recurso de jobs de fine tuning."""
+        return SimpleNamespace(
+            jobs=SimpleNamespace(
+                create=self._create_job,
+                retrieve=self._retrieve_job,
+                list_events=self._list_events,
+            )
+        )
+
+    @property
+    def batches(self) -> SimpleNamespace:
+        """Recurso da Batch API."""
+        return SimpleNamespace(
+            create=self._create_batch, retrieve=self._retrieve_batch
+        )
+
+    @property
+    def usage(self) -> dict[str, int]:
+        """Total de requisições, respostas, erros e tokens simulados."""
+        return dict(self._usage)
+
+    def _next_id(self, prefix: str) -> str:
+        return f'{prefix}-{next(self._ids)}'
+
+    def _simulate(self) -> None:
+        """Aplica a latência e o erro sorteados para uma requisição."""
+        with self._lock:
+            self._usage['requests'] += 1
+            delay = self._rng.uniform(*self.latency)
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self._usage['errors'] += 1
+
+        if delay:
+            time.sleep(delay)
+        if failed:
+            error = STATUS_ERRORS.get(self.error_status, APIStatusError)
+            raise error(
+                'Erro simulado pelo FakeClient.',
+                response=_FakeResponse(status_code=self.error_status),
+                body=None,
+            )
+
+    def _chat_completion(
+        self,
+        *,
+        model: str,
+        messages: list[dict[str, Any]],
+        max_tokens: Optional[int] = None,
+        n: int = 1,
+        **kwargs: Any,
+    ) -> ChatCompletion:
+        self._simulate()
+        prompt_tokens = count_message_tokens(messages, model)
+        with self._lock:
+            start = self._usage['choices']
+            self._usage['choices'] += n
+            tokens = [
+                self._rng.randint(*self.completion_tokens) for _ in range(n)
+            ]
+        if max_tokens is not None:
+            tokens = [min(value, max_tokens) for value in tokens]
+
+        choices = [
+            Choice.model_construct(
+                index=i,
+                finish_reason='stop',
+                message=ChatCompletionMessage.model_construct(
+                    role='assistant',
+                    content=self.content(start + i, messages),
+                ),
+            )
+            for i in range(n)
+        ]
+        usage = CompletionUsage.model_construct(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=sum(tokens),
+            total_tokens=prompt_tokens + sum(tokens),
+        )
+        with self._lock:
+            self._usage['prompt_tokens'] += usage.prompt_tokens
+            self._usage['completion_tokens'] += usage.completion_tokens
+
+        return ChatCompletion.model_construct(
+            id=self._next_id('chatcmpl'),
+            object='chat.completion',
+            created=int(time.time()),
+            model=model,
+            choices=choices,
+            usage=usage,
+        )
+
+    def _raw_chat_completion(self, **kwargs: Any) -> _FakeResponse:
+        return _FakeResponse(_parsed=self._chat_completion(**kwargs))
+
+    def _create_file(self, *, file: Any, purpose: str) -> FileObject:
+        self._simulate()
+        name = getattr(file, 'name', 'file')
+        content = file.read() if hasattr(file, 'read') else bytes(file)
+        file_id = self._next_id('file')
+        self._files[file_id] = content
+        return FileObject.model_construct(
+            id=file_id,
+            bytes=len(content),
+            created_at=int(time.time()),
+            filename=str(name),
+            object='file',
+            purpose=purpose,
+            status='processed',
+        )
+
+    def _create_upload(
+        self, *, bytes: int, filename: str, mime_type: str, purpose: str
+    ) -> Upload:
+        self._simulate()
+        upload_id = self._next_id('upload')
+        self._uploads[upload_id] = Upload.model_construct(
+            id=upload_id,
+            bytes=bytes,
+            created_at=int(time.time()),
+            expires_at=int(time.time()) + UPLOAD_TTL,
+            filename=filename,
+            object='upload',
+            purpose=purpose,
+            status='pending',
+        )
+        return self._uploads[upload_id]
+
+    def _create_upload_part(self, upload_id: str, *, data: Any) -> UploadPart:
+        self._simulate()
+        upload = self._uploads.get(upload_id)
+        if upload is None or upload.status != 'pending':
+            raise STATUS_ERRORS[404](
+                f'Upload {upload_id} não encontrado ou já finalizado.',
+                response=_FakeResponse(status_code=404),
+                body=None,
+            )
+        part_id = self._next_id('part')
+        self._parts[part_id] = (
+            data.read() if hasattr(data, 'read') else bytes(data)
+        )
+        return UploadPart.model_construct(
+            id=part_id,
+            created_at=int(time.time()),
+            object='upload.part',
+            upload_id=upload_id,
+        )
+
+    def _complete_upload(
+        self, upload_id: str, *, part_ids: list[str]
+    ) -> Upload:
+        self._simulate()
+        upload = self._uploads[upload_id]
+        content = b''.join(self._parts.pop(part_id) for part_id in part_ids)
+        if len(content) != upload.bytes:
+            raise STATUS_ERRORS[400](
+                f'Upload com {len(content)} bytes, esperado {upload.bytes}.',
+                response=_FakeResponse(status_code=400),
+                body=None,
+            )
+        file_id = self._next_id('file')
+        self._files[file_id] = content
+        file = FileObject.model_construct(
+            id=file_id,
+            bytes=len(content),
+            created_at=int(time.time()),
+            filename=upload.filename,
+            object='file',
+            purpose=upload.purpose,
+            status='processed',
+        )
+        self._uploads[upload_id] = upload.model_copy(
+            update={'status': 'completed', 'file': file}
+        )
+        return self._uploads[upload_id]
+
+    def _retrieve_file(self, file_id: str) -> FileObject:
+        if file_id not in self._files:
+            raise NotFoundError(
+                f'Arquivo {file_id} não encontrado.',
+                response=_FakeResponse(status_code=404),
+                body=None,
+            )
+        return FileObject.model_construct(
+            id=file_id,
+            bytes=len(self._files[file_id]),
+            object='file',
+            status='processed',
+        )
+
+    def _stream_file_content(
+        self, file_id: str
+    ) -> contextlib.nullcontext[SimpleNamespace]:
+        """Retorna o conteúdo do arquivo como uma resposta em streaming."""
+        self._retrieve_file(file_id)
+        lines = self._files[file_id].decode('utf-8').splitlines()
+        return contextlib.nullcontext(
+            SimpleNamespace(iter_lines=lambda: iter(lines))
+        )
+
+    def _create_batch(
+        self,
+        *,
+        input_file_id: str,
+        endpoint: str,
+        completion_window: str,
+        **kwargs: Any,
+    ) -> Batch:
+        self._simulate()
+        self._retrieve_file(input_file_id)
+        batch_id = self._next_id('batch')
+        self._batches[batch_id] = Batch.model_construct(
+            id=batch_id,
+            object='batch',
+            completion_window=completion_window,
+            created_at=int(time.time()),
+            endpoint=endpoint,
+            input_file_id=input_file_id,
+            status=BATCH_STATUSES[0],
+            output_file_id=None,
+            error_file_id=None,
+            **kwargs,
+        )
+        return self._batches[batch_id]
+
+    def _retrieve_batch(self, batch_id: str) -> Batch:
+        """Retorna o batch, avançando um status a cada consulta.
+
+        As requisições do arquivo de input são executadas ao completar o
+        batch. As respostas vão para o arquivo de output e as falhas
+        simuladas para o arquivo de erros.
+        """
+        self._usage['batch_requests'] += 1
+        batch = self._batches[batch_id]
+        position = BATCH_STATUSES.index(batch.status)
+        if position < len(BATCH_STATUSES) - 1:
+            update: dict[str, Any] = {'status': BATCH_STATUSES[position + 1]}
+            if update['status'] == BATCH_STATUSES[-1]:
+                update.update(self._run_batch(batch))
+            batch = batch.model_copy(update=update)
+            self._batches[batch_id] = batch
+        return batch
+
+    def _run_batch(self, batch: Batch) -> dict[str, Any]:
+        outputs: list[str] = []
+        errors: list[str] = []
+        for line in self._files[batch.input_file_id].splitlines():
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            try:
+                completion = self._chat_completion(**request['body'])
+            except APIStatusError as error:
+                errors.append(
+                    json.dumps({
+                        'id': self._next_id('batch_req'),
+                        'custom_id': request['custom_id'],
+                        'response': {
+                            'status_code': error.status_code,
+                            'body': {'error': {'message': error.message}},
+                        },
+                        'error': None,
+                    })
+                )
+                continue
+            outputs.append(
+                json.dumps({
+                    'id': self._next_id('batch_req'),
+                    'custom_id': request['custom_id'],
+                    'response': {
+                        'status_code': 200,
+                        'body': completion.model_dump(mode='json'),
+                    },
+                    'error': None,
+                })
+            )
+
+        files = {}
+        for key, lines in (
+            ('output_file_id', outputs),
+            ('error_file_id', errors),
+        ):
+            if lines:
+                files[key] = self._next_id('file')
+                self._files[files[key]] = '\n'.join(lines).encode('utf-8')
+        return {
+            **files,
+            'completed_at': int(time.time()),
+            'request_counts': BatchRequestCounts(
+                completed=len(outputs),
+                failed=len(errors),
+                total=len(outputs) + len(errors),
+            ),
+        }
+
+    def _create_job(
+        self, *, training_file: str, model: str, **kwargs: Any
+    ) -> FineTuningJob:
+        self._simulate()
+        job_id = self._next_id('ftjob')
+        self._jobs[job_id] = FineTuningJob.model_construct(
+            id=job_id,
+            object='fine_tuning.job',
+            created_at=int(time.time()),
+            model=model,
+            training_file=training_file,
+            status=FINE_TUNING_STATUSES[0],
+            fine_tuned_model=None,
+            **kwargs,
+        )
+        self._add_event(job_id, f'Status: {FINE_TUNING_STATUSES[0]}')
+        return self._jobs[job_id]
+
+    def _add_event(self, job_id: str, message: str) -> None:
+        self._events.setdefault(job_id, []).append(
+            FineTuningJobEvent.model_construct(
+                id=self._next_id('ftevent'),
+                created_at=int(time.time()),
+                level='info',
+                message=message,
+                object='fine_tuning.job.event',
+            )
+        )
+
+    def _retrieve_job(self, job_id: str) -> FineTuningJob:
+        """Retorna o job, avançando um status a cada consulta."""
+        self._usage['job_requests'] += 1
+        job = self._jobs[job_id]
+        position = FINE_TUNING_STATUSES.index(job.status)
+        if position < len(FINE_TUNING_STATUSES) - 1:
+            status = FINE_TUNING_STATUSES[position + 1]
+            job = job.model_copy(
+                update={
+                    'status': status,
+                    'fine_tuned_model': (
+                        f'ft:{job.model}:openiziai::{job_id}'
+                        if status == FINE_TUNING_STATUSES[-1]
+                        else None
+                    ),
+                }
+            )
+            self._jobs[job_id] = job
+            self._add_event(job_id, f'Status: {status}')
+        return job
+
+    def _list_events(
+        self, job_id: str, *, after: Optional[str] = None, limit: int = 20
+    ) -> SimpleNamespace:
+        """Lista os eventos do job, do mais recente para o mais antigo."""
+        self._usage['job_requests'] += 1
+        events = self._events.get(job_id, [])[::-1]
+        if after is not None:
+            ids = [event.id for event in events]
+            events = events[ids.index(after) + 1 :]
+        return SimpleNamespace(
+            data=events[:limit], has_more=len(events) > limit
+        )
@@ -0,0 +1,194 @@
+"""Controle adaptativo da concorrência das requisições."""
+
+import math
+import time
+from typing import Optional
+
+import anyio
+from pydantic import (
+    BaseModel,
+    Field,
+    PositiveInt,
+    PrivateAttr,
+    model_validator,
+)
+from pydantic.dataclasses import dataclass
+
+from openiziai.metrics import Event, EventType
+
+# Erros que indicam sobrecarga da API e reduzem a concorrência.
+OVERLOAD_ERRORS = {'RateLimitError', 'APITimeoutError', 'TimeoutError'}
+
+
+@dataclass
+class ConcurrencyChange:
+    """Mudança no limite de requisições simultâneas."""
+
+    concurrency: int
+    reason: str
+    timestamp: float
+
+
+class AdaptiveConcurrency(BaseModel):
+    """Ajusta as requisições simultâneas com AIMD (additive increase,
+    multiplicative decrease).
+
+    Enquanto a latência está estável, o limite aumenta em `increase` a cada
+    rodada de requisições bem sucedidas em que alguma requisição esperou
+    pelo limite. Com a demanda abaixo do limite, aumentá-lo não mudaria
+    nada e ele é mantido. Em um erro 429, timeout ou pico de latência, o
+    limite é multiplicado por `decrease`. Recebe os eventos de requisição,
+    incluindo o `REQUEST_START`, como um hook e controla um
+    `anyio.CapacityLimiter`, de forma que pode ser usado por qualquer
+    fan-out de requisições no asyncio ou no trio.
+
+    Examples:
+        >>> concurrency = AdaptiveConcurrency(max_concurrency=32)
+        >>> tool = TrainDataTool(..., adaptive_concurrency=concurrency)
+        >>> tool.execute(n_examples=500, n_batch=32, max_concurrency=4)
+        >>> concurrency.concurrency
+        18
+    """
+
+    min_concurrency: PositiveInt = Field(
+        default=1, description='Mínimo de requisições simultâneas.'
+    )
+    max_concurrency: PositiveInt = Field(
+        default=64, description='Máximo de requisições simultâneas.'
+    )
+    increase: PositiveInt = Field(
+        default=1, description='Aumento do limite a cada rodada estável.'
+    )
+    decrease: float = Field(
+        default=0.5, gt=0, lt=1, description='Fator de redução do limite.'
+    )
+    latency_tolerance: float = Field(
+        default=2.0,
+        gt=1,
+        description='Latência, relativa à menor média, considerada pico.',
+    )
+    smoothing: float = Field(
+        default=0.2,
+        gt=0,
+        le=1,
+        description='Peso da última latência na média móvel exponencial.',
+    )
+    _limiter: Optional[anyio.CapacityLimiter] = PrivateAttr(default=None)
+    _latency: Optional[float] = PrivateAttr(default=None)
+    _baseline: float = PrivateAttr(default=math.inf)
+    _successes: int = PrivateAttr(default=0)
+    _demand: int = PrivateAttr(default=0)
+    _saturated: bool = PrivateAttr(default=False)
+    _hold: int = PrivateAttr(default=0)
+    _changes: list[ConcurrencyChange] = PrivateAttr(default_factory=list)
+
+    @model_validator(mode='after')
+    def min_must_not_exceed_max(self) -> 'AdaptiveConcurrency':
+        """Valida se `min_concurrency` é menor ou igual ao máximo."""
+        if self.min_concurrency > self.max_concurrency:
+            raise ValueError(
+                '`min_concurrency` deve ser menor ou igual a '
+                '`max_concurrency`.'
+            )
+        return self
+
+    def limiter(self, initial: int) -> anyio.CapacityLimiter:
+        """Cria o `CapacityLimiter` controlado, começando em `initial`."""
+        initial = min(max(initial, self.min_concurrency), self.max_concurrency)
+        self._limiter = anyio.CapacityLimiter(initial)
+        self._latency = None
+        self._baseline = math.inf
+        self._successes = 0
+        self._demand = 0
+        self._saturated = False
+        self._hold = 0
+        self._changes = [
+            ConcurrencyChange(
+                concurrency=initial, reason='start', timestamp=time.monotonic()
+            )
+        ]
+        return self._limiter
+
+    @property
+    def concurrency(self) -> Optional[int]:
+        """Limite atual de requisições simultâneas."""
+        return int(self._limiter.total_tokens) if self._limiter else None
+
+    @property
+    def changes(self) -> list[ConcurrencyChange]:
+        """Histórico das mudanças de limite da última execução."""
+        return list(self._changes)
+
+    def __call__(self, event: Event) -> None:
+        """Atualiza o limite a partir de um evento de requisição."""
+        if self._limiter is None:
+            return
+
+        if event.type == EventType.REQUEST_START:
+            # O evento é emitido antes de adquirir o limite: com mais
+            # requisições pendentes que o limite, alguma está esperando.
+            self._demand += 1
+            self._saturated |= self._demand > self.concurrency
+            return
+
+        if event.type in (EventType.REQUEST_END, EventType.REQUEST_ERROR):
+            self._demand = max(self._demand - 1, 0)
+
+        if event.type == EventType.REQUEST_END and event.latency is not None:
+            self._on_success(event.latency)
+        elif (
+            event.type == EventType.REQUEST_ERROR
+            and event.error in OVERLOAD_ERRORS
+        ):
+            self._on_overload(event.error)
+
+    def _on_success(self, latency: float) -> None:
+        self._latency = (
+            latency
+            if self._latency is None
+            else self.smoothing * latency
+            + (1 - self.smoothing) * self._latency
+        )
+        self._baseline = min(self._baseline, self._latency)
+        if self._hold:
+            self._hold -= 1
+            return
+
+        if self._latency > self.latency_tolerance * self._baseline:
+            self._on_overload('latency')
+            return
+
+        self._successes += 1
+        if self._successes >= self.concurrency:
+            if self._saturated:
+                self._set(self.concurrency + self.increase, 'increase')
+            self._successes = 0
+            self._saturated = self._demand > self.concurrency
+
+    def _on_overload(self, reason: str) -> None:
+        if self._hold:
+            # As requisições em andamento foram feitas com o limite
+            # anterior e não devem reduzir o limite de novo.
+            self._hold -= 1
+            return
+
+        self._set(math.floor(self.concurrency * self.decrease), reason)
+        self._hold = self._limiter.borrowed_tokens
+        self._latency = None
+
+    def _set(self, concurrency: int, reason: str) -> None:
+        concurrency = min(
+            max(concurrency, self.min_concurrency), self.max_concurrency
+        )
+        self._successes = 0
+        if concurrency == self.concurrency:
+            return
+
+        self._limiter.total_tokens = concurrency
+        self._changes.append(
+            ConcurrencyChange(
+                concurrency=concurrency,
+                reason=reason,
+                timestamp=time.monotonic(),
+            )
+        )
@@ -1,20 +1,31 @@
 """Disponibiliza o fine tuning do modelo."""
 
+import time
 from enum import Enum
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 
-from openai import OpenAI
+import anyio
 from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    NonNegativeFloat,
+    PositiveInt,
     PrivateAttr,
     field_validator,
 )
 
+from openiziai.backends import LLMClient
 from openiziai.schemas import GPTModel
 from openiziai.task import Task
+from openiziai.uploads import (
+    PART_SIZE,
+    UploadCache,
+    file_sha256,
+    multipart_upload,
+)
+from openiziai.validation import ValidationReport, validate_train_file
 
 
 class JobStatus(Enum):
@@ -28,12 +39,16 @@ class JobStatus(Enum):
     CANCELLED = 'cancelled'
 
 
+FINAL_STATUSES = {JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED}
+EVENTS_PAGE_SIZE = 100
+
+
 class FineTuning(BaseModel):
     """Classe que gerencia os métodos necessários para construir um modelo de
     fine tuning.
     """
 
-    client: OpenAI = Field(description='Client da OpenAI.')
+    client: LLMClient = Field(description='Client da OpenAI.')
     train_file: Path | str = Field(
         description='Caminho até o arquivo de treino.'
     )
@@ -43,10 +58,31 @@ class FineTuning(BaseModel):
     base_model: str = Field(
         default='gpt-3.5-turbo', description='Modelo base que será refinado.'
     )
+    hyperparameters: Optional[dict[str, Any]] = Field(
+        default=None,
+        description='Hiperparâmetros do job, como `n_epochs`.',
+    )
+    multipart_threshold: PositiveInt = Field(
+        default=PART_SIZE,
+        description='Tamanho a partir do qual o arquivo é enviado em partes.',
+    )
+    upload_cache: Optional[UploadCache] = Field(
+        default=None,
+        description='Cache dos arquivos já enviados para a OpenAI.',
+    )
+    cache_ttl: NonNegativeFloat = Field(
+        default=5.0,
+        description='Segundos em que o estado do job fica em cache.',
+    )
     _file_id: str = PrivateAttr(default=None)
     _job_id: str = PrivateAttr(default=None)
     _job_status: JobStatus = PrivateAttr(default=None)
     _model: GPTModel = PrivateAttr(default=None)
+    _report: Optional[ValidationReport] = PrivateAttr(default=None)
+    _job: Any = PrivateAttr(default=None)
+    _job_fetched_at: float = PrivateAttr(default=0.0)
+    _last_event_id: Optional[str] = PrivateAttr(default=None)
+    _events: list[Any] = PrivateAttr(default_factory=list)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -54,10 +90,21 @@ class FineTuning(BaseModel):
         """Cria um novo fine tuning analisando e validando o input.
 
         Args:
-            client (OpenAI): Client da OpenAI.
+            client (LLMClient): Client da OpenAI ou outro backend que
+                implemente `LLMClient`.
             train_file (Path|str): Caminho até o arquivo de treino.
             task (Task): Task em que o modelo deve se especializar.
             base_model (str): Modelo base que será refinado.
+            hyperparameters (dict | None): Hiperparâmetros do job, como
+                `n_epochs`, `batch_size` e `learning_rate_multiplier`.
+            multipart_threshold (int): Tamanho, em bytes, a partir do qual o
+                arquivo é enviado em partes. Padrão 64MB.
+            upload_cache (UploadCache | None): Cache dos arquivos já
+                enviados. Um arquivo com o mesmo conteúdo de um envio
+                anterior ainda válido não é enviado novamente.
+            cache_ttl (float): Segundos em que o estado do job fica em cache
+                entre as leituras de `status` e `model`. Jobs finalizados
+                não são consultados novamente. Padrão 5.
         """
         super().__init__(**data)
 
@@ -76,12 +123,84 @@ class FineTuning(BaseModel):
 
         return v
 
-    def upload_file_to_openai(self) -> 'FineTuning':
-        """Envia o arquivo de treino para a plataforma da OpenAI."""
-        self._file_id = self.client.files.create(
-            file=open(self.train_file, 'rb'), purpose='fine-tune'
-        ).id
+    def validate_file(
+        self, max_tokens: Optional[int] = None
+    ) -> ValidationReport:
+        """Valida o arquivo de treino sem enviá-lo para a OpenAI.
+
+        Lê o arquivo uma única vez, verificando o formato de chat de cada
+        exemplo e contando os seus tokens com o `base_model`.
+
+        Args:
+            max_tokens (int | None): Máximo de tokens por exemplo. Padrão o
+                limite do `base_model`.
 
+        Returns:
+            ValidationReport: Tokens, distribuição dos tamanhos e linhas
+                inválidas.
+        """
+        self._report = validate_train_file(
+            self.train_file, self.base_model, max_tokens
+        )
+        return self._report
+
+    @property
+    def report(self) -> Optional[ValidationReport]:
+        """Resultado da última validação do arquivo de treino."""
+        return self._report
+
+    def upload_file_to_openai(
+        self, validate: bool = True, max_workers: int = 4
+    ) -> 'FineTuning':
+        """Envia o arquivo de treino para a plataforma da OpenAI.
+
+        Arquivos maiores que `multipart_threshold` são enviados em partes
+        paralelas pela Uploads API, com retry por parte e retomada de um
+        upload interrompido. Com `upload_cache`, arquivos já enviados não são
+        enviados novamente.
+
+        Args:
+            validate (bool): Se o arquivo deve ser validado antes do envio.
+                Padrão True.
+            max_workers (int): Partes enviadas simultaneamente no upload em
+                partes. Padrão 4.
+
+        Raises:
+            ValueError: Se `validate` e o arquivo possuir linhas inválidas.
+        """
+        if validate and not (report := self.validate_file()).is_valid:
+            raise ValueError(
+                f'Arquivo de treino inválido: {len(report.bad_lines)} de '
+                f'{report.n_examples} exemplos inválidos. Veja `.report`.'
+            )
+
+        train_file = (
+            Path(self.train_file)
+            if isinstance(self.train_file, str)
+            else self.train_file
+        )
+        size = train_file.stat().st_size
+        digest = None
+        if self.upload_cache is not None:
+            digest = file_sha256(train_file)
+            if file_id := self.upload_cache.get(self.client, digest):
+                self._file_id = file_id
+                return self
+
+        if size > self.multipart_threshold:
+            self._file_id = multipart_upload(
+                self.client, train_file, max_workers=max_workers
+            )
+        else:
+            with open(self.train_file, 'rb') as file:
+                self._file_id = self.client.files.create(
+                    file=file, purpose='fine-tune'
+                ).id
+
+        if digest is not None:
+            self.upload_cache.put(  # pyright: ignore
+                digest, self._file_id, size
+            )
         return self
 
     @property
@@ -98,10 +217,19 @@ class FineTuning(BaseModel):
         if not file_id:
             return None
 
+        kwargs = (
+            {'hyperparameters': self.hyperparameters}
+            if self.hyperparameters
+            else {}
+        )
         job = self.client.fine_tuning.jobs.create(
-            training_file=file_id, model=self.base_model
+            training_file=file_id, model=self.base_model, **kwargs
         )
         self._job_id = job.id
+        self._job = None
+        self._job_status = None
+        self._last_event_id = None
+        self._events = []
         print(
             f'Fine tuning started: {self._job_id}.',
             'Veja o status com `.status`.',
@@ -124,12 +252,176 @@ class FineTuning(BaseModel):
             print('Nenhum fine tuning foi iniciado.')
             return None
 
-        if self._job_status != JobStatus.COMPLETED:
-            _job_status = self.client.fine_tuning.jobs.retrieve(job_id).status
-            self._job_status = JobStatus(_job_status)
-
+        self._retrieve_job()
         return self._job_status.name
 
+    def _retrieve_job(self, refresh: bool = False) -> Any:
+        """Busca o job, usando o cache enquanto não expirar.
+
+        Jobs em um status final não são consultados novamente.
+        """
+        expired = time.monotonic() - self._job_fetched_at >= self.cache_ttl
+        if self._job is None or (
+            self._job_status not in FINAL_STATUSES and (refresh or expired)
+        ):
+            self._job = self.client.fine_tuning.jobs.retrieve(self._job_id)
+            self._job_fetched_at = time.monotonic()
+            self._job_status = JobStatus(self._job.status)
+
+        return self._job
+
+    def _new_events(self) -> list[Any]:
+        """Busca apenas os eventos do job criados desde a última consulta.
+
+        A API retorna os eventos do mais recente para o mais antigo, então as
+        páginas são percorridas com o cursor `after` até o último evento já
+        recebido.
+        """
+        events: list[Any] = []
+        after = None
+        while True:
+            kwargs = {'after': after} if after else {}
+            page = self.client.fine_tuning.jobs.list_events(
+                self._job_id, limit=EVENTS_PAGE_SIZE, **kwargs
+            )
+            ids = [event.id for event in page.data]
+            if self._last_event_id in ids:
+                events.extend(page.data[: ids.index(self._last_event_id)])
+                break
+            events.extend(page.data)
+            if not page.has_more or not ids:
+                break
+            after = ids[-1]
+
+        if events:
+            self._last_event_id = events[0].id
+        events.reverse()
+        self._events.extend(events)
+        return events
+
+    def poll(
+        self,
+        on_status: Optional[Callable[[str, str], Any]] = None,
+        on_event: Optional[Callable[[Any], Any]] = None,
+    ) -> bool:
+        """Consulta o job e os novos eventos uma vez, chamando os callbacks.
+
+        Returns:
+            bool: Se o status do job mudou.
+        """
+        previous = self._job_status
+        self._retrieve_job(refresh=True)
+        events = self._new_events()
+        for event in events:
+            if on_event:
+                on_event(event)
+        changed = self._job_status != previous
+        if changed and on_status:
+            on_status(
+                previous.name if previous else None, self._job_status.name
+            )
+
+        return changed
+
+    def wait(  # noqa
+        self,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        on_status: Optional[Callable[[str, str], Any]] = None,
+        on_event: Optional[Callable[[Any], Any]] = None,
+    ) -> Optional[GPTModel]:
+        """Aguarda o job de fine tuning terminar.
+
+        O intervalo entre as consultas dobra enquanto o status não muda, até
+        `max_poll_interval`, e volta ao início a cada mudança de status. Novos
+        eventos, como os de cada step do treino, não reiniciam o intervalo. A
+        cada consulta, apenas os eventos novos são buscados.
+
+        Args:
+            poll_interval (float): Intervalo inicial entre as consultas, em
+                segundos.
+            max_poll_interval (float): Intervalo máximo entre as consultas.
+            timeout (float | None): Tempo máximo de espera, em segundos.
+            on_status (Callable | None): Chamado com o status anterior e o
+                novo a cada mudança de status.
+            on_event (Callable | None): Chamado com cada novo evento do job.
+
+        Returns:
+            GPTModel | None: Modelo criado ou None se o job falhou.
+        """
+        if not self.job_id:
+            return None
+
+        start = time.monotonic()
+        interval = poll_interval
+        while True:
+            changed = self.poll(on_status, on_event)
+            if self._job_status in FINAL_STATUSES:
+                return self.model
+
+            self._check_timeout(start, timeout)
+            interval = (
+                poll_interval
+                if changed
+                else min(interval * 2, max_poll_interval)
+            )
+            time.sleep(interval)
+
+    async def await_job(  # noqa
+        self,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 60.0,
+        timeout: Optional[float] = None,
+        on_status: Optional[Callable[[str, str], Any]] = None,
+        on_event: Optional[Callable[[Any], Any]] = None,
+    ) -> Optional[GPTModel]:
+        """Versão assíncrona de `wait`, compatível com asyncio e trio.
+
+        As consultas rodam em uma thread, sem bloquear o event loop.
+
+        Returns:
+            GPTModel | None: Modelo criado ou None se o job falhou.
+        """
+        if not self.job_id:
+            return None
+
+        start = time.monotonic()
+        interval = poll_interval
+        while True:
+            changed = await anyio.to_thread.run_sync(
+                self.poll, on_status, on_event
+            )
+            if self._job_status in FINAL_STATUSES:
+                return self.model
+
+            self._check_timeout(start, timeout)
+            interval = (
+                poll_interval
+                if changed
+                else min(interval * 2, max_poll_interval)
+            )
+            await anyio.sleep(interval)
+
+    @property
+    def finished(self) -> bool:
+        """Se o job terminou, segundo a última consulta."""
+        return self._job_status in FINAL_STATUSES
+
+    def _check_timeout(self, start: float, timeout: Optional[float]) -> None:
+        if timeout is not None and time.monotonic() - start > timeout:
+            raise TimeoutError(
+                f'Job {self._job_id} não terminou em {timeout}s. '
+                f'Status: {self._job_status.name}'
+            )
+
+    @property
+    def events(self) -> list[Any]:
+        """Eventos do job recebidos por `wait`, do mais antigo ao mais
+        recente.
+        """
+        return list(self._events)
+
     @property
     def model(self) -> Optional[GPTModel]:
         """Modelo criado do fine tuning."""
@@ -141,9 +433,7 @@ class FineTuning(BaseModel):
             print('Nenhum fine tuning foi iniciado.')
             return None
 
-        model_name = self.client.fine_tuning.jobs.retrieve(
-            job_id
-        ).fine_tuned_model
+        model_name = self._retrieve_job().fine_tuned_model
         if not model_name:
             print(f'Modelo não disponível. Status: {self.status}')
             return None
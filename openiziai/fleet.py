@@ -0,0 +1,265 @@
+"""Execução de vários fine tunings simultâneos."""
+
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+from openai import APIError, RateLimitError
+from pydantic import BaseModel, ConfigDict, Field, PositiveInt
+from pydantic.dataclasses import dataclass
+
+from openiziai.backends import LLMClient
+from openiziai.fine_tuning import FineTuning
+from openiziai.schemas import GPTModel
+from openiziai.task import Task
+from openiziai.uploads import UploadCache
+
+
+class FineTuningSpec(BaseModel):
+    """Descrição de um fine tuning da frota."""
+
+    train_file: Path | str = Field(
+        description='Caminho até o arquivo de treino.'
+    )
+    task: Task = Field(
+        description='Task em que o modelo deve se especializar.'
+    )
+    base_model: str = Field(
+        default='gpt-3.5-turbo', description='Modelo base que será refinado.'
+    )
+    hyperparameters: Optional[dict[str, Any]] = Field(
+        default=None, description='Hiperparâmetros do job.'
+    )
+    name: Optional[str] = Field(
+        default=None, description='Nome do fine tuning nos resultados.'
+    )
+
+
+@dataclass
+class FleetResult:
+    """Resultado de um fine tuning da frota.
+
+    `model` é None quando o envio, o início ou o job falharam. Nesse caso,
+    `error` descreve a falha ou `status` contém o status final do job.
+    """
+
+    spec: FineTuningSpec
+    model: Optional[GPTModel] = None
+    status: Optional[str] = None
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass(config=ConfigDict(arbitrary_types_allowed=True))
+class _Job:
+    """Estado das consultas de um job em execução."""
+
+    spec: FineTuningSpec
+    fine_tuning: FineTuning
+    interval: float
+    due: float
+    failures: int = 0
+
+
+class FineTuningFleet(BaseModel):
+    """Agenda vários fine tunings respeitando os limites da organização.
+
+    Os arquivos são enviados por um pool de `max_uploads` threads e os jobs
+    são iniciados à medida que os envios terminam, com no máximo `max_jobs`
+    jobs ativos. O excedente fica em uma fila e, se a API recusar um job por
+    limite de jobs ativos, o limite é reduzido para os jobs em execução: cada
+    job que termina libera uma vaga e o limite só volta a subir, um job por
+    vez, após uma espera. Todos os jobs são acompanhados por um único loop,
+    em que cada job é consultado com o mesmo backoff de `FineTuning.wait`.
+    Erros de uma consulta são refeitos nas próximas e o job só é abandonado
+    após `max_poll_failures` erros seguidos.
+
+    Examples:
+        >>> fleet = FineTuningFleet(client=client, max_jobs=3)
+        >>> specs = [
+        ...     FineTuningSpec(
+        ...         train_file=file, task=task, hyperparameters={'n_epochs': n}
+        ...     )
+        ...     for n in (2, 3, 4)
+        ... ]
+        >>> for result in fleet.run(specs):
+        ...     print(result.spec.hyperparameters, result.model)
+    """
+
+    client: LLMClient = Field(description='Client da OpenAI.')
+    max_uploads: PositiveInt = Field(
+        default=4, description='Arquivos enviados simultaneamente.'
+    )
+    max_jobs: PositiveInt = Field(
+        default=3, description='Máximo de jobs ativos na organização.'
+    )
+    poll_interval: float = Field(
+        default=10.0, gt=0, description='Intervalo inicial das consultas.'
+    )
+    max_poll_interval: float = Field(
+        default=120.0, gt=0, description='Intervalo máximo das consultas.'
+    )
+    max_poll_failures: PositiveInt = Field(
+        default=5,
+        description='Erros seguidos nas consultas até abandonar um job.',
+    )
+    upload_cache: Optional[UploadCache] = Field(
+        default=None,
+        description='Cache dos arquivos já enviados para a OpenAI.',
+    )
+    on_status: Optional[Callable[[FineTuningSpec, str, str], Any]] = Field(
+        default=None,
+        description='Chamado a cada mudança de status de um job.',
+    )
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def _fine_tuning(self, spec: FineTuningSpec) -> FineTuning:
+        return FineTuning(
+            client=self.client,
+            train_file=spec.train_file,
+            task=spec.task,
+            base_model=spec.base_model,
+            hyperparameters=spec.hyperparameters,
+            upload_cache=self.upload_cache,
+        )
+
+    def _upload(self, spec: FineTuningSpec) -> FineTuning:
+        return self._fine_tuning(spec).upload_file_to_openai()
+
+    def _callback(self, spec: FineTuningSpec) -> Optional[Callable]:
+        if self.on_status is None:
+            return None
+        return lambda old, new: self.on_status(spec, old, new)  # pyright: ignore
+
+    def run(self, specs: Iterable[FineTuningSpec]) -> Iterator[FleetResult]:  # noqa
+        """Executa os fine tunings, retornando cada resultado ao terminar.
+
+        Args:
+            specs (Iterable[FineTuningSpec]): Fine tunings que serão
+                executados.
+
+        Yields:
+            FleetResult: Resultado de cada fine tuning, na ordem em que
+                terminam.
+        """
+        ready: deque[tuple[FineTuningSpec, FineTuning]] = deque()
+        running: dict[str, _Job] = {}
+        limit = self.max_jobs
+        # Após um `RateLimitError`, o limite só sobe depois de `probe_at`.
+        probe_at = 0.0
+        probe_delay = self.poll_interval
+
+        with ThreadPoolExecutor(max_workers=self.max_uploads) as executor:
+            uploads: dict[Future, FineTuningSpec] = {
+                executor.submit(self._upload, spec): spec for spec in specs
+            }
+            while uploads or ready or running:
+                for future in [f for f in uploads if f.done()]:
+                    spec = uploads.pop(future)
+                    try:
+                        ready.append((spec, future.result()))
+                    except Exception as e:
+                        yield FleetResult(spec=spec, error=str(e))
+
+                now = time.monotonic()
+                if (
+                    ready
+                    and len(running) >= limit
+                    and limit < self.max_jobs
+                    and now >= probe_at
+                ):
+                    # Verifica se a organização já aceita mais um job.
+                    limit += 1
+
+                while ready and len(running) < limit:
+                    spec, fine_tuning = ready[0]
+                    try:
+                        fine_tuning.start()
+                    except RateLimitError:
+                        # A organização atingiu o limite de jobs ativos.
+                        limit = len(running)
+                        probe_at = now + probe_delay
+                        probe_delay = min(
+                            probe_delay * 2, self.max_poll_interval
+                        )
+                        break
+                    except Exception as e:
+                        ready.popleft()
+                        yield FleetResult(spec=spec, error=str(e))
+                        continue
+                    ready.popleft()
+                    running[fine_tuning.job_id] = _Job(  # pyright: ignore
+                        spec=spec,
+                        fine_tuning=fine_tuning,
+                        interval=self.poll_interval,
+                        due=now,
+                    )
+
+                for job_id, job in list(running.items()):
+                    if job.due > time.monotonic():
+                        continue
+
+                    try:
+                        changed = job.fine_tuning.poll(
+                            self._callback(job.spec)
+                        )
+                    except APIError as e:
+                        job.failures += 1
+                        if job.failures < self.max_poll_failures:
+                            changed = False
+                        else:
+                            del running[job_id]
+                            yield FleetResult(
+                                spec=job.spec, job_id=job_id, error=str(e)
+                            )
+                            continue
+                    else:
+                        job.failures = 0
+
+                    if job.fine_tuning.finished:
+                        del running[job_id]
+                        yield FleetResult(
+                            spec=job.spec,
+                            model=job.fine_tuning.model,
+                            status=job.fine_tuning.status,
+                            job_id=job_id,
+                        )
+                        continue
+
+                    job.interval = (
+                        self.poll_interval
+                        if changed
+                        else min(job.interval * 2, self.max_poll_interval)
+                    )
+                    job.due = time.monotonic() + job.interval
+
+                if not (uploads or ready or running):
+                    break
+                self._sleep(uploads, ready, running, limit, probe_at)
+
+    def _sleep(  # noqa
+        self,
+        uploads: dict[Future, FineTuningSpec],
+        ready: deque,
+        running: dict[str, _Job],
+        limit: int,
+        probe_at: float,
+    ) -> None:
+        """Dorme até a próxima consulta, início de job ou fim de um envio."""
+        wake = [job.due for job in running.values()]
+        if ready and limit < self.max_jobs:
+            wake.append(probe_at)
+        timeout = max(min(wake) - time.monotonic(), 0.0) if wake else None
+        if uploads:
+            # Acorda assim que algum envio terminar.
+            wait(uploads, timeout=timeout, return_when=FIRST_COMPLETED)
+        elif timeout:
+            time.sleep(timeout)
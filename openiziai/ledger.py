@@ -0,0 +1,276 @@
+"""Registro do uso de tokens e limites de orçamento."""
+
+import json
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+from pydantic import (
+    BaseModel,
+    Field,
+    PositiveFloat,
+    PositiveInt,
+    PrivateAttr,
+)
+from pydantic.dataclasses import dataclass
+
+from openiziai.metrics import usage_fields
+from openiziai.pricing import estimate_cost
+from openiziai.utils import count_message_tokens
+
+# Campos usados para agrupar o uso.
+GROUPS = ('model', 'task', 'job', 'session')
+
+
+class BudgetExceeded(Exception):
+    """O limite de tokens ou de custo do `UsageLedger` foi atingido."""
+
+
+@dataclass
+class UsageRecord:
+    """Uso de tokens de uma requisição."""
+
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    cost: float
+    session: str
+    task: Optional[str] = None
+    job: Optional[str] = None
+    timestamp: float = Field(default_factory=time.time)
+
+
+@dataclass
+class Reservation:
+    """Tokens e custo estimados reservados para uma requisição."""
+
+    tokens: int
+    cost: float
+
+
+class UsageLedger(BaseModel):
+    """Registra o uso de tokens por modelo, task, job e sessão.
+
+    Os registros são gravados em um arquivo JSONL apenas com append e os
+    totais são mantidos em memória, de forma que registrar uma requisição é
+    O(1) e pode ser feito por várias threads. Ao abrir um arquivo existente,
+    os totais das execuções anteriores são carregados e contam para os
+    limites.
+
+    Antes de cada requisição, os tokens e o custo estimados são reservados.
+    Se a reserva ultrapassar `max_tokens` ou `max_cost`, a requisição é
+    recusada com `BudgetExceeded`, mesmo com outras requisições em
+    andamento. Com `max_cost`, requisições de modelos sem preço conhecido
+    também são recusadas, a menos que o preço seja informado em `prices`.
+    """
+
+    path: Optional[Path] = Field(
+        default=None, description='Arquivo JSONL dos registros.'
+    )
+    max_tokens: Optional[PositiveInt] = Field(
+        default=None, description='Limite de tokens.'
+    )
+    max_cost: Optional[PositiveFloat] = Field(
+        default=None, description='Limite de custo, em USD.'
+    )
+    prices: dict[str, tuple[float, float]] = Field(
+        default_factory=dict,
+        description='Preços, em USD por 1M de tokens, de outros modelos.',
+    )
+    session: str = Field(
+        default_factory=lambda: f'session-{uuid4()}',
+        description='Sessão dos novos registros.',
+    )
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _totals: dict[tuple, Counter[str]] = PrivateAttr(default_factory=dict)
+    _used: Counter[str] = PrivateAttr(default_factory=Counter)
+    _reserved: Counter[str] = PrivateAttr(default_factory=Counter)
+
+    def __init__(self, **data: Any) -> None:
+        """Cria um novo ledger, carregando os registros de `path`.
+
+        Args:
+            path (Path | None): Arquivo JSONL dos registros. Sem arquivo, o
+                uso é mantido apenas em memória.
+            max_tokens (int | None): Limite de tokens (prompt + completion).
+            max_cost (float | None): Limite de custo, em USD, estimado pelos
+                preços de `openiziai.pricing`.
+            prices (dict): Preços (prompt, completion), em USD por 1M de
+                tokens, de modelos fora de `openiziai.pricing`, como
+                `{'ft:gpt-4o-mini:org::abc': (0.30, 1.20)}`.
+            session (str): Sessão dos novos registros. Padrão uma sessão
+                nova.
+        """
+        super().__init__(**data)
+        if self.path and self.path.exists():
+            with open(self.path, encoding='utf-8') as file:
+                for line in file:
+                    if line.strip():
+                        self._add(UsageRecord(**json.loads(line)))
+
+    def _add(self, record: UsageRecord) -> None:
+        key = tuple(getattr(record, group) for group in GROUPS)
+        totals = self._totals.setdefault(key, Counter())
+        for counter in (totals, self._used):
+            counter['requests'] += 1
+            counter['prompt_tokens'] += record.prompt_tokens
+            counter['completion_tokens'] += record.completion_tokens
+            counter['cost'] += record.cost
+
+    def _cost(
+        self, model: str, prompt_tokens: int, completion_tokens: int
+    ) -> Optional[float]:
+        return estimate_cost(
+            model, prompt_tokens, completion_tokens, self.prices.get(model)
+        )
+
+    def _exceeds(self, tokens: int, cost: float) -> bool:
+        used_tokens = (
+            self._used['prompt_tokens'] + self._used['completion_tokens']
+        )
+        return bool(
+            self.max_tokens
+            and used_tokens + self._reserved['tokens'] + tokens
+            > self.max_tokens
+        ) or bool(
+            self.max_cost
+            and self._used['cost'] + self._reserved['cost'] + cost
+            > self.max_cost
+        )
+
+    def reserve(
+        self, model: str, prompt_tokens: int, completion_tokens: int
+    ) -> Reservation:
+        """Reserva o uso estimado de uma requisição.
+
+        Raises:
+            BudgetExceeded: Se a reserva ultrapassar algum limite ou se há
+                `max_cost` e o preço do modelo não é conhecido.
+        """
+        cost = self._cost(model, prompt_tokens, completion_tokens)
+        if cost is None and self.max_cost:
+            raise BudgetExceeded(
+                f'Preço do modelo {model} desconhecido, `max_cost` não pode '
+                'ser aplicado. Informe o preço em `prices`.'
+            )
+        reservation = Reservation(
+            tokens=prompt_tokens + completion_tokens, cost=cost or 0.0
+        )
+        with self._lock:
+            if self._exceeds(reservation.tokens, reservation.cost):
+                raise BudgetExceeded(
+                    'Limite de orçamento atingido. Usados '
+                    f'{self.total_tokens} tokens (limite {self.max_tokens}) '
+                    f'e US$ {self.total_cost:.4f} (limite {self.max_cost}).'
+                )
+            self._reserved['tokens'] += reservation.tokens
+            self._reserved['cost'] += reservation.cost
+
+        return reservation
+
+    def release(self, reservation: Reservation) -> None:
+        """Libera uma reserva."""
+        with self._lock:
+            self._reserved['tokens'] -= reservation.tokens
+            self._reserved['cost'] -= reservation.cost
+
+    def record(  # noqa
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        task: Optional[str] = None,
+        job: Optional[str] = None,
+        reservation: Optional[Reservation] = None,
+    ) -> UsageRecord:
+        """Registra o uso de uma requisição, liberando a sua reserva.
+
+        O custo de modelos sem preço conhecido é registrado como zero. Com
+        `max_cost`, essas requisições já são recusadas por `reserve`.
+        """
+        record = UsageRecord(
+            model=model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost=self._cost(model, prompt_tokens, completion_tokens) or 0.0,
+            session=self.session,
+            task=task,
+            job=job,
+        )
+        line = json.dumps(asdict(record)) + '\n'
+        with self._lock:
+            if reservation:
+                self._reserved['tokens'] -= reservation.tokens
+                self._reserved['cost'] -= reservation.cost
+            self._add(record)
+            if self.path:
+                with open(self.path, 'a', encoding='utf-8') as file:
+                    file.write(line)
+
+        return record
+
+    def chat_completion(
+        self,
+        create: Callable[..., Any],
+        task: Optional[str] = None,
+        job: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Executa um chat completion reservando e registrando o seu uso.
+
+        Args:
+            create (Callable): Função que executa o chat completion, como
+                `client.chat.completions.create`.
+            task (str | None): Task associada ao uso.
+            job (str | None): Job associado ao uso.
+            **kwargs: Argumentos de `create`.
+
+        Returns:
+            ChatCompletion: Resposta da API.
+        """
+        model = kwargs['model']
+        reservation = self.reserve(
+            model,
+            count_message_tokens(kwargs['messages'], model),
+            (kwargs.get('max_tokens') or 0) * kwargs.get('n', 1),
+        )
+        try:
+            result = create(**kwargs)
+        except BaseException:
+            self.release(reservation)
+            raise
+
+        usage = usage_fields(result)
+        self.record(
+            model,
+            usage.get('prompt_tokens', 0),
+            usage.get('completion_tokens', 0),
+            task=task,
+            job=job,
+            reservation=reservation,
+        )
+        return result
+
+    @property
+    def total_tokens(self) -> int:
+        """Total de tokens registrados."""
+        return self._used['prompt_tokens'] + self._used['completion_tokens']
+
+    @property
+    def total_cost(self) -> float:
+        """Custo total estimado, em USD."""
+        return self._used['cost']
+
+    def usage(self, by: str = 'model') -> dict[Optional[str], dict[str, Any]]:
+        """Uso agrupado por `model`, `task`, `job` ou `session`."""
+        index = GROUPS.index(by)
+        grouped: dict[Optional[str], Counter[str]] = {}
+        with self._lock:
+            for key, totals in self._totals.items():
+                grouped.setdefault(key[index], Counter()).update(totals)
+
+        return {key: dict(totals) for key, totals in grouped.items()}
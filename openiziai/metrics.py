@@ -0,0 +1,207 @@
+"""Eventos e métricas emitidos durante as execuções."""
+
+import math
+import threading
+import time
+from collections import Counter
+from enum import Enum
+from typing import Any, Callable, Iterable, Optional
+
+from pydantic import BaseModel, Field, PositiveFloat, PrivateAttr
+from pydantic.dataclasses import dataclass
+from tqdm import tqdm
+
+
+class EventType(Enum):
+    """Tipos de eventos emitidos para os hooks."""
+
+    RUN_START = 'run_start'
+    RUN_END = 'run_end'
+    REQUEST_START = 'request_start'
+    REQUEST_END = 'request_end'
+    REQUEST_ERROR = 'request_error'
+    RETRY = 'retry'
+    PARSE_REPAIR = 'parse_repair'
+    PARSE_FAILURE = 'parse_failure'
+    EXAMPLE_WRITTEN = 'example_written'
+    EXAMPLE_REJECTED = 'example_rejected'
+
+
+@dataclass
+class Event:
+    """Evento de uma execução.
+
+    Apenas os campos relevantes para o tipo do evento são preenchidos:
+    `latency` e os tokens em `REQUEST_END`, `error` em `REQUEST_ERROR` (ou o
+    filtro em `EXAMPLE_REJECTED`) e `total`/`done` em `RUN_START`.
+    """
+
+    type: EventType
+    latency: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    error: Optional[str] = None
+    total: Optional[int] = None
+    done: Optional[int] = None
+    timestamp: float = Field(default_factory=time.monotonic)
+
+
+Hook = Callable[[Event], Any]
+
+
+def emit(hooks: Iterable[Hook], type: EventType, **fields: Any) -> None:
+    """Envia um evento para os hooks. Não cria o evento se não houver
+    hooks.
+    """
+    if not hooks:
+        return
+
+    event = Event(type=type, **fields)
+    for hook in hooks:
+        hook(event)
+
+
+class ProgressHook(BaseModel):
+    """Barra de progresso do `tqdm` com os exemplos gravados.
+
+    A barra é criada no início da execução e mostra as requisições, erros e
+    falhas de parsing ao lado da vazão.
+    """
+
+    desc: str = Field(default='Exemplos', description='Título da barra.')
+    _bar: Optional[tqdm] = PrivateAttr(default=None)
+    _counts: Counter[str] = PrivateAttr(default_factory=Counter)
+
+    def __call__(self, event: Event) -> None:
+        """Atualiza a barra de progresso com o evento."""
+        if event.type == EventType.RUN_START:
+            self._counts.clear()
+            self._bar = tqdm(
+                total=event.total,
+                initial=event.done or 0,
+                desc=self.desc,
+                unit='ex',
+            )
+        elif self._bar is None:
+            return
+        elif event.type == EventType.EXAMPLE_WRITTEN:
+            self._bar.update()
+        elif event.type == EventType.RUN_END:
+            self._bar.close()
+            self._bar = None
+        elif event.type in {
+            EventType.REQUEST_END,
+            EventType.REQUEST_ERROR,
+            EventType.PARSE_FAILURE,
+        }:
+            self._counts[event.type.value] += 1
+            self._bar.set_postfix(
+                requests=self._counts[EventType.REQUEST_END.value],
+                errors=self._counts[EventType.REQUEST_ERROR.value],
+                parse_failures=self._counts[EventType.PARSE_FAILURE.value],
+                refresh=False,
+            )
+
+
+class HistogramHook(BaseModel):
+    """Exporter em memória de contadores, tokens e latências.
+
+    As latências são agrupadas em buckets de tamanho geométrico, de forma que
+    registrar um evento é O(1) e a memória não cresce com a quantidade de
+    requisições. Os percentis têm erro relativo de no máximo `growth`.
+    """
+
+    base: PositiveFloat = Field(
+        default=0.001, description='Limite do primeiro bucket, em segundos.'
+    )
+    growth: float = Field(
+        default=2**0.25, gt=1, description='Razão entre buckets vizinhos.'
+    )
+    _counts: Counter[str] = PrivateAttr(default_factory=Counter)
+    _tokens: Counter[str] = PrivateAttr(default_factory=Counter)
+    _buckets: Counter[int] = PrivateAttr(default_factory=Counter)
+    _first: Optional[float] = PrivateAttr(default=None)
+    _last: Optional[float] = PrivateAttr(default=None)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __call__(self, event: Event) -> None:
+        """Registra o evento."""
+        with self._lock:
+            self._counts[event.type.value] += 1
+            if self._first is None:
+                self._first = event.timestamp
+            self._last = event.timestamp
+            if event.latency is not None:
+                self._buckets[self._bucket(event.latency)] += 1
+            if event.prompt_tokens:
+                self._tokens['prompt_tokens'] += event.prompt_tokens
+            if event.completion_tokens:
+                self._tokens['completion_tokens'] += event.completion_tokens
+
+    def _bucket(self, latency: float) -> int:
+        if latency <= self.base:
+            return 0
+        return math.ceil(math.log(latency / self.base, self.growth))
+
+    def _bound(self, bucket: int) -> float:
+        return self.base * self.growth**bucket
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Latência do percentil `q` (0 a 100), pelo limite do bucket."""
+        with self._lock:
+            total = sum(self._buckets.values())
+            if not total:
+                return None
+
+            rank = math.ceil(q / 100 * total) or 1
+            seen = 0
+            for bucket in sorted(self._buckets):
+                seen += self._buckets[bucket]
+                if seen >= rank:
+                    return self._bound(bucket)
+
+        return None  # pragma: no cover
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """Quantidade de eventos de cada tipo."""
+        return dict(self._counts)
+
+    def summary(self) -> dict[str, Any]:
+        """Resumo das métricas registradas.
+
+        Returns:
+            dict: Contadores, tokens, percentis de latência e a vazão de
+                exemplos gravados por segundo.
+        """
+        elapsed = self._last - self._first if self._first is not None else 0.0
+        written = self._counts[EventType.EXAMPLE_WRITTEN.value]
+        return {
+            'counts': self.counts,
+            'tokens': dict(self._tokens),
+            'latency': {
+                'p50': self.percentile(50),
+                'p90': self.percentile(90),
+                'p99': self.percentile(99),
+            },
+            'examples_per_second': written / elapsed if elapsed else None,
+        }
+
+
+def timed(
+    func: Callable[..., Any], *args: Any, **kwargs: Any
+) -> tuple[Any, float]:
+    """Executa `func` e retorna o resultado e a duração em segundos."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def usage_fields(result: Any) -> dict[str, int]:
+    """Tokens de prompt e de completion do `usage` de uma resposta."""
+    usage = getattr(result, 'usage', None)
+    return {
+        field: value
+        for field in ('prompt_tokens', 'completion_tokens')
+        if isinstance(value := getattr(usage, field, None), int)
+    }
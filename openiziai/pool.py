@@ -0,0 +1,218 @@
+"""Pool de clients para somar as cotas de vários projetos ou chaves."""
+
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from openai import APIConnectionError, InternalServerError, RateLimitError
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    Field,
+    PositiveFloat,
+    PositiveInt,
+    PrivateAttr,
+)
+
+from openiziai.backends import LLMClient
+from openiziai.rate_limit import RateLimiter
+from openiziai.utils import estimate_request_tokens
+
+# Erros em que a requisição é refeita em outro client do pool.
+FAILOVER_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+# Erros que indicam que o client está falhando e contam para o circuit
+# breaker. Um 429 apenas esgota o rate limiter do client.
+FAILURE_ERRORS = (APIConnectionError, InternalServerError)
+
+
+class PoolMember(BaseModel):
+    """Client de um pool com o seu peso e os seus limites."""
+
+    client: LLMClient = Field(description='Client da OpenAI.')
+    weight: PositiveFloat = Field(
+        default=1.0, description='Peso do client na distribuição.'
+    )
+    rate_limiter: Optional[RateLimiter] = Field(
+        default=None, description='Rate limiter da chave do client.'
+    )
+    name: Optional[str] = Field(default=None, description='Nome do client.')
+    _in_flight: int = PrivateAttr(default=0)
+    _failures: int = PrivateAttr(default=0)
+    _opened_at: Optional[float] = PrivateAttr(default=None)
+    _stats: Counter[str] = PrivateAttr(default_factory=Counter)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def chat_completion(self, **kwargs: Any) -> Any:
+        """Executa um chat completion respeitando o rate limiter."""
+        if self.rate_limiter:
+            return self.rate_limiter.chat_completion(self.client, **kwargs)
+        return self.client.chat.completions.create(**kwargs)
+
+
+class ClientPool(BaseModel):
+    """Distribui as requisições entre vários clients.
+
+    Implementa a interface de `LLMClient`, podendo substituir o client do
+    `TrainDataTool` e do `Agent`. Cada chat completion é enviado ao client
+    com mais capacidade disponível: primeiro o que espera menos pelo seu
+    rate limiter e, em seguida, o com menos requisições em andamento e
+    atendidas em relação ao seu peso. Um client que falha
+    `failure_threshold` vezes seguidas sai da rotação por `cooldown`
+    segundos (circuit breaker) e as requisições que falham são refeitas nos
+    demais clients.
+
+    Os limites devem ser definidos por client, em `PoolMember.rate_limiter`,
+    e não no `rate_limiter` do `TrainDataTool`. Arquivos e jobs de fine
+    tuning usam o primeiro client do pool.
+
+    Examples:
+        >>> pool = ClientPool(
+        ...     members=[
+        ...         PoolMember(client=OpenAI(api_key=key_a), weight=2),
+        ...         PoolMember(client=OpenAI(api_key=key_b)),
+        ...     ]
+        ... )
+        >>> tool = TrainDataTool(client=pool, data=data, task=task)
+    """
+
+    members: list[PoolMember] = Field(
+        min_length=1, description='Clients do pool.'
+    )
+    failure_threshold: PositiveInt = Field(
+        default=3,
+        description='Falhas seguidas para tirar um client da rotação.',
+    )
+    cooldown: PositiveFloat = Field(
+        default=30.0,
+        description='Segundos que um client fica fora da rotação.',
+    )
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def chat(self) -> SimpleNamespace:
+        """Recurso de chat completion distribuído entre os clients."""
+        return SimpleNamespace(
+            completions=SimpleNamespace(create=self._chat_completion)
+        )
+
+    @property
+    def files(self) -> Any:
+        """Recurso de arquivos do primeiro client."""
+        return self.members[0].client.files
+
+    @property
+    def uploads(self) -> Any:
+        """Recurso de uploads em partes do primeiro client."""
+        return self.members[0].client.uploads
+
+    @property
+    def fine_tuning(self) -> Any:
+        """Recurso de fine tuning do primeiro client."""
+        return self.members[0].client.fine_tuning
+
+    @property
+    def batches(self) -> Any:
+        """Recurso de batches do primeiro client."""
+        return self.members[0].client.batches
+
+    def _is_open(self, member: PoolMember, now: float) -> bool:
+        return (
+            member._opened_at is not None
+            and now - member._opened_at < self.cooldown
+        )
+
+    def _select(self, tokens: int, tried: set[int]) -> int:
+        """Escolhe o índice do client com mais capacidade disponível."""
+        with self._lock:
+            now = time.monotonic()
+            candidates = [
+                i for i in range(len(self.members)) if i not in tried
+            ]
+            closed = [
+                i
+                for i in candidates
+                if not self._is_open(self.members[i], now)
+            ]
+            if closed:
+                index = min(closed, key=lambda i: self._load(i, tokens))
+            else:
+                # Todos fora da rotação: tenta o que saiu há mais tempo.
+                index = min(
+                    candidates, key=lambda i: self.members[i]._opened_at
+                )
+            member = self.members[index]
+            member._in_flight += 1
+            member._stats['requests'] += 1
+            return index
+
+    def _load(self, index: int, tokens: int) -> tuple[float, float, float]:
+        member = self.members[index]
+        wait = (
+            member.rate_limiter.wait_time(tokens)
+            if member.rate_limiter
+            else 0.0
+        )
+        return (
+            wait,
+            member._in_flight / member.weight,
+            member._stats['requests'] / member.weight,
+        )
+
+    def _record(
+        self, member: PoolMember, error: Optional[Exception] = None
+    ) -> None:
+        with self._lock:
+            member._in_flight -= 1
+            if error is None:
+                member._failures = 0
+                member._opened_at = None
+                return
+
+            member._stats['errors'] += 1
+            if isinstance(error, FAILURE_ERRORS):
+                member._failures += 1
+                if member._failures >= self.failure_threshold:
+                    member._opened_at = time.monotonic()
+
+    def _chat_completion(self, **kwargs: Any) -> Any:
+        tokens = estimate_request_tokens(
+            kwargs['messages'], kwargs.get('max_tokens'), kwargs.get('n', 1)
+        )
+        tried: set[int] = set()
+        while True:
+            index = self._select(tokens, tried)
+            tried.add(index)
+            member = self.members[index]
+            try:
+                result = member.chat_completion(**kwargs)
+            except FAILOVER_ERRORS as e:
+                self._record(member, e)
+                if len(tried) == len(self.members):
+                    raise
+                continue
+            except Exception as e:
+                self._record(member, e)
+                raise
+
+            self._record(member)
+            return result
+
+    @property
+    def status(self) -> list[dict[str, Any]]:
+        """Estado de cada client do pool."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'name': member.name or str(i),
+                    'weight': member.weight,
+                    'in_flight': member._in_flight,
+                    'requests': member._stats['requests'],
+                    'errors': member._stats['errors'],
+                    'open': self._is_open(member, now),
+                }
+                for i, member in enumerate(self.members)
+            ]
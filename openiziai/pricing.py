@@ -0,0 +1,60 @@
+"""Preços dos modelos da OpenAI usados para estimar custos."""
+
+from typing import Optional
+
+# Preço em USD por 1M de tokens: (prompt, completion).
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    'gpt-3.5-turbo': (0.50, 1.50),
+    'gpt-4': (30.00, 60.00),
+    'gpt-4-turbo': (10.00, 30.00),
+    'gpt-4o': (2.50, 10.00),
+    'gpt-4o-mini': (0.15, 0.60),
+}
+# Preço da inferência de modelos de fine tuning, pelo modelo base refinado.
+FINE_TUNED_PRICES: dict[str, tuple[float, float]] = {
+    'gpt-3.5-turbo': (3.00, 6.00),
+    'gpt-4-0613': (45.00, 90.00),
+    'gpt-4o': (3.75, 15.00),
+    'gpt-4o-mini': (0.30, 1.20),
+}
+
+
+def model_price(model: str) -> Optional[tuple[float, float]]:
+    """Busca o preço de um modelo pelo maior prefixo conhecido.
+
+    Modelos com sufixo de versão, como `gpt-3.5-turbo-0125`, usam o preço do
+    modelo base. Modelos de fine tuning (`ft:<modelo>:...`) usam o preço de
+    inferência de fine tuning do modelo refinado, maior que o do modelo base.
+    """
+    prices = MODEL_PRICES
+    if model.startswith('ft:'):
+        model = model.removeprefix('ft:')
+        prices = FINE_TUNED_PRICES
+
+    matches = [prefix for prefix in prices if model.startswith(prefix)]
+    if not matches:
+        return None
+
+    return prices[max(matches, key=len)]
+
+
+def estimate_cost(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    prices: Optional[tuple[float, float]] = None,
+) -> Optional[float]:
+    """Estima o custo, em USD, de uma quantidade de tokens.
+
+    Returns:
+        float | None: Custo estimado ou None se o preço do modelo não for
+            conhecido.
+    """
+    _prices = prices or model_price(model)
+    if not _prices:
+        return None
+
+    prompt_price, completion_price = _prices
+    return (
+        prompt_tokens * prompt_price + completion_tokens * completion_price
+    ) / 1_000_000
@@ -0,0 +1,176 @@
+"""Controle proativo do rate limit da API da OpenAI."""
+
+import threading
+import time
+from typing import Any, Mapping, Optional
+
+from openai import RateLimitError
+from pydantic import BaseModel, Field, PositiveInt, PrivateAttr
+
+from openiziai.utils import estimate_request_tokens
+
+LIMIT_HEADERS = {
+    'requests': (
+        'x-ratelimit-limit-requests',
+        'x-ratelimit-remaining-requests',
+    ),
+    'tokens': ('x-ratelimit-limit-tokens', 'x-ratelimit-remaining-tokens'),
+}
+
+
+class TokenBucket:
+    """Token bucket que é reabastecido continuamente a cada minuto."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(per_minute)
+        self.level = float(per_minute)
+        self._updated_at = time.monotonic()
+
+    def refill(self) -> None:
+        """Reabastece o bucket proporcionalmente ao tempo decorrido."""
+        now = time.monotonic()
+        rate = self.capacity / 60
+        self.level = min(
+            self.capacity, self.level + (now - self._updated_at) * rate
+        )
+        self._updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        """Tempo, em segundos, até que `amount` esteja disponível."""
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / (self.capacity / 60)
+
+
+class RateLimiter(BaseModel):
+    """Limita as requisições por minuto (RPM) e tokens por minuto (TPM).
+
+    Uma mesma instância pode ser compartilhada entre todos os workers do
+    `TrainDataTool` e os Agentes, inclusive entre threads. Os limites são
+    atualizados a partir dos headers de rate limit e do `usage` retornados
+    pela API.
+    """
+
+    requests_per_minute: Optional[PositiveInt] = Field(
+        default=None, description='Máximo de requisições por minuto.'
+    )
+    tokens_per_minute: Optional[PositiveInt] = Field(
+        default=None, description='Máximo de tokens por minuto.'
+    )
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _buckets: dict[str, TokenBucket] = PrivateAttr(default_factory=dict)
+
+    def __init__(self, **data: Any) -> None:
+        """Cria um novo rate limiter.
+
+        Args:
+            requests_per_minute (int | None): Máximo de requisições por
+                minuto. Sem limite caso não informado.
+            tokens_per_minute (int | None): Máximo de tokens por minuto. Sem
+                limite caso não informado.
+        """
+        super().__init__(**data)
+        if self.requests_per_minute:
+            self._buckets['requests'] = TokenBucket(self.requests_per_minute)
+        if self.tokens_per_minute:
+            self._buckets['tokens'] = TokenBucket(self.tokens_per_minute)
+
+    def _wait_time(self, amounts: dict[str, float]) -> float:
+        wait = 0.0
+        for name, bucket in self._buckets.items():
+            bucket.refill()
+            wait = max(wait, bucket.wait_time(amounts[name]))
+        return wait
+
+    def wait_time(self, tokens: int = 0) -> float:
+        """Tempo, em segundos, até que uma requisição com `tokens` possa ser
+        feita, sem consumir os limites.
+        """
+        with self._lock:
+            return self._wait_time({'requests': 1, 'tokens': tokens})
+
+    def acquire(self, tokens: int = 0) -> None:
+        """Bloqueia até que uma requisição com `tokens` possa ser feita."""
+        amounts = {'requests': 1, 'tokens': tokens}
+        while True:
+            with self._lock:
+                wait = self._wait_time(amounts)
+                if not wait:
+                    for name, bucket in self._buckets.items():
+                        bucket.level -= amounts[name]
+                    return
+            time.sleep(wait)
+
+    def update(
+        self,
+        headers: Optional[Mapping[str, str]] = None,
+        usage: Any = None,
+        reserved_tokens: int = 0,
+    ) -> None:
+        """Atualiza os buckets com a resposta da API.
+
+        Args:
+            headers (Mapping | None): Headers da resposta contendo os
+                `x-ratelimit-*`.
+            usage (CompletionUsage | None): Uso de tokens da resposta.
+            reserved_tokens (int): Tokens estimados em `acquire`.
+        """
+        with self._lock:
+            tokens = self._buckets.get('tokens')
+            if tokens and usage is not None:
+                tokens.level = min(
+                    tokens.capacity,
+                    tokens.level + reserved_tokens - usage.total_tokens,
+                )
+
+            for name, (limit, remaining) in LIMIT_HEADERS.items():
+                bucket = self._buckets.get(name)
+                if not bucket or not headers:
+                    continue
+                if _limit := _parse_int(headers.get(limit)):
+                    bucket.capacity = float(_limit)
+                _remaining = _parse_int(headers.get(remaining))
+                if _remaining is not None:
+                    bucket.level = min(bucket.level, _remaining)
+
+    def exhaust(self) -> None:
+        """Esvazia os buckets após um erro 429, pausando todos os workers."""
+        with self._lock:
+            for bucket in self._buckets.values():
+                bucket.refill()
+                bucket.level = min(bucket.level, 0.0)
+
+    def chat_completion(self, client: Any, **kwargs: Any) -> Any:
+        """Executa um chat completion respeitando os limites.
+
+        Args:
+            client (OpenAI): Client da OpenAI.
+            **kwargs: Argumentos de `client.chat.completions.create`.
+
+        Returns:
+            ChatCompletion: Resposta da API.
+        """
+        reserved = estimate_request_tokens(
+            kwargs['messages'], kwargs.get('max_tokens'), kwargs.get('n', 1)
+        )
+        self.acquire(reserved)
+        try:
+            raw = client.chat.completions.with_raw_response.create(**kwargs)
+        except RateLimitError:
+            self.exhaust()
+            raise
+
+        result = raw.parse()
+        self.update(
+            headers=raw.headers, usage=result.usage, reserved_tokens=reserved
+        )
+
+        return result
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    try:
+        return int(value)  # pyright: ignore
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,229 @@
+"""Gravação e reprodução das respostas da API."""
+
+import hashlib
+import json
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Literal, Optional
+
+from openai.types.chat import ChatCompletion
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from openiziai.backends import LLMClient
+
+# Parâmetros que identificam uma requisição.
+REQUEST_KEYS = ('model', 'messages', 'temperature', 'max_tokens', 'n')
+DATA_FILE = 'responses.bin'
+INDEX_FILE = 'index.tsv'
+
+
+class ReplayMiss(LookupError):
+    """A requisição não foi gravada e o modo é `replay`."""
+
+
+def request_key(**kwargs: Any) -> str:
+    """Hash sha256 da requisição normalizada.
+
+    Considera apenas `model`, `messages`, `temperature`, `max_tokens` e `n`,
+    com `n` padrão 1, serializados com chaves ordenadas.
+    """
+    request = {key: kwargs.get(key) for key in REQUEST_KEYS}
+    request['n'] = request['n'] or 1
+    payload = json.dumps(
+        request, sort_keys=True, separators=(',', ':'), ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class _Offline:
+    """Recurso da API no modo `replay` sem client.
+
+    Pode ser inspecionado normalmente, mas qualquer chamada levanta
+    `ReplayMiss`, já que apenas os chat completions são gravados.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def __getattr__(self, name: str) -> '_Offline':
+        return _Offline(f'{self._name}.{name}')
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        raise ReplayMiss(
+            f'`{self._name}` não é gravado e o modo `replay` não possui '
+            'client.'
+        )
+
+
+class _RawResponse:
+    """Resposta reproduzida no formato do `with_raw_response`."""
+
+    headers: dict[str, str] = {}
+
+    def __init__(self, result: Any) -> None:
+        self._result = result
+
+    def parse(self) -> Any:
+        return self._result
+
+
+class ReplayClient(BaseModel):
+    """Client que grava e reproduz os chat completions.
+
+    As respostas são gravadas comprimidas em um arquivo apenas com append e
+    indexadas pelo hash da requisição normalizada. Uma mesma requisição
+    feita várias vezes é gravada e reproduzida na mesma ordem.
+
+    Modos:
+        - `record`: sempre chama o client e grava a resposta.
+        - `replay`: apenas reproduz, sem rede. Requisições não gravadas
+          levantam `ReplayMiss`.
+        - `auto`: reproduz o que foi gravado e grava o restante.
+
+    Para reproduzir um pipeline inteiro, as requisições precisam ser as
+    mesmas entre as execuções. No `TrainDataTool`, use um seletor de
+    contexto com seed, como
+    `functools.partial(RandomContextSelector, seed=42)`.
+
+    Examples:
+        >>> client = ReplayClient(client=OpenAI(), path='data/replay')
+        >>> tool = TrainDataTool(client=client, data=data, task=task)
+    """
+
+    path: Path = Field(description='Diretório das respostas gravadas.')
+    client: Optional[LLMClient] = Field(
+        default=None, description='Client usado para gravar as respostas.'
+    )
+    mode: Literal['record', 'replay', 'auto'] = Field(
+        default='auto', description='Modo de gravação ou reprodução.'
+    )
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _index: dict[str, list[tuple[int, int]]] = PrivateAttr(
+        default_factory=dict
+    )
+    _seen: Counter[str] = PrivateAttr(default_factory=Counter)
+    _stats: Counter[str] = PrivateAttr(default_factory=Counter)
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    def __init__(self, **data: Any) -> None:
+        """Cria um novo client de gravação e reprodução.
+
+        Args:
+            path (Path): Diretório das respostas gravadas.
+            client (LLMClient | None): Client usado para gravar as
+                respostas. Obrigatório nos modos `record` e `auto`.
+            mode (str): `record`, `replay` ou `auto`. Padrão `auto`.
+        """
+        super().__init__(**data)
+        if self.mode != 'replay' and self.client is None:
+            raise ValueError(f'O modo `{self.mode}` precisa de um `client`.')
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        index = self.path / INDEX_FILE
+        if index.exists():
+            with open(index, encoding='utf-8') as file:
+                for line in file:
+                    key, offset, size = line.split()
+                    self._index.setdefault(key, []).append((
+                        int(offset),
+                        int(size),
+                    ))
+
+    @property
+    def chat(self) -> SimpleNamespace:
+        """Recurso de chat completion com gravação e reprodução."""
+        return SimpleNamespace(
+            completions=SimpleNamespace(
+                create=self._chat_completion,
+                with_raw_response=SimpleNamespace(
+                    create=self._raw_chat_completion
+                ),
+            )
+        )
+
+    @property
+    def files(self) -> Any:
+        """Recurso de arquivos do client gravado."""
+        return self._resource('files')
+
+    @property
+    def uploads(self) -> Any:
+        """Recurso de uploads em partes do client gravado."""
+        return self._resource('uploads')
+
+    @property
+    def fine_tuning(self) -> Any:
+        """Recurso de fine tuning do client gravado."""
+        return self._resource('fine_tuning')
+
+    @property
+    def batches(self) -> Any:
+        """Recurso da Batch API do client gravado."""
+        return self._resource('batches')
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """Quantidade de respostas reproduzidas e gravadas."""
+        return dict(self._stats)
+
+    def _resource(self, name: str) -> Any:
+        if self.client is None:
+            return _Offline(name)
+        return getattr(self.client, name)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._index.values())
+
+    def _lookup(self, key: str) -> Optional[ChatCompletion]:
+        """Busca a próxima ocorrência gravada da requisição."""
+        with self._lock:
+            occurrence = self._seen[key]
+            self._seen[key] += 1
+            entries = self._index.get(key, [])
+            if self.mode == 'record' or occurrence >= len(entries):
+                if self.mode == 'replay':
+                    raise ReplayMiss(f'Requisição {key} não foi gravada.')
+                return None
+
+            offset, size = entries[occurrence]
+            with open(self.path / DATA_FILE, 'rb') as file:
+                file.seek(offset)
+                data = zlib.decompress(file.read(size))
+            self._stats['replayed'] += 1
+
+        return ChatCompletion.model_validate_json(data)
+
+    def _store(self, key: str, result: Any) -> None:
+        data = zlib.compress(result.model_dump_json().encode())
+        with self._lock:
+            with open(self.path / DATA_FILE, 'ab') as file:
+                offset = file.tell()
+                file.write(data)
+            with open(self.path / INDEX_FILE, 'a', encoding='utf-8') as file:
+                file.write(f'{key}\t{offset}\t{len(data)}\n')
+            self._index.setdefault(key, []).append((offset, len(data)))
+            self._stats['recorded'] += 1
+
+    def _chat_completion(self, **kwargs: Any) -> Any:
+        key = request_key(**kwargs)
+        if (result := self._lookup(key)) is not None:
+            return result
+
+        result = self.client.chat.completions.create(**kwargs)  # pyright: ignore
+        self._store(key, result)
+        return result
+
+    def _raw_chat_completion(self, **kwargs: Any) -> Any:
+        key = request_key(**kwargs)
+        if (result := self._lookup(key)) is not None:
+            return _RawResponse(result)
+
+        raw = self.client.chat.completions.with_raw_response.create(  # pyright: ignore
+            **kwargs
+        )
+        self._store(key, raw.parse())
+        return raw
@@ -1,6 +1,33 @@
 """Disponibiliza ferramentas úteis para a criação dos modelos e agentes."""
 
+from .context_selection import (
+    ContextSelector,
+    MMRContextSelector,
+    RandomContextSelector,
+)
+from .dedup import NearDuplicateIndex
+from .filters import (
+    EchoFilter,
+    EmptyFilter,
+    FilterStage,
+    LanguageFilter,
+    LengthFilter,
+)
 from .prep_data import prep_data
+from .sharding import shard_data
 from .train_data import TrainDataTool
 
-__all__ = ['prep_data', 'TrainDataTool']
+__all__ = [
+    'ContextSelector',
+    'EchoFilter',
+    'EmptyFilter',
+    'FilterStage',
+    'LanguageFilter',
+    'LengthFilter',
+    'MMRContextSelector',
+    'NearDuplicateIndex',
+    'prep_data',
+    'RandomContextSelector',
+    'shard_data',
+    'TrainDataTool',
+]
@@ -0,0 +1,70 @@
+import json
+import time
+from typing import Any, Iterator, Optional
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+BATCH_FINAL_STATUSES = {'completed', 'failed', 'expired', 'cancelled'}
+
+
+def batch_request(custom_id: str, body: dict[str, Any]) -> str:
+    """Serializa uma requisição no formato de input da Batch API."""
+    return json.dumps({
+        'custom_id': custom_id,
+        'method': 'POST',
+        'url': BATCH_ENDPOINT,
+        'body': body,
+    })
+
+
+def wait_for_batch(
+    client: Any,
+    batch_id: str,
+    poll_interval: float = 5.0,
+    max_poll_interval: float = 300.0,
+    timeout: Optional[float] = None,
+) -> Any:
+    """Aguarda um batch terminar consultando o status com backoff.
+
+    O intervalo entre as consultas dobra enquanto o status não muda, até o
+    máximo de `max_poll_interval`, e volta ao início quando o status muda.
+
+    Args:
+        client (OpenAI): Client da OpenAI.
+        batch_id (str): ID do batch.
+        poll_interval (float): Intervalo inicial entre as consultas, em
+            segundos.
+        max_poll_interval (float): Intervalo máximo entre as consultas.
+        timeout (float | None): Tempo máximo de espera, em segundos.
+
+    Returns:
+        Batch: Batch em um status final.
+    """
+    start = time.monotonic()
+    interval = poll_interval
+    status = None
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in BATCH_FINAL_STATUSES:
+            return batch
+
+        if timeout is not None and time.monotonic() - start > timeout:
+            raise TimeoutError(
+                f'Batch {batch_id} não terminou em {timeout}s. '
+                f'Status: {batch.status}'
+            )
+
+        interval = (
+            poll_interval
+            if batch.status != status
+            else min(interval * 2, max_poll_interval)
+        )
+        status = batch.status
+        time.sleep(interval)
+
+
+def iter_batch_results(client: Any, file_id: str) -> Iterator[dict[str, Any]]:
+    """Lê o arquivo de resultado de um batch linha a linha."""
+    with client.files.with_streaming_response.content(file_id) as response:
+        for line in response.iter_lines():
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,173 @@
+import math
+import random
+import re
+import zlib
+from collections import Counter, deque
+from typing import Any, Optional, Protocol
+
+from pydantic import BaseModel, Field, PositiveInt, PrivateAttr
+
+from openiziai.utils import count_tokens
+
+CONTEXT_POOL_SIZE = 64
+
+
+class ContextSelector(Protocol):
+    """Define como os exemplos anteriores são escolhidos como contexto."""
+
+    def add(self, text: str) -> None: ...
+
+    def select(
+        self, k: int, max_tokens: Optional[int] = None
+    ) -> list[str]: ...
+
+
+def _limit_tokens(texts: list[str], max_tokens: Optional[int]) -> list[str]:
+    if max_tokens is None:
+        return texts
+
+    selected = []
+    total = 0
+    for text in texts:
+        total += count_tokens(text)
+        if total > max_tokens:
+            break
+        selected.append(text)
+
+    return selected
+
+
+class RandomContextSelector(BaseModel):
+    """Seleciona exemplos aleatórios de uma amostra de reservatório.
+
+    A amostra mantém no máximo `pool_size` exemplos, de forma que a memória é
+    constante independente da quantidade de exemplos criados.
+    """
+
+    pool_size: PositiveInt = Field(
+        default=CONTEXT_POOL_SIZE,
+        description='Máximo de exemplos mantidos na amostra.',
+    )
+    seed: Optional[int] = Field(
+        default=None, description='Semente da amostragem.'
+    )
+    _pool: list[str] = PrivateAttr(default_factory=list)
+    _seen: int = PrivateAttr(default=0)
+    _rng: random.Random = PrivateAttr(default=None)
+
+    def __init__(self, **data: Any) -> None:
+        """Cria um novo seletor aleatório.
+
+        Args:
+            pool_size (int): Máximo de exemplos mantidos na amostra.
+                Padrão 64.
+            seed (int | None): Semente da amostragem.
+        """
+        super().__init__(**data)
+        self._rng = random.Random(self.seed)
+
+    def add(self, text: str) -> None:
+        """Adiciona um exemplo à amostra."""
+        self._seen += 1
+        if len(self._pool) < self.pool_size:
+            self._pool.append(text)
+        elif (index := self._rng.randrange(self._seen)) < self.pool_size:
+            self._pool[index] = text
+
+    def select(self, k: int, max_tokens: Optional[int] = None) -> list[str]:
+        """Seleciona até `k` exemplos respeitando `max_tokens`."""
+        texts = (
+            list(self._pool)
+            if len(self._pool) <= k
+            else self._rng.sample(self._pool, k)
+        )
+        return _limit_tokens(texts, max_tokens)
+
+
+class MMRContextSelector(BaseModel):
+    """Seleciona exemplos diversos com Maximal Marginal Relevance.
+
+    Os exemplos são representados por vetores TF-IDF esparsos com hashing de
+    features, atualizados incrementalmente. O exemplo mais recente é usado como
+    referência e os demais são escolhidos penalizando a similaridade com os já
+    selecionados, trazendo mais diversidade por token de contexto.
+    """
+
+    pool_size: PositiveInt = Field(
+        default=CONTEXT_POOL_SIZE,
+        description='Máximo de exemplos recentes mantidos no índice.',
+    )
+    diversity: float = Field(
+        default=0.5,
+        ge=0,
+        le=1,
+        description='Peso da diversidade em relação à relevância.',
+    )
+    n_features: PositiveInt = Field(
+        default=2**16, description='Dimensão dos vetores com hashing.'
+    )
+    _pool: deque[tuple[str, Counter[int]]] = PrivateAttr(default_factory=deque)
+    _df: Counter[int] = PrivateAttr(default_factory=Counter)
+
+    def _features(self, text: str) -> Counter[int]:
+        return Counter(
+            zlib.crc32(word.encode()) % self.n_features
+            for word in re.findall(r'\w+', text.lower())
+        )
+
+    def add(self, text: str) -> None:
+        """Adiciona um exemplo ao índice, removendo o mais antigo se cheio."""
+        features = self._features(text)
+        self._pool.append((text, features))
+        self._df.update(features.keys())
+        if len(self._pool) > self.pool_size:
+            _, old = self._pool.popleft()
+            self._df.subtract(old.keys())
+
+    def _vector(self, features: Counter[int]) -> dict[int, float]:
+        n_docs = len(self._pool)
+        vector = {
+            feature: count
+            * (math.log((1 + n_docs) / (1 + self._df[feature])) + 1)
+            for feature, count in features.items()
+        }
+        norm = math.sqrt(sum(value**2 for value in vector.values())) or 1.0
+        return {feature: value / norm for feature, value in vector.items()}
+
+    @staticmethod
+    def _similarity(a: dict[int, float], b: dict[int, float]) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(value * b.get(feature, 0.0) for feature, value in a.items())
+
+    def select(self, k: int, max_tokens: Optional[int] = None) -> list[str]:
+        """Seleciona até `k` exemplos diversos respeitando `max_tokens`.
+
+        Os exemplos retornados mantêm a ordem em que foram criados.
+        """
+        if not self._pool or k <= 0:
+            return []
+
+        texts = [text for text, _ in self._pool]
+        vectors = [self._vector(features) for _, features in self._pool]
+        relevance = [self._similarity(vectors[-1], v) for v in vectors]
+
+        selected = [len(texts) - 1]
+        candidates = set(range(len(texts) - 1))
+        while candidates and len(selected) < k:
+            best = max(
+                candidates,
+                key=lambda i: (
+                    (1 - self.diversity) * relevance[i]
+                    - self.diversity
+                    * max(
+                        self._similarity(vectors[i], vectors[j])
+                        for j in selected
+                    )
+                ),
+            )
+            selected.append(best)
+            candidates.remove(best)
+
+        limited = _limit_tokens([texts[i] for i in selected], max_tokens)
+        return [texts[i] for i in sorted(selected[: len(limited)])]
@@ -0,0 +1,157 @@
+import random
+import re
+import threading
+import zlib
+from array import array
+from collections import defaultdict
+from typing import Any
+
+from pydantic import (
+    BaseModel,
+    Field,
+    PositiveInt,
+    PrivateAttr,
+    model_validator,
+)
+
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+
+class NearDuplicateIndex(BaseModel):
+    """Índice incremental de quase duplicatas com MinHash e LSH.
+
+    Cada texto é convertido em shingles de palavras e resumido em uma
+    assinatura MinHash. As assinaturas são divididas em bandas (LSH), de forma
+    que apenas textos que compartilham alguma banda são comparados. A
+    verificação de um novo texto é O(1) em relação ao tamanho do índice.
+    """
+
+    threshold: float = Field(
+        default=0.7,
+        gt=0,
+        le=1,
+        description='Similaridade de Jaccard a partir da qual um texto é '
+        'considerado duplicado.',
+    )
+    num_perm: PositiveInt = Field(
+        default=64, description='Número de permutações do MinHash.'
+    )
+    bands: PositiveInt = Field(
+        default=16, description='Número de bandas do LSH.'
+    )
+    shingle_size: PositiveInt = Field(
+        default=3, description='Quantidade de palavras em cada shingle.'
+    )
+    seed: int = Field(default=42, description='Semente das permutações.')
+    _permutations: list[tuple[int, int]] = PrivateAttr(default_factory=list)
+    _buckets: list[dict[bytes, list[int]]] = PrivateAttr(default_factory=list)
+    _signatures: list[array] = PrivateAttr(default_factory=list)
+    _rejected: int = PrivateAttr(default=0)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, **data: Any) -> None:
+        """Cria um novo índice de quase duplicatas.
+
+        Args:
+            threshold (float): Similaridade de Jaccard a partir da qual um
+                texto é considerado duplicado. Padrão 0.7.
+            num_perm (int): Número de permutações do MinHash. Padrão 64.
+            bands (int): Número de bandas do LSH. Deve dividir `num_perm`.
+                Padrão 16.
+            shingle_size (int): Quantidade de palavras em cada shingle.
+                Padrão 3.
+            seed (int): Semente das permutações. Padrão 42.
+        """
+        super().__init__(**data)
+        rng = random.Random(self.seed)
+        self._permutations = [
+            (
+                rng.randint(1, MERSENNE_PRIME - 1),
+                rng.randint(0, MERSENNE_PRIME),
+            )
+            for _ in range(self.num_perm)
+        ]
+        self._buckets = [defaultdict(list) for _ in range(self.bands)]
+
+    @model_validator(mode='after')
+    def bands_must_divide_num_perm(self) -> 'NearDuplicateIndex':
+        """Valida se as bandas dividem as permutações igualmente."""
+        if self.num_perm % self.bands:
+            raise ValueError('`bands` deve ser divisor de `num_perm`.')
+        return self
+
+    def _shingles(self, text: str) -> set[int]:
+        words = re.findall(r'\w+', text.lower())
+        size = min(self.shingle_size, len(words)) or 1
+        return {
+            zlib.crc32(' '.join(words[i : i + size]).encode())
+            for i in range(max(len(words) - size + 1, 1))
+        }
+
+    def signature(self, text: str) -> array:
+        """Calcula a assinatura MinHash de um texto."""
+        shingles = self._shingles(text)
+        return array(
+            'Q',
+            (
+                min((a * s + b) % MERSENNE_PRIME & MAX_HASH for s in shingles)
+                for a, b in self._permutations
+            ),
+        )
+
+    def _bands(self, signature: array) -> list[bytes]:
+        rows = self.num_perm // self.bands
+        return [
+            signature[i : i + rows].tobytes()
+            for i in range(0, self.num_perm, rows)
+        ]
+
+    def _similarity(self, a: array, b: array) -> float:
+        return sum(x == y for x, y in zip(a, b)) / self.num_perm
+
+    def _find(self, signature: array, bands: list[bytes]) -> bool:
+        candidates = {
+            index
+            for bucket, band in zip(self._buckets, bands)
+            for index in bucket.get(band, ())
+        }
+        return any(
+            self._similarity(signature, self._signatures[index])
+            >= self.threshold
+            for index in candidates
+        )
+
+    def is_duplicate(self, text: str) -> bool:
+        """Verifica se o texto é quase duplicado de algum texto indexado."""
+        signature = self.signature(text)
+        with self._lock:
+            return self._find(signature, self._bands(signature))
+
+    def add(self, text: str) -> bool:
+        """Indexa o texto caso ele não seja uma quase duplicata.
+
+        Returns:
+            bool: True se o texto foi indexado, False se for duplicado.
+        """
+        signature = self.signature(text)
+        bands = self._bands(signature)
+        with self._lock:
+            if self._find(signature, bands):
+                self._rejected += 1
+                return False
+
+            index = len(self._signatures)
+            self._signatures.append(signature)
+            for bucket, band in zip(self._buckets, bands):
+                bucket[band].append(index)
+
+        return True
+
+    @property
+    def rejected(self) -> int:
+        """Quantidade de textos rejeitados como duplicados."""
+        return self._rejected
+
+    def __len__(self) -> int:
+        return len(self._signatures)
@@ -0,0 +1,220 @@
+import re
+import time
+from collections import Counter
+from typing import Any, Callable, Optional
+
+import anyio
+import anyio.to_process
+from pydantic import BaseModel, Field, PositiveInt, PrivateAttr
+
+from openiziai.utils import count_tokens
+
+WORD_PATTERN = re.compile(r'\w+')
+STOPWORDS = {
+    'pt': {
+        'a', 'ao', 'as', 'com', 'como', 'da', 'das', 'de', 'do', 'dos', 'e',
+        'em', 'é', 'na', 'não', 'no', 'o', 'os', 'ou', 'para', 'por', 'que',
+        'se', 'um', 'uma', 'você',
+    },
+    'en': {
+        'a', 'and', 'are', 'as', 'for', 'how', 'in', 'is', 'it', 'not', 'of',
+        'on', 'or', 'that', 'the', 'this', 'to', 'what', 'with', 'you',
+    },
+    'es': {
+        'al', 'con', 'como', 'de', 'del', 'el', 'en', 'es', 'la', 'las',
+        'los', 'no', 'para', 'por', 'que', 'se', 'su', 'un', 'una', 'y',
+    },
+}  # fmt: skip
+
+
+# Recebe o prompt e a response e retorna se o exemplo deve ser gravado. Os
+# filtros são executados em outros processos e precisam ser serializáveis com
+# `pickle`, como funções do módulo ou modelos do pydantic.
+ExampleFilter = Callable[[str, str], bool]
+
+
+class EmptyFilter(BaseModel):
+    """Rejeita exemplos com prompt ou response vazios."""
+
+    def __call__(self, prompt: str, response: str) -> bool:
+        return bool(prompt.strip() and response.strip())
+
+
+class LengthFilter(BaseModel):
+    """Rejeita exemplos com response fora dos limites de tokens."""
+
+    min_tokens: int = Field(default=1, description='Mínimo de tokens.')
+    max_tokens: Optional[PositiveInt] = Field(
+        default=None, description='Máximo de tokens.'
+    )
+    model: str = Field(
+        default='gpt-3.5-turbo', description='Modelo usado na contagem.'
+    )
+
+    def __call__(self, prompt: str, response: str) -> bool:
+        tokens = count_tokens(response, self.model)
+        return tokens >= self.min_tokens and (
+            self.max_tokens is None or tokens <= self.max_tokens
+        )
+
+
+class EchoFilter(BaseModel):
+    """Rejeita responses que repetem o prompt.
+
+    A similaridade é o Jaccard entre as palavras do prompt e da response.
+    """
+
+    threshold: float = Field(
+        default=0.8,
+        gt=0,
+        le=1,
+        description='Similaridade a partir da qual a response é um eco.',
+    )
+
+    def __call__(self, prompt: str, response: str) -> bool:
+        prompt_words = set(WORD_PATTERN.findall(prompt.lower()))
+        response_words = set(WORD_PATTERN.findall(response.lower()))
+        if not prompt_words or not response_words:
+            return True
+
+        similarity = len(prompt_words & response_words) / len(
+            prompt_words | response_words
+        )
+        return similarity < self.threshold
+
+
+class LanguageFilter(BaseModel):
+    """Rejeita exemplos escritos em outro idioma.
+
+    O idioma é estimado pelas stopwords mais frequentes de `pt`, `en` e `es`.
+    Textos sem stopwords suficientes são aceitos.
+    """
+
+    language: str = Field(default='pt', description='Idioma esperado.')
+    min_stopwords: PositiveInt = Field(
+        default=3, description='Mínimo de stopwords para estimar o idioma.'
+    )
+
+    def _detect(self, text: str) -> Optional[str]:
+        counts: Counter[str] = Counter()
+        for word in WORD_PATTERN.findall(text.lower()):
+            for language, stopwords in STOPWORDS.items():
+                if word in stopwords:
+                    counts[language] += 1
+        if sum(counts.values()) < self.min_stopwords:
+            return None
+        return counts.most_common(1)[0][0]
+
+    def __call__(self, prompt: str, response: str) -> bool:
+        return self._detect(f'{prompt}\n{response}') in {None, self.language}
+
+
+def filter_name(example_filter: ExampleFilter) -> str:
+    """Nome usado nos relatórios do filtro."""
+    return getattr(example_filter, '__name__', type(example_filter).__name__)
+
+
+def apply_filters(
+    filters: list[ExampleFilter], pairs: list[tuple[str, str]]
+) -> tuple[list[Optional[str]], dict[str, float]]:
+    """Aplica os filtros aos pares prompt/response.
+
+    Returns:
+        tuple: Nome do primeiro filtro que rejeitou cada par, ou None se o par
+            foi aceito, e o tempo gasto por filtro, em segundos.
+    """
+    rejections: list[Optional[str]] = []
+    seconds: Counter[str] = Counter()
+    for prompt, response in pairs:
+        rejected = None
+        for example_filter in filters:
+            name = filter_name(example_filter)
+            start = time.perf_counter()
+            accepted = example_filter(prompt, response)
+            seconds[name] += time.perf_counter() - start
+            if not accepted:
+                rejected = name
+                break
+        rejections.append(rejected)
+
+    return rejections, dict(seconds)
+
+
+class FilterStage(BaseModel):
+    """Etapa de filtros entre a criação dos exemplos e a gravação.
+
+    Os filtros rodam em um pool de processos do anyio, limitado à quantidade
+    de CPUs, sem bloquear o event loop, e os exemplos rejeitados são criados
+    novamente. Os exemplos de uma requisição são enviados juntos para reduzir
+    a serialização.
+
+    Examples:
+        >>> stage = FilterStage(
+        ...     filters=[EmptyFilter(), LengthFilter(max_tokens=500)]
+        ... )
+        >>> tool = TrainDataTool(..., filters=stage)
+        >>> tool.execute(n_examples=100, n_batch=4)
+        >>> stage.report
+        {'EmptyFilter': {'rejected': 2, 'seconds': 0.0001}, ...}
+    """
+
+    filters: list[ExampleFilter] = Field(
+        default_factory=lambda: [EmptyFilter(), EchoFilter()],
+        description='Filtros aplicados em ordem.',
+    )
+    processes: bool = Field(
+        default=True,
+        description='Se os filtros devem rodar em um pool de processos.',
+    )
+    _checked: int = PrivateAttr(default=0)
+    _rejected: Counter[str] = PrivateAttr(default_factory=Counter)
+    _seconds: Counter[str] = PrivateAttr(default_factory=Counter)
+
+    async def check(self, pairs: list[tuple[str, str]]) -> list[Optional[str]]:
+        """Aplica os filtros aos pares prompt/response.
+
+        Args:
+            pairs (list[tuple[str, str]]): Pares prompt/response.
+
+        Returns:
+            list[str | None]: Nome do filtro que rejeitou cada par, ou None
+                se o par foi aceito.
+        """
+        if not pairs or not self.filters or not self.processes:
+            return self.apply(pairs)
+
+        return self._record(
+            *await anyio.to_process.run_sync(
+                apply_filters, self.filters, pairs
+            )
+        )
+
+    def apply(self, pairs: list[tuple[str, str]]) -> list[Optional[str]]:
+        """Aplica os filtros no processo atual. Versão síncrona de
+        `check`.
+        """
+        return self._record(*apply_filters(self.filters, pairs))
+
+    def _record(
+        self, rejections: list[Optional[str]], seconds: dict[str, float]
+    ) -> list[Optional[str]]:
+        self._checked += len(rejections)
+        self._rejected.update(name for name in rejections if name)
+        self._seconds.update(seconds)
+        return rejections
+
+    @property
+    def report(self) -> dict[str, dict[str, Any]]:
+        """Rejeições e tempo gasto por filtro."""
+        return {
+            name: {
+                'rejected': self._rejected[name],
+                'seconds': self._seconds[name],
+            }
+            for name in map(filter_name, self.filters)
+        }
+
+    @property
+    def checked(self) -> int:
+        """Quantidade de exemplos verificados."""
+        return self._checked
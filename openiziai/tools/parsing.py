@@ -0,0 +1,104 @@
+import ast
+import json
+import re
+from typing import Any, Optional
+
+CODE_FENCE = re.compile(r'```[\w-]*\s*(.*?)```', re.DOTALL)
+REQUIRED_KEYS = ('prompt', 'response')
+
+_decoder = json.JSONDecoder()
+
+
+def _closing_brace(text: str, start: int) -> Optional[int]:
+    """Encontra a chave que fecha o objeto iniciado em `start`."""
+    depth = 0
+    quote = None
+    escaped = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if quote:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == quote:
+                quote = None
+        elif char in '"\'':
+            quote = char
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+    return None
+
+
+def _decode_object(text: str, start: int) -> tuple[Any, int]:
+    """Decodifica o objeto em `start` como JSON ou literal Python.
+
+    Returns:
+        tuple: O objeto (ou None) e a posição em que ele termina.
+    """
+    try:
+        return _decoder.raw_decode(text, start)
+    except ValueError:
+        pass
+
+    end = _closing_brace(text, start)
+    if end is None:
+        return None, start + 1
+    try:
+        return ast.literal_eval(text[start : end + 1]), end + 1
+    except (ValueError, SyntaxError, MemoryError, RecursionError):
+        return None, start + 1
+
+
+def _as_pair(obj: Any) -> Optional[dict[str, str]]:
+    if not isinstance(obj, dict):
+        return None
+    keys = {str(key).lower(): key for key in obj}
+    if not all(key in keys for key in REQUIRED_KEYS):
+        return None
+    return {
+        key: value if isinstance(value, str) else json.dumps(value)
+        for key in REQUIRED_KEYS
+        for value in [obj[keys[key]]]
+    }
+
+
+def parse_pairs(text: Optional[str]) -> tuple[list[dict[str, str]], bool]:
+    """Extrai os pares prompt/response de uma resposta do modelo.
+
+    Tolera blocos de código, aspas simples (como as do próprio template),
+    texto antes ou depois dos objetos, arrays e múltiplos objetos na mesma
+    resposta.
+
+    Args:
+        text (str | None): Conteúdo retornado pelo modelo.
+
+    Returns:
+        tuple[list[dict], bool]: Os pares encontrados e se algum deles
+            precisou de reparo para ser lido.
+    """
+    if not text:
+        return [], False
+
+    try:
+        if pair := _as_pair(json.loads(text)):
+            return [pair], False
+    except ValueError:
+        pass
+
+    pairs = []
+    for block in CODE_FENCE.findall(text) or [text]:
+        position = block.find('{')
+        while position != -1:
+            obj, end = _decode_object(block, position)
+            if pair := _as_pair(obj):
+                pairs.append(pair)
+                position = block.find('{', end)
+            else:
+                position = block.find('{', position + 1)
+
+    return pairs, bool(pairs)
@@ -0,0 +1,106 @@
+from typing import Any, Callable, Optional
+
+from openiziai.schemas import DataDict
+from openiziai.utils import CHARS_PER_TOKEN, count_tokens
+
+
+def _size(value: Any) -> int:
+    return count_tokens(str(value))
+
+
+def _merge_dicts(a: dict, b: dict) -> Optional[dict]:
+    if a.keys() & b.keys():
+        return None
+    return {**a, **b}
+
+
+def _concat(a: Any, b: Any) -> Any:
+    return a + b
+
+
+def _pack(
+    pieces: list[Any],
+    max_tokens: int,
+    merge: Callable[[Any, Any], Optional[Any]],
+) -> list[Any]:
+    """Agrupa pedaços consecutivos enquanto couberem em `max_tokens`.
+
+    O tamanho dos grupos é aproximado pela soma dos tamanhos dos pedaços,
+    evitando serializar os grupos a cada junção.
+    """
+    shards: list[Any] = []
+    sizes: list[int] = []
+    for piece in pieces:
+        size = _size(piece)
+        if shards and sizes[-1] + size <= max_tokens:
+            merged = merge(shards[-1], piece)
+            if merged is not None:
+                shards[-1] = merged
+                sizes[-1] += size
+                continue
+        shards.append(piece)
+        sizes.append(size)
+
+    return shards
+
+
+def _split(value: Any, max_tokens: int) -> list[Any]:
+    if _size(value) <= max_tokens:
+        return [value]
+
+    if isinstance(value, dict):
+        pieces = [
+            {key: piece}
+            for key, item in value.items()
+            for piece in _split(item, max_tokens)
+        ]
+        return _pack(pieces, max_tokens, _merge_dicts)
+
+    if isinstance(value, (list, tuple)):
+        pieces = [
+            [piece] for item in value for piece in _split(item, max_tokens)
+        ]
+        return _pack(pieces, max_tokens, _concat)
+
+    if isinstance(value, str):
+        lines = value.splitlines(keepends=True)
+        if len(lines) > 1:
+            pieces = [
+                piece for line in lines for piece in _split(line, max_tokens)
+            ]
+        else:
+            step = max_tokens * CHARS_PER_TOKEN
+            pieces = [value[i : i + step] for i in range(0, len(value), step)]
+        return _pack(pieces, max_tokens, _concat)
+
+    return [value]
+
+
+def shard_data(data: DataDict, max_tokens: int) -> list[DataDict]:
+    """Divide `data['data']` em shards de até `max_tokens` tokens.
+
+    Dicionários são divididos por chaves, listas por itens e textos por
+    linhas, recursivamente, até que cada shard caiba no limite. O limite é
+    aproximado e um valor indivisível maior que o limite forma um shard
+    sozinho.
+
+    Args:
+        data (DataDict): Dados utilizados para construir o dado de treino.
+        max_tokens (int): Máximo aproximado de tokens de cada shard.
+
+    Returns:
+        list[DataDict]: Shards no formato DataDict.
+    """
+    return [{'data': shard} for shard in _split(data['data'], max_tokens)]
+
+
+def distribute(n_examples: int, n_shards: int) -> list[int]:
+    """Distribui `n_examples` entre `n_shards` da forma mais igual possível.
+
+    Os exemplos que sobram da divisão vão para shards espaçados igualmente,
+    de forma que, com mais shards que exemplos, os shards usados cobrem
+    todo o dataset e não apenas o início.
+    """
+    base, remainder = divmod(n_examples, n_shards)
+    extra = {i * n_shards // remainder for i in range(remainder)}
+    return [base + (i in extra) for i in range(n_shards)]
@@ -1,23 +1,73 @@
+import functools
 import json
-import random
+import logging
+import os
+from collections import Counter
 from datetime import datetime
+from http import HTTPStatus
 from math import ceil
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Iterator, Optional
 from uuid import uuid4
 
-import trio
-from openai import OpenAI
+import anyio
+from anyio.streams.memory import (
+    MemoryObjectReceiveStream,
+    MemoryObjectSendStream,
+)
 from pydantic import (
     BaseModel,
     ConfigDict,
     Field,
+    PositiveInt,
     PrivateAttr,
 )
+from pydantic.dataclasses import dataclass
 
+from openiziai.backends import LLMClient
+from openiziai.concurrency import AdaptiveConcurrency
+from openiziai.ledger import BudgetExceeded, UsageLedger
+from openiziai.metrics import (
+    EventType,
+    Hook,
+    emit,
+    timed,
+    usage_fields,
+)
+from openiziai.pricing import estimate_cost
+from openiziai.rate_limit import RateLimiter
+from openiziai.replay import ReplayMiss
 from openiziai.schemas import DataDict
 from openiziai.task import Task
-from openiziai.utils import exponential_backoff
+from openiziai.utils import (
+    TOKENS_PER_MESSAGE,
+    count_message_tokens,
+    exponential_backoff,
+)
+
+from .batch import batch_request, iter_batch_results, wait_for_batch
+from .context_selection import ContextSelector, RandomContextSelector
+from .dedup import NearDuplicateIndex
+from .filters import FilterStage
+from .parsing import parse_pairs
+from .sharding import distribute, shard_data
+
+MAX_ATTEMPTS_PER_EXAMPLE = 3
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TrainDataPlan:
+    """Projeção de custo e tempo para criar os dados de treino."""
+
+    n_examples: int
+    n_requests: int
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    cost: float | None
+    min_duration: float
 
 
 class TrainDataTool(BaseModel):
@@ -27,7 +77,7 @@ class TrainDataTool(BaseModel):
     em uma task contendo: backstory, role e o goal.
     """
 
-    client: OpenAI = Field(default=None, description='Client da OpenAI.')
+    client: LLMClient = Field(default=None, description='Client da OpenAI.')
     data: DataDict = Field(
         description='Dados utilizados para construir o dado de treino.',
     )
@@ -38,13 +88,65 @@ class TrainDataTool(BaseModel):
         default='gpt-3.5-turbo-125',
         description='Modelo GPT que criará o dado de fine tuning.',
     )
+    flush_every: PositiveInt = Field(
+        default=1,
+        description='Quantidade de exemplos acumulados antes de gravar.',
+    )
+    fsync: bool = Field(
+        default=False,
+        description='Se cada gravação deve ser sincronizada com o disco.',
+    )
+    rate_limiter: Optional[RateLimiter] = Field(
+        default=None,
+        description='Rate limiter compartilhado entre as requisições.',
+    )
+    deduplicator: Optional[NearDuplicateIndex] = Field(
+        default=None,
+        description='Índice que rejeita exemplos quase duplicados.',
+    )
+    context_selector: Callable[[], ContextSelector] = Field(
+        default=RandomContextSelector,
+        description='Fábrica da estratégia de seleção do contexto.',
+    )
+    max_context_tokens: Optional[PositiveInt] = Field(
+        default=None,
+        description='Máximo de tokens de contexto por requisição.',
+    )
+    shard_max_tokens: Optional[PositiveInt] = Field(
+        default=None,
+        description='Máximo de tokens dos dados enviados por requisição.',
+    )
+    samples_per_request: PositiveInt = Field(
+        default=1,
+        description='Quantidade de exemplos retornados por requisição.',
+    )
+    hooks: list[Hook] = Field(
+        default_factory=list,
+        description='Hooks que recebem os eventos da execução.',
+    )
+    adaptive_concurrency: Optional[AdaptiveConcurrency] = Field(
+        default=None,
+        description='Controle adaptativo das requisições simultâneas.',
+    )
+    ledger: Optional[UsageLedger] = Field(
+        default=None,
+        description='Ledger que registra o uso e aplica os limites.',
+    )
+    filters: Optional[FilterStage] = Field(
+        default=None,
+        description='Filtros de qualidade aplicados antes da gravação.',
+    )
 
     _n_examples: int = PrivateAttr(default=None)
     _n_batch: int = PrivateAttr(default=None)
+    _limiter: anyio.CapacityLimiter = PrivateAttr(default=None)
+    _batch_id: str = PrivateAttr(default=None)
     _root: Path = PrivateAttr(default_factory=Path.cwd)
     _train_data_dir: Path
     _template: str
     _hash: str = PrivateAttr(default_factory=uuid4)
+    _metrics: Counter[str] = PrivateAttr(default_factory=Counter)
+    _budget_exceeded: bool = PrivateAttr(default=False)
 
     model_config = ConfigDict(arbitrary_types_allowed=True)
 
@@ -52,11 +154,47 @@ class TrainDataTool(BaseModel):
         """Cria um novo modelo analisando e validando o input.
 
         Args:
-            client (OpenAI): Client da OpenAI.
+            client (LLMClient): Client da OpenAI ou outro backend que
+                implemente `LLMClient`.
             data (DataDict): Dados utilizados para construir o dado de treino.
             task (Task): Descrição da task que o modelo treinado irá executar.
             model (str): Modelo GPT usado para criar os dados de treino.
                 Padrão gpt-3.5-turbo-125.
+            flush_every (int): Quantidade de exemplos acumulados antes de
+                gravar no arquivo. Padrão 1.
+            fsync (bool): Se cada gravação deve ser sincronizada com o disco.
+                Padrão False.
+            rate_limiter (RateLimiter | None): Rate limiter compartilhado
+                entre os workers e Agentes.
+            deduplicator (NearDuplicateIndex | None): Índice compartilhado
+                entre os batches que rejeita exemplos quase duplicados, que
+                são criados novamente.
+            context_selector (Callable[[], ContextSelector]): Fábrica da
+                estratégia que escolhe os exemplos anteriores usados como
+                contexto. Cada batch cria o seu seletor. Padrão
+                `RandomContextSelector`.
+            max_context_tokens (int | None): Máximo de tokens de contexto por
+                requisição.
+            shard_max_tokens (int | None): Quando definido, `data['data']` é
+                dividido em shards de até `shard_max_tokens` tokens e cada
+                requisição envia apenas um shard. Os exemplos são
+                distribuídos igualmente entre os shards.
+            samples_per_request (int): Quantidade de exemplos retornados em
+                cada requisição através do parâmetro `n`. O custo do prompt é
+                dividido entre os exemplos. Padrão 1.
+            hooks (list[Hook]): Hooks chamados a cada evento da execução,
+                como `ProgressHook` e `HistogramHook`.
+            adaptive_concurrency (AdaptiveConcurrency | None): Quando
+                definido, as requisições simultâneas começam em
+                `max_concurrency` (ou `n_batch`) e são ajustadas pela latência
+                e pelos erros 429. Os exemplos continuam divididos em
+                `n_batch` batches, que limitam as requisições em andamento.
+            ledger (UsageLedger | None): Registra o uso de tokens de cada
+                requisição. Quando o limite do ledger é atingido, a criação
+                para e os exemplos já criados são mantidos.
+            filters (FilterStage | None): Filtros de qualidade aplicados aos
+                exemplos antes da gravação, em um pool de processos. Os
+                exemplos rejeitados são criados novamente.
         """
         super().__init__(**data)
         self._template = """You are generating data which will be used to train a machine learning model.
@@ -89,19 +227,117 @@ class TrainDataTool(BaseModel):
 
         return dir
 
-    @exponential_backoff()
+    def _system_prompt(self, data: Optional[DataDict] = None) -> str:
+        description = dict(
+            backstory=self.task.backstory,
+            role=self.task.role,
+            goal=self.task.goal,
+            **(data or self.data),
+        )
+        return self._template.format(description=description)
+
+    async def _chat_completion(
+        self,
+        messages: list[dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+    ) -> Any:
+        """Executa uma chamada de chat completion sem bloquear o event loop.
+
+        O client da OpenAI é síncrono, então a chamada é executada em uma
+        thread do anyio limitada pelo `CapacityLimiter` da execução.
+        """
+        kwargs = dict(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            n=self.samples_per_request,
+        )
+        create = self.client.chat.completions.create
+        if self.rate_limiter:
+            create = functools.partial(
+                self.rate_limiter.chat_completion, self.client
+            )
+        if self.ledger is not None:
+            create = functools.partial(
+                self.ledger.chat_completion,
+                create,
+                task=self.task.role,
+                job=str(self.id),
+            )
+        self._emit(EventType.REQUEST_START)
+        try:
+            result, latency = await anyio.to_thread.run_sync(
+                functools.partial(timed, create, **kwargs),
+                limiter=self._limiter,
+            )
+        except Exception as e:
+            self._emit(EventType.REQUEST_ERROR, error=type(e).__name__)
+            raise
+        self._emit(
+            EventType.REQUEST_END, latency=latency, **usage_fields(result)
+        )
+        return result
+
+    @exponential_backoff(no_retry=(BudgetExceeded, ReplayMiss))
+    async def _request_examples(
+        self,
+        messages: list[dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+    ) -> list[dict[str, Any]]:
+        """Cria os exemplos prompt/response de uma requisição.
+
+        Cada requisição retorna `samples_per_request` exemplos. O retry é
+        aplicado por requisição, de forma que uma falha não descarta os
+        exemplos já criados no batch.
+        """
+        result = await self._chat_completion(messages, temperature, max_tokens)
+
+        return [
+            example
+            for choice in result.choices
+            for example in self._parse_examples(choice.message.content)
+        ]
+
+    def _parse_examples(self, content: Optional[str]) -> list[dict[str, Any]]:
+        """Converte uma resposta do modelo nos exemplos de treino.
+
+        Respostas que precisaram de reparo ou que não puderam ser lidas são
+        contabilizadas em `metrics`, sem refazer a requisição.
+        """
+        pairs, repaired = parse_pairs(content)
+        if not pairs:
+            self._emit(EventType.PARSE_FAILURE)
+            return []
+        if repaired:
+            self._emit(EventType.PARSE_REPAIR)
+
+        return [
+            {
+                'messages': [
+                    {'role': 'system', 'content': self.task.short_backstory},
+                    {'role': 'user', 'content': pair['prompt']},
+                    {'role': 'assistant', 'content': pair['response']},
+                ]
+            }
+            for pair in pairs
+        ]
+
     async def create_examples(  # noqa
         self,
         n_examples: int,
         temperature: float,
         max_tokens: int,
         max_context_length: int,
-        sender: trio.abc.SendChannel[list[dict[str, str]]],
+        sender: MemoryObjectSendStream[dict[str, Any]],
+        data: Optional[DataDict] = None,
     ) -> None:
         """Cria exemplos com o par: prompt/response.
 
         Utilizando um modelo GPT, cria exemplos com o par prompt/response no
-            formato de json.
+            formato de json. Cada exemplo é publicado assim que é criado.
 
         Args:
             n_examples (int): Número de exemplos que serão criados.
@@ -113,89 +349,231 @@ class TrainDataTool(BaseModel):
             max_context_length (int): Quantidade de exemplos que devem ser
                 usados como contexto ao criar o próximo.
             sender (SendChannel): Canal de Pub par aplicar o Pub/Sub.
+            data (DataDict | None): Dados enviados no prompt. Padrão `data`
+                da instância.
         """
-        description = dict(
-            backstory=self.task.backstory,
-            role=self.task.role,
-            goal=self.task.goal,
-            **self.data,
-        )
-        prompt = self._template.format(description=description)
-
-        short_system = {'role': 'system', 'content': self.task.short_backstory}
+        system = {'role': 'system', 'content': self._system_prompt(data)}
+        selector = self.context_selector()
+        n_created = 0
+        attempts = 0
+        max_attempts = n_examples * MAX_ATTEMPTS_PER_EXAMPLE
+        n_requests = ceil(n_examples / self.samples_per_request)
 
-        examples = []
-
-        for _ in range(n_examples):
-            context = (
-                [
-                    {'role': 'assistant', 'content': example}
-                    for example in examples
-                ]
-                if len(examples) <= max_context_length
-                else [
-                    {'role': 'assistant', 'content': example}
-                    for example in random.sample(examples, 8)
+        async with sender:
+            while (
+                n_created < n_examples
+                and attempts < max_attempts
+                and not self._budget_exceeded
+            ):
+                attempts += 1
+                if attempts > n_requests:
+                    self._emit(EventType.RETRY)
+                context = [
+                    {'role': 'assistant', 'content': content}
+                    for content in selector.select(
+                        max_context_length, self.max_context_tokens
+                    )
                 ]
-            )
-
-            messages = [
-                {
-                    'role': 'system',
-                    'content': prompt,
-                }
-            ] + context
+                messages = [system, *context]
 
-            result = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,  # pyright: ignore
-                temperature=temperature,
-                max_tokens=max_tokens,
-            )
+                try:
+                    examples = await self._request_examples(
+                        messages, temperature, max_tokens
+                    )
+                except BudgetExceeded:
+                    self._budget_exceeded = True
+                    break
 
-            _response = result.choices[0].message.content
-            if not _response:
-                print('Algo de errado aconteceu ao criar o prompt.')
-                continue
-            response = json.loads(_response)
-            example = {
-                'messages': [
-                    short_system,
-                    {'role': 'user', 'content': response.get('prompt')},
-                    {
-                        'role': 'assistant',
-                        'content': response.get('response'),
-                    },
-                ]
-            }
+                rejections = await self._check_examples(examples)
+                for example, rejection in zip(examples, rejections):
+                    if (
+                        n_created >= n_examples
+                        or rejection
+                        or self._is_duplicate(example)
+                    ):
+                        continue
 
-            examples.append(example)
-        async with sender:
-            await sender.send(examples)
+                    n_created += 1
+                    selector.add(self._example_pair(example))
+                    await sender.send(example)
 
-    async def create_train_file(self, receiver: trio.abc.ReceiveChannel):
+    async def create_train_file(self, receiver: MemoryObjectReceiveStream):
         """Salva os exemplos gerados em um arquivo jsonl.
 
-        Método Sub do sistema Pub/Sub.
+        Método Sub do sistema Pub/Sub. Um único writer mantém o arquivo aberto
+        e grava os exemplos a cada `flush_every` recebidos, servindo como
+        journal para retomar a execução.
 
         Args:
             receiver (ReceiveChannel): Canal de receive do sistema de Pub/Sub.
         """
-        self._file = (
+        buffer: list[str] = []
+
+        async with (
+            receiver,
+            await anyio.open_file(self._file, 'a', encoding='utf-8') as file,
+        ):
+            async for result in receiver:
+                buffer.append(json.dumps(result) + '\n')
+                if len(buffer) >= self.flush_every:
+                    await self._flush(file, buffer)
+
+            if buffer:
+                await self._flush(file, buffer)
+
+    async def _flush(self, file: Any, buffer: list[str]) -> None:
+        await file.write(''.join(buffer))
+        await file.flush()
+        if self.fsync:
+            await anyio.to_thread.run_sync(os.fsync, file.fileno())
+        for _ in buffer:
+            self._emit(EventType.EXAMPLE_WRITTEN)
+        buffer.clear()
+
+    async def _check_examples(
+        self, examples: list[dict[str, Any]]
+    ) -> list[Optional[str]]:
+        """Nome do filtro que rejeitou cada exemplo, ou None."""
+        if self.filters is None:
+            return [None] * len(examples)
+
+        return self._report_rejections(
+            await self.filters.check(list(map(self._pair, examples)))
+        )
+
+    def _report_rejections(
+        self, rejections: list[Optional[str]]
+    ) -> list[Optional[str]]:
+        for rejection in filter(None, rejections):
+            self._emit(EventType.EXAMPLE_REJECTED, error=rejection)
+        return rejections
+
+    def _emit(self, type: EventType, **fields: Any) -> None:
+        self._metrics[type.value] += 1
+        hooks = self.hooks
+        if self.adaptive_concurrency is not None:
+            hooks = [*hooks, self.adaptive_concurrency]
+        emit(hooks, type, **fields)
+
+    @staticmethod
+    def _pair(example: dict[str, Any]) -> tuple[str, str]:
+        _, prompt, response = example['messages']
+        return str(prompt['content'] or ''), str(response['content'] or '')
+
+    def _example_pair(self, example: dict[str, Any]) -> str:
+        prompt, response = self._pair(example)
+        return json.dumps(
+            {'prompt': prompt, 'response': response}, ensure_ascii=False
+        )
+
+    @staticmethod
+    def _example_text(example: dict[str, Any]) -> str:
+        return '\n'.join(
+            str(message.get('content') or '')
+            for message in example['messages']
+            if message.get('role') != 'system'
+        )
+
+    def _is_duplicate(self, example: dict[str, Any]) -> bool:
+        if self.deduplicator is None:
+            return False
+        return not self.deduplicator.add(self._example_text(example))
+
+    def _index_examples(self, file: Path) -> None:
+        """Adiciona os exemplos de um arquivo existente no deduplicador."""
+        with open(file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    example = json.loads(line)
+                except ValueError:
+                    continue
+                self.deduplicator.add(  # pyright: ignore
+                    self._example_text(example)
+                )
+
+    def _split_batches(
+        self, n_examples: int, n_batch: int
+    ) -> list[list[tuple[DataDict, int]]]:
+        """Divide os exemplos em batches de pares (dados, quantidade).
+
+        Sem sharding, os exemplos são distribuídos igualmente entre os batches,
+        cada um com todos os dados. Com sharding, os shards e suas cotas são
+        distribuídos entre os batches.
+        """
+        if not self.shard_max_tokens:
+            return [
+                [(self.data, quota)]
+                for quota in distribute(n_examples, n_batch)
+                if quota
+            ]
+
+        shards = shard_data(self.data, self.shard_max_tokens)
+        jobs = [
+            (shard, quota)
+            for shard, quota in zip(
+                shards, distribute(n_examples, len(shards))
+            )
+            if quota
+        ]
+        return [jobs[i::n_batch] for i in range(n_batch)]
+
+    async def _create_batch(  # noqa
+        self,
+        batch: list[tuple[DataDict, int]],
+        temperature: float,
+        max_tokens: int,
+        max_context_length: int,
+        sender: MemoryObjectSendStream[dict[str, Any]],
+    ) -> None:
+        async with sender:
+            for data, n_examples in batch:
+                await self.create_examples(
+                    n_examples,
+                    temperature,
+                    max_tokens,
+                    max_context_length,
+                    sender.clone(),
+                    data=data,
+                )
+
+    def _prepare_train_file(self, resume: Optional[Path | str]) -> Path:
+        if resume:
+            return Path(resume)
+
+        file = (
             self._train_data_dir
             / f'train_{self.id}_{datetime.now().strftime("%Y%m%d")}.jsonl'
         )
+        if file.exists():
+            file.unlink()
 
-        if self._file.exists():
-            self._file.unlink()
+        return file
+
+    @staticmethod
+    def _count_examples(file: Path) -> int:
+        """Conta os exemplos completos de um arquivo de treino.
 
-        async with receiver:
-            async for results in receiver:
-                async with await trio.open_file(
-                    self._file, 'a', encoding='utf-8'
-                ) as file:
-                    for result in results:
-                        await file.write(json.dumps(result) + '\n')
+        Uma linha incompleta no final do arquivo, deixada por uma execução
+        interrompida, é removida.
+        """
+        if not file.exists():
+            return 0
+
+        count = 0
+        valid_size = 0
+        with open(file, 'rb+') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                valid_size += len(line)
+                try:
+                    json.loads(line)
+                except ValueError:
+                    continue
+                count += 1
+            f.truncate(valid_size)
+
+        return count
 
     async def create_train_data(  # noqa
         self,
@@ -204,11 +582,14 @@ class TrainDataTool(BaseModel):
         temperature: float = 0.5,
         max_tokens: int = 1000,
         max_context_length: int = 8,
+        max_concurrency: Optional[int] = None,
+        resume: Optional[Path | str] = None,
     ) -> str:
         """Cria os dados de treino.
 
         Aplica o sistema de Pub/Sub para criar os exemplos e salvar em um jsonl
-            a medida que os batches de treino ficam prontos.
+            a medida que os exemplos de treino ficam prontos. Roda no event
+            loop de quem chama, seja asyncio ou trio.
 
         Args:
             n_examples (int): Número de exemplos que devem ser criados.
@@ -221,30 +602,60 @@ class TrainDataTool(BaseModel):
                 terá maior custo.
             max_context_length (int): Quantidade de exemplos que devem ser
                 usados como contexto ao criar o próximo.
+            max_concurrency (int | None): Máximo de requisições simultâneas
+                à API. Com `adaptive_concurrency`, é o limite inicial. Padrão
+                `n_batch`.
+            resume (Path | str | None): Arquivo de treino de uma execução
+                anterior. Os exemplos já existentes são mantidos e apenas os
+                que faltam para completar `n_examples` são criados.
 
         Returns:
             str: Nome do arquivo JSONL criado.
         """
-        sender, receiver = trio.open_memory_channel(0)
+        sender, receiver = anyio.create_memory_object_stream[dict[str, Any]](
+            n_batch
+        )
         self._n_batch = n_batch
-        _n_examples = ceil(n_examples / self._n_batch)
-        self._n_examples = _n_examples * self._n_batch
-
-        async with trio.open_nursery() as nursery:
-            async with sender, receiver:
-                for _ in range(self._n_batch):
-                    nursery.start_soon(
-                        self.create_examples,
-                        _n_examples,
-                        temperature,
-                        max_tokens,
-                        max_context_length,
-                        sender.clone(),
-                    )
-                    nursery.start_soon(
-                        self.create_train_file,
-                        receiver.clone(),
+        if self.adaptive_concurrency is not None:
+            self._limiter = self.adaptive_concurrency.limiter(
+                max_concurrency or n_batch
+            )
+        else:
+            self._limiter = anyio.CapacityLimiter(max_concurrency or n_batch)
+        self._file = self._prepare_train_file(resume)
+        n_done = self._count_examples(self._file) if resume else 0
+        if n_done and self.deduplicator is not None:
+            self._index_examples(self._file)
+        batches = self._split_batches(max(n_examples - n_done, 0), n_batch)
+        total = n_done + sum(quota for batch in batches for _, quota in batch)
+
+        self._budget_exceeded = False
+        self._emit(EventType.RUN_START, total=total, done=n_done)
+        try:
+            async with anyio.create_task_group() as task_group:
+                async with sender, receiver:
+                    task_group.start_soon(
+                        self.create_train_file, receiver.clone()
                     )
+                    for batch in batches:
+                        task_group.start_soon(
+                            self._create_batch,
+                            batch,
+                            temperature,
+                            max_tokens,
+                            max_context_length,
+                            sender.clone(),
+                        )
+        finally:
+            self._emit(EventType.RUN_END)
+            # Duplicados, filtros e falhas de parsing podem deixar menos
+            # exemplos que o planejado.
+            self._n_examples = self._count_examples(self._file)
+        if self._budget_exceeded:
+            logger.warning(
+                'Limite de orçamento atingido. %d exemplos foram criados.',
+                self._n_examples,
+            )
 
         return str(self._file)
 
@@ -252,7 +663,7 @@ class TrainDataTool(BaseModel):
     def n_examples(self) -> Optional[int]:
         """Número de exemplos criados."""
         if not self._n_examples:
-            print(
+            logger.warning(
                 'Você deve criar um dataset de treino com `create_train_data`.'
             )
             return None
@@ -262,7 +673,7 @@ class TrainDataTool(BaseModel):
     def n_batch(self) -> Optional[int]:
         """Número de batches utilizados."""
         if not getattr(self, '_n_batch'):
-            print(
+            logger.warning(
                 'Você deve criar um dataset de treino com `create_train_data`.'
             )
             return None
@@ -275,6 +686,8 @@ class TrainDataTool(BaseModel):
         temperature: float = 0.5,
         max_tokens: int = 1000,
         max_context_length: int = 8,
+        max_concurrency: Optional[int] = None,
+        resume: Optional[Path | str] = None,
     ) -> str:
         """Executa todo o pipeline para criar os dados de treino.
         Args:
@@ -288,26 +701,358 @@ class TrainDataTool(BaseModel):
                 terá maior custo.
             max_context_length (int): Quantidade de exemplos que devem ser
                 usados como contexto ao criar o próximo.
+            max_concurrency (int | None): Máximo de requisições simultâneas
+                à API. Com `adaptive_concurrency`, é o limite inicial. Padrão
+                `n_batch`.
+            resume (Path | str | None): Arquivo de treino de uma execução
+                anterior. Os exemplos já existentes são mantidos e apenas os
+                que faltam para completar `n_examples` são criados.
 
         Returns:
             str: Nome do arquivo JSONL criado.
         """  # noqa
-        file = trio.run(
+        file = anyio.run(
             self.create_train_data,
             n_examples,
             n_batch,
             temperature,
             max_tokens,
             max_context_length,
+            max_concurrency,
+            resume,
+            backend='trio',
         )
 
         return file
 
+    async def acreate_train_data(self, *args: Any, **kwargs: Any) -> str:
+        """Versão assíncrona de `execute` para rodar em um event loop
+        existente.
+
+        Compatível com asyncio e trio, permitindo iniciar a criação dos dados
+        de dentro de um servidor assíncrono, como o FastAPI, sem criar uma
+        thread por execução. Vários `TrainDataTool` podem rodar no mesmo event
+        loop compartilhando o mesmo client. Recebe os mesmos argumentos de
+        `execute`.
+
+        Returns:
+            str: Nome do arquivo JSONL criado.
+        """
+        return await self.create_train_data(*args, **kwargs)
+
+    def _batch_requests(
+        self, n_examples: int, temperature: float, max_tokens: int
+    ) -> Iterator[str]:
+        batches = self._split_batches(n_examples, 1)
+        n_request = 0
+        for data, quota in (job for batch in batches for job in batch):
+            system = {'role': 'system', 'content': self._system_prompt(data)}
+            n_requests = ceil(quota / self.samples_per_request)
+            for i in range(n_requests):
+                user = {
+                    'role': 'user',
+                    'content': f'Generate sample {i + 1} of {n_requests}. '
+                    'It must be different from the other samples.',
+                }
+                body = dict(
+                    model=self.model,
+                    messages=[system, user],
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    n=self.samples_per_request,
+                )
+                yield batch_request(f'{self.id}-{n_request}', body)
+                n_request += 1
+
+    def submit_batch(
+        self,
+        n_examples: int,
+        temperature: float = 0.5,
+        max_tokens: int = 1000,
+    ) -> str:
+        """Envia as requisições para a Batch API da OpenAI.
+
+        Como o contexto não pode depender dos exemplos criados, cada
+        requisição recebe apenas o seu shard dos dados e a sua posição entre
+        os exemplos para incentivar a diversidade.
+
+        Args:
+            n_examples (int): Número de exemplos que devem ser criados.
+            temperature (float): Nível de criatividade do modelo ao criar os
+                exemplos. Padrão 0.5.
+            max_tokens (int): Máximo de tokens que deve conter nas respostas.
+
+        Returns:
+            str: ID do batch criado.
+
+        Raises:
+            ValueError: Se `n_examples` não for positivo, já que a Batch API
+                não aceita um arquivo de input vazio.
+        """
+        if n_examples <= 0:
+            raise ValueError(
+                '`n_examples` deve ser maior que zero para enviar um batch.'
+            )
+
+        input_file = self._train_data_dir / f'batch_input_{self.id}.jsonl'
+        with open(input_file, 'w', encoding='utf-8') as file:
+            for request in self._batch_requests(
+                n_examples, temperature, max_tokens
+            ):
+                file.write(request + '\n')
+
+        with open(input_file, 'rb') as file:
+            input_file_id = self.client.files.create(
+                file=file, purpose='batch'
+            ).id
+
+        self._batch_id = self.client.batches.create(
+            input_file_id=input_file_id,
+            endpoint='/v1/chat/completions',
+            completion_window='24h',
+        ).id
+
+        return self._batch_id
+
+    def execute_batch(  # noqa
+        self,
+        n_examples: int,
+        temperature: float = 0.5,
+        max_tokens: int = 1000,
+        batch_id: Optional[str] = None,
+        poll_interval: float = 5.0,
+        max_poll_interval: float = 300.0,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """Cria os dados de treino utilizando a Batch API da OpenAI.
+
+        Indicado para grandes volumes em que a latência não importa: as
+        requisições têm custo menor e não consomem o rate limit. Os resultados
+        são lidos em streaming e salvos no arquivo de treino.
+
+        Args:
+            n_examples (int): Número de exemplos que devem ser criados.
+            temperature (float): Nível de criatividade do modelo ao criar os
+                exemplos. Padrão 0.5.
+            max_tokens (int): Máximo de tokens que deve conter nas respostas.
+            batch_id (str | None): ID de um batch já enviado. Permite voltar
+                a aguardar um batch após reiniciar o processo.
+            poll_interval (float): Intervalo inicial entre as consultas de
+                status, em segundos.
+            max_poll_interval (float): Intervalo máximo entre as consultas.
+            timeout (float | None): Tempo máximo de espera, em segundos.
+
+        Returns:
+            str: Nome do arquivo JSONL criado.
+        """
+        if batch_id is None and n_examples <= 0:
+            # Nada para enviar: como no `create_train_data`, o arquivo de
+            # treino é criado vazio.
+            self._file = self._prepare_train_file(None)
+            self._file.touch()
+            self._n_batch = 1
+            self._n_examples = 0
+            self._emit(EventType.RUN_START, total=0, done=0)
+            self._emit(EventType.RUN_END)
+            return str(self._file)
+
+        self._batch_id = batch_id or self.submit_batch(
+            n_examples, temperature, max_tokens
+        )
+        batch = wait_for_batch(
+            self.client,
+            self._batch_id,
+            poll_interval=poll_interval,
+            max_poll_interval=max_poll_interval,
+            timeout=timeout,
+        )
+        if not batch.output_file_id:
+            raise RuntimeError(
+                f'Batch {self._batch_id} terminou sem resultados. '
+                f'Status: {batch.status}'
+            )
+
+        self._file = self._prepare_train_file(None)
+        self._n_batch = 1
+        self._n_examples = 0
+        failures = 0
+        self._emit(EventType.RUN_START, total=n_examples, done=0)
+        try:
+            with open(self._file, 'a', encoding='utf-8') as file:
+                for result in iter_batch_results(
+                    self.client, batch.output_file_id
+                ):
+                    response = result.get('response') or {}
+                    status = response.get('status_code')
+                    if result.get('error') or status != HTTPStatus.OK:
+                        failures += 1
+                        continue
+                    if self.ledger is not None:
+                        usage = response['body'].get('usage') or {}
+                        self.ledger.record(
+                            self.model,
+                            usage.get('prompt_tokens', 0),
+                            usage.get('completion_tokens', 0),
+                            task=self.task.role,
+                            job=self._batch_id,
+                        )
+                    for choice in response['body']['choices']:
+                        examples = self._parse_examples(
+                            choice['message']['content']
+                        )
+                        failures += not examples
+                        rejections = (
+                            self._report_rejections(
+                                self.filters.apply(
+                                    list(map(self._pair, examples))
+                                )
+                            )
+                            if self.filters is not None
+                            else [None] * len(examples)
+                        )
+                        for example, rejection in zip(examples, rejections):
+                            if rejection or self._is_duplicate(example):
+                                failures += 1
+                            elif self._n_examples < n_examples:
+                                file.write(json.dumps(example) + '\n')
+                                self._n_examples += 1
+                                self._emit(EventType.EXAMPLE_WRITTEN)
+        finally:
+            self._emit(EventType.RUN_END)
+
+        if failures:
+            logger.warning('%d exemplos do batch foram descartados.', failures)
+
+        return str(self._file)
+
+    @property
+    def metrics(self) -> dict[str, int]:
+        """Quantidade de eventos de cada tipo emitidos pela ferramenta."""
+        return dict(self._metrics)
+
+    @property
+    def batch_id(self) -> Optional[str]:
+        """ID do último batch enviado para a Batch API."""
+        return self._batch_id
+
+    def plan(  # noqa
+        self,
+        n_examples: int,
+        n_batch: int,
+        max_tokens: int = 1000,
+        max_context_length: int = 8,
+        completion_tokens: Optional[int] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        latency: float = 0.0,
+        prices: Optional[tuple[float, float]] = None,
+    ) -> TrainDataPlan:
+        """Projeta os tokens, o custo e o tempo de `execute` sem chamar a API.
+
+        Os tokens do prompt são contados localmente a partir do template com
+        os dados serializados e do crescimento do contexto a cada exemplo.
+
+        Args:
+            n_examples (int): Número de exemplos que devem ser criados.
+            n_batch (int): Número de batches para serem executados de forma
+                concorrente.
+            max_tokens (int): Máximo de tokens que deve conter nas respostas.
+            max_context_length (int): Quantidade de exemplos que devem ser
+                usados como contexto ao criar o próximo.
+            completion_tokens (int | None): Tokens esperados em cada
+                resposta. Padrão `max_tokens`, o pior caso.
+            requests_per_minute (int | None): Limite de requisições por
+                minuto. Padrão o limite do `rate_limiter`.
+            tokens_per_minute (int | None): Limite de tokens por minuto.
+                Padrão o limite do `rate_limiter`.
+            latency (float): Latência esperada de cada requisição, em
+                segundos.
+            prices (tuple[float, float] | None): Preço em USD por 1M de
+                tokens de prompt e de resposta. Padrão o preço conhecido do
+                `model`.
+
+        Returns:
+            TrainDataPlan: Projeção de custo e tempo.
+        """
+        if self.rate_limiter:
+            requests_per_minute = (
+                requests_per_minute or self.rate_limiter.requests_per_minute
+            )
+            tokens_per_minute = (
+                tokens_per_minute or self.rate_limiter.tokens_per_minute
+            )
+        _completion_tokens = completion_tokens or max_tokens
+        example_tokens = _completion_tokens + TOKENS_PER_MESSAGE
+
+        k = self.samples_per_request
+        n_created = 0
+        n_requests = 0
+        prompt_tokens = 0
+        max_batch_requests = 0
+        system_tokens: dict[int, int] = {}
+        for batch in self._split_batches(n_examples, n_batch):
+            batch_requests = 0
+            for data, quota in batch:
+                if id(data) not in system_tokens:
+                    system_tokens[id(data)] = count_message_tokens(
+                        [
+                            {
+                                'role': 'system',
+                                'content': self._system_prompt(data),
+                            }
+                        ],
+                        self.model,
+                    )
+                quota_requests = ceil(quota / k)
+                prompt_tokens += sum(
+                    system_tokens[id(data)]
+                    + self._context_tokens(
+                        min(i * k, max_context_length) * example_tokens
+                    )
+                    for i in range(quota_requests)
+                )
+                batch_requests += quota_requests
+                n_created += quota
+            n_requests += batch_requests
+            max_batch_requests = max(max_batch_requests, batch_requests)
+
+        total_completion_tokens = _completion_tokens * n_requests * k
+        reserved_tokens = prompt_tokens + max_tokens * n_requests * k
+
+        min_duration = max_batch_requests * latency
+        if requests_per_minute:
+            min_duration = max(
+                min_duration, n_requests / requests_per_minute * 60
+            )
+        if tokens_per_minute:
+            min_duration = max(
+                min_duration, reserved_tokens / tokens_per_minute * 60
+            )
+
+        return TrainDataPlan(
+            n_examples=n_created,
+            n_requests=n_requests,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=total_completion_tokens,
+            total_tokens=prompt_tokens + total_completion_tokens,
+            cost=estimate_cost(
+                self.model, prompt_tokens, total_completion_tokens, prices
+            ),
+            min_duration=min_duration,
+        )
+
+    def _context_tokens(self, tokens: int) -> int:
+        if self.max_context_tokens:
+            return min(tokens, self.max_context_tokens)
+        return tokens
+
     @property
     def file(self) -> Optional[str]:
         """Nome do arquivo com os dados de treino."""
         if not hasattr(self, '_file'):
-            print('Nenhum dado de treino foi criado com esta instância.')
+            logger.warning(
+                'Nenhum dado de treino foi criado com esta instância.'
+            )
             return None
         return str(self._file)
 
@@ -0,0 +1,339 @@
+"""Upload de arquivos para a OpenAI: em partes, retomável e com cache."""
+
+import hashlib
+import io
+import json
+import mmap
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Optional
+
+from openai import (
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    InternalServerError,
+    NotFoundError,
+    RateLimitError,
+)
+from pydantic import BaseModel, Field, PrivateAttr
+
+# Tamanho máximo de uma parte na Uploads API.
+PART_SIZE = 64 * 1024 * 1024
+# Erros transitórios em que o envio da parte é refeito.
+RETRY_ERRORS = (
+    APIConnectionError,
+    APITimeoutError,
+    InternalServerError,
+    RateLimitError,
+)
+# Status de arquivos que não podem ser reaproveitados.
+INVALID_FILE_STATUSES = {'deleted', 'error'}
+
+
+def _state_path(path: Path) -> Path:
+    return path.with_name(f'{path.name}.upload.json')
+
+
+def _load_state(
+    state_path: Path, size: int, mtime: float, part_size: int
+) -> Optional[dict[str, Any]]:
+    """Carrega o estado de um upload anterior, ainda não expirado, do mesmo
+    arquivo.
+    """
+    if not state_path.exists():
+        return None
+
+    try:
+        state = json.loads(state_path.read_text(encoding='utf-8'))
+    except ValueError:
+        return None
+    if (state.get('size'), state.get('mtime'), state.get('part_size')) != (
+        size,
+        mtime,
+        part_size,
+    ):
+        return None
+    if (expires_at := state.get('expires_at')) and expires_at <= time.time():
+        return None
+
+    return state
+
+
+def _save_state(state_path: Path, state: Any) -> None:
+    """Grava o estado de forma atômica."""
+    tmp = state_path.with_name(f'{state_path.name}.tmp')
+    tmp.write_text(json.dumps(state), encoding='utf-8')
+    os.replace(tmp, state_path)
+
+
+class _Part(io.RawIOBase):
+    """Leitura de uma fatia do arquivo mapeado, sem copiá-la inteira.
+
+    O client lê a parte em blocos, como um arquivo, e a fatia é liberada ao
+    fechar a leitura.
+    """
+
+    def __init__(self, view: memoryview) -> None:
+        super().__init__()
+        self._view = view
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        start = min(self._position, len(self._view))
+        size = min(len(buffer), len(self._view) - start)
+        buffer[:size] = self._view[start : start + size]
+        self._position = start + size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {
+            io.SEEK_SET: 0,
+            io.SEEK_CUR: self._position,
+            io.SEEK_END: len(self._view),
+        }[whence]
+        self._position = max(base + offset, 0)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        self._view.release()
+        super().close()
+
+
+def _upload_part(
+    client: Any,
+    upload_id: str,
+    data: _Part,
+    retries: int,
+    base_delay: float,
+) -> str:
+    """Envia uma parte, refazendo o envio em erros transitórios."""
+    for attempt in range(retries):
+        try:
+            data.seek(0)
+            return client.uploads.parts.create(upload_id, data=data).id
+        except RETRY_ERRORS:
+            if attempt == retries - 1:
+                raise
+            time.sleep(base_delay * 2**attempt + random.uniform(0, 1))
+
+    raise RuntimeError('`retries` deve ser maior que zero.')
+
+
+def multipart_upload(  # noqa
+    client: Any,
+    path: Path | str,
+    purpose: str = 'fine-tune',
+    part_size: int = PART_SIZE,
+    max_workers: int = 4,
+    retries: int = 5,
+    base_delay: float = 1.0,
+) -> str:
+    """Envia um arquivo em partes paralelas pela Uploads API da OpenAI.
+
+    As partes são lidas em blocos de fatias de um `mmap` do arquivo, sem
+    cópias do tamanho da parte, e enviadas por um pool de threads, cada uma
+    com retry próprio. As partes já enviadas são gravadas em
+    `<arquivo>.upload.json`, de forma que um upload interrompido é retomado
+    do ponto em que parou enquanto o arquivo não mudar e o upload não
+    expirar. O estado é removido ao final ou em um erro que não pode ser
+    refeito, como um upload expirado ou cancelado.
+
+    Args:
+        client (OpenAI): Client da OpenAI.
+        path (Path | str): Arquivo enviado.
+        purpose (str): Propósito do arquivo. Padrão fine-tune.
+        part_size (int): Tamanho de cada parte, em bytes. Padrão 64MB, o
+            máximo da API.
+        max_workers (int): Partes enviadas simultaneamente. Padrão 4.
+        retries (int): Tentativas por parte. Padrão 5.
+        base_delay (float): Espera inicial entre as tentativas, em segundos.
+
+    Returns:
+        str: ID do arquivo criado.
+    """
+    path = Path(path)
+    stat = path.stat()
+    state_path = _state_path(path)
+    state = _load_state(state_path, stat.st_size, stat.st_mtime, part_size)
+    if state is None:
+        upload = client.uploads.create(
+            bytes=stat.st_size,
+            filename=path.name,
+            mime_type='text/jsonl',
+            purpose=purpose,
+        )
+        state = {
+            'upload_id': upload.id,
+            'expires_at': getattr(upload, 'expires_at', None),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'part_size': part_size,
+            'parts': {},
+        }
+        _save_state(state_path, state)
+
+    offsets = range(0, stat.st_size, part_size)
+    parts: dict[str, str] = state['parts']
+    lock = threading.Lock()
+
+    try:
+        with (
+            open(path, 'rb') as file,
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            memoryview(data) as view,
+        ):
+
+            def send(index: int, offset: int) -> None:
+                with _Part(view[offset : offset + part_size]) as part:
+                    part_id = _upload_part(
+                        client, state['upload_id'], part, retries, base_delay
+                    )
+                with lock:
+                    parts[str(index)] = part_id
+                    _save_state(state_path, state)
+
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [
+                    executor.submit(send, index, offset)
+                    for index, offset in enumerate(offsets)
+                    if str(index) not in parts
+                ]
+                for future in futures:
+                    future.result()
+
+        upload = client.uploads.complete(
+            state['upload_id'],
+            part_ids=[parts[str(index)] for index in range(len(offsets))],
+        )
+    except APIStatusError as e:
+        if not isinstance(e, RETRY_ERRORS):
+            # O upload não pode ser retomado.
+            state_path.unlink(missing_ok=True)
+        raise
+    state_path.unlink(missing_ok=True)
+
+    return upload.file.id
+
+
+def file_sha256(path: Path | str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash sha256 de um arquivo, lido em blocos de `chunk_size` bytes."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        while chunk := file.read(chunk_size):
+            digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+class UploadCache(BaseModel):
+    """Índice local dos arquivos já enviados, endereçado pelo conteúdo.
+
+    Relaciona o sha256 de cada arquivo e o seu propósito ao `file_id`
+    remoto. Antes de reaproveitar um `file_id`, o arquivo é consultado com
+    `files.retrieve`, que não transfere o conteúdo, e entradas de arquivos
+    removidos ou com erro são descartadas.
+
+    Examples:
+        >>> cache = UploadCache()
+        >>> FineTuning(..., upload_cache=cache).upload_file_to_openai()
+        >>> # O mesmo arquivo não é enviado novamente
+        >>> FineTuning(..., upload_cache=cache).upload_file_to_openai()
+    """
+
+    path: Path = Field(
+        default=Path('data') / 'uploads.json',
+        description='Arquivo json do índice.',
+    )
+    _index: dict[str, dict[str, Any]] = PrivateAttr(default_factory=dict)
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, **data: Any) -> None:
+        """Cria um novo cache, carregando o índice de `path`.
+
+        Args:
+            path (Path): Arquivo json do índice. Padrão data/uploads.json.
+        """
+        super().__init__(**data)
+        if self.path.exists():
+            try:
+                self._index = json.loads(self.path.read_text(encoding='utf-8'))
+            except ValueError:
+                self._index = {}
+
+    @staticmethod
+    def _key(digest: str, purpose: str) -> str:
+        return f'{purpose}:{digest}'
+
+    def get(
+        self, client: Any, digest: str, purpose: str = 'fine-tune'
+    ) -> Optional[str]:
+        """Busca o `file_id` de um arquivo já enviado e ainda válido.
+
+        Args:
+            client (OpenAI): Client usado na consulta do arquivo.
+            digest (str): sha256 do arquivo.
+            purpose (str): Propósito do arquivo. Padrão fine-tune.
+
+        Returns:
+            str | None: ID do arquivo ou None se precisar ser enviado.
+        """
+        with self._lock:
+            entry = self._index.get(self._key(digest, purpose))
+        if entry is None:
+            return None
+
+        try:
+            remote = client.files.retrieve(entry['file_id'])
+        except NotFoundError:
+            remote = None
+        if (
+            remote is None
+            or remote.status in INVALID_FILE_STATUSES
+            or remote.bytes != entry['bytes']
+        ):
+            self.discard(digest, purpose)
+            return None
+
+        return entry['file_id']
+
+    def put(
+        self,
+        digest: str,
+        file_id: str,
+        size: int,
+        purpose: str = 'fine-tune',
+    ) -> None:
+        """Registra um arquivo enviado."""
+        with self._lock:
+            self._index[self._key(digest, purpose)] = {
+                'file_id': file_id,
+                'bytes': size,
+            }
+            self._save()
+
+    def discard(self, digest: str, purpose: str = 'fine-tune') -> None:
+        """Remove um arquivo do índice."""
+        with self._lock:
+            if self._index.pop(self._key(digest, purpose), None):
+                self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        _save_state(self.path, self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
@@ -1,14 +1,32 @@
 """Ferramentas gerais."""
 
 import functools
+import logging
 import random
+from typing import Any, Optional
 
-from trio import sleep
+from anyio import sleep
 
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover
+    tiktoken = None
 
-def exponential_backoff(retries: int = 64, base_delay: float = 1):
+CHARS_PER_TOKEN = 4
+
+logger = logging.getLogger(__name__)
+TOKENS_PER_MESSAGE = 4
+
+
+def exponential_backoff(
+    retries: int = 64,
+    base_delay: float = 1,
+    no_retry: tuple[type[Exception], ...] = (),
+):
     """Implementa o método de exponential backoff para retries em funções
     assíncronas.
+
+    Exceções de `no_retry` são propagadas sem novas tentativas.
     """
 
     def decorator(func):
@@ -19,7 +37,7 @@ def exponential_backoff(retries: int = 64, base_delay: float = 1):
                 try:
                     return await func(*args, **kwargs)
                 except Exception as e:
-                    if attempt == retries - 1:
+                    if attempt == retries - 1 or isinstance(e, no_retry):
                         raise e
                     delay = base_delay * (2 ** (attempt)) + random.uniform(
                         0, 1
@@ -30,3 +48,54 @@ def exponential_backoff(retries: int = 64, base_delay: float = 1):
         return wrapper
 
     return decorator
+
+
+@functools.lru_cache()
+def _encoding(model: str) -> Any:
+    try:
+        return tiktoken.encoding_for_model(model)  # pyright: ignore
+    except KeyError:
+        return tiktoken.get_encoding('cl100k_base')  # pyright: ignore
+
+
+@functools.lru_cache()
+def _warn_estimate() -> None:
+    logger.warning(
+        '`tiktoken` não está instalado. Os tokens são estimados pelo número '
+        'de caracteres. Instale com `pip install openiziai[tiktoken]`.'
+    )
+
+
+def count_tokens(text: str, model: str = 'gpt-3.5-turbo') -> int:
+    """Conta os tokens de um texto.
+
+    Utiliza o `tiktoken` quando instalado, com o extra `tiktoken`. Caso
+    contrário, estima a quantidade de tokens pelo número de caracteres e
+    registra um aviso na primeira contagem.
+    """
+    if tiktoken is None:
+        _warn_estimate()
+        return -(-len(text) // CHARS_PER_TOKEN)
+
+    return len(_encoding(model).encode(text))
+
+
+def count_message_tokens(
+    messages: list[dict[str, Any]], model: str = 'gpt-3.5-turbo'
+) -> int:
+    """Conta os tokens de uma lista de mensagens no formato de chat."""
+    return sum(
+        count_tokens(str(message.get('content') or ''), model)
+        + TOKENS_PER_MESSAGE
+        for message in messages
+    )
+
+
+def estimate_request_tokens(
+    messages: list[dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    n: int = 1,
+    model: str = 'gpt-3.5-turbo',
+) -> int:
+    """Estima os tokens que uma requisição consome do limite da API."""
+    return count_message_tokens(messages, model) + (max_tokens or 0) * n
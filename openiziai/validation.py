@@ -0,0 +1,171 @@
+"""Validação dos arquivos de treino antes do fine tuning."""
+
+import json
+import math
+import mmap
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+from pydantic import Field
+from pydantic.dataclasses import dataclass
+
+from openiziai.utils import count_message_tokens, count_tokens
+
+# Máximo de tokens por exemplo no fine tuning de cada modelo.
+CONTEXT_LIMITS: dict[str, int] = {
+    'gpt-3.5-turbo': 16385,
+    'gpt-4o': 65536,
+    'gpt-4o-mini': 65536,
+}
+DEFAULT_CONTEXT_LIMIT = 16385
+ROLES = {'system', 'user', 'assistant'}
+MAX_ERRORS = 100
+
+
+def context_limit(model: str) -> int:
+    """Máximo de tokens por exemplo de um modelo pelo maior prefixo
+    conhecido.
+    """
+    name = model.removeprefix('ft:')
+    matches = [prefix for prefix in CONTEXT_LIMITS if name.startswith(prefix)]
+    if not matches:
+        return DEFAULT_CONTEXT_LIMIT
+
+    return CONTEXT_LIMITS[max(matches, key=len)]
+
+
+@dataclass
+class ValidationReport:
+    """Resultado da validação de um arquivo de treino.
+
+    `length_distribution` agrupa a quantidade de tokens dos exemplos em
+    buckets de potências de 2, indexados pelo limite superior do bucket.
+    `errors` guarda o motivo dos primeiros `MAX_ERRORS` exemplos inválidos e
+    `bad_lines` os índices, a partir de 0, de todas as linhas inválidas.
+    """
+
+    n_examples: int = 0
+    bad_lines: list[int] = Field(default_factory=list)
+    errors: dict[int, str] = Field(default_factory=dict)
+    total_tokens: int = 0
+    trainable_tokens: int = 0
+    min_tokens: Optional[int] = None
+    max_tokens: Optional[int] = None
+    length_distribution: dict[int, int] = Field(default_factory=dict)
+
+    @property
+    def is_valid(self) -> bool:
+        """Se o arquivo possui exemplos e nenhuma linha inválida."""
+        return bool(self.n_examples) and not self.bad_lines
+
+    @property
+    def mean_tokens(self) -> Optional[float]:
+        """Média de tokens dos exemplos válidos."""
+        n_valid = self.n_examples - len(self.bad_lines)
+        return self.total_tokens / n_valid if n_valid else None
+
+
+def _check_message(message: Any) -> Optional[str]:
+    """Motivo de uma mensagem não seguir o formato de chat, ou None."""
+    if not isinstance(message, dict):
+        return 'Mensagem não é um objeto.'
+    if message.get('role') not in ROLES:
+        return f'Role inválido: {message.get("role")!r}.'
+    if not isinstance(message.get('content'), str):
+        return 'Mensagem sem `content` em texto.'
+
+    return None
+
+
+def _check_messages(example: Any) -> Optional[str]:
+    """Motivo de um exemplo não seguir o formato de chat, ou None."""
+    if not isinstance(example, dict) or not isinstance(
+        messages := example.get('messages'), list
+    ):
+        return 'Exemplo sem a lista `messages`.'
+    if not messages:
+        return 'Lista `messages` vazia.'
+
+    for message in messages:
+        if reason := _check_message(message):
+            return reason
+
+    if not any(message['role'] == 'assistant' for message in messages):
+        return 'Exemplo sem mensagem do assistant.'
+
+    return None
+
+
+def validate_train_file(
+    path: Path | str,
+    model: str = 'gpt-3.5-turbo',
+    max_tokens: Optional[int] = None,
+) -> ValidationReport:
+    """Valida um arquivo de treino no formato de chat em uma única leitura.
+
+    O arquivo é lido linha a linha através de um `mmap`, de forma que a
+    memória usada não depende do tamanho do arquivo. Cada linha deve ser um
+    json com a lista `messages`, roles válidos, `content` em texto e ao
+    menos uma mensagem do assistant, sem ultrapassar o limite de tokens.
+
+    Args:
+        path (Path | str): Arquivo JSONL de treino.
+        model (str): Modelo usado na contagem de tokens e no limite de
+            tokens por exemplo. Padrão gpt-3.5-turbo.
+        max_tokens (int | None): Máximo de tokens por exemplo. Padrão o
+            limite de `model`.
+
+    Returns:
+        ValidationReport: Tokens, distribuição dos tamanhos e linhas
+            inválidas.
+    """
+    limit = max_tokens or context_limit(model)
+    report = ValidationReport()
+    distribution: Counter[int] = Counter()
+
+    def reject(index: int, reason: str) -> None:
+        report.bad_lines.append(index)
+        if len(report.errors) < MAX_ERRORS:
+            report.errors[index] = reason
+
+    if not Path(path).stat().st_size:
+        return report
+
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for index, line in enumerate(iter(data.readline, b'')):
+                if not line.strip():
+                    continue
+                report.n_examples += 1
+
+                try:
+                    example = json.loads(line)
+                except ValueError:
+                    reject(index, 'Linha não é um json válido.')
+                    continue
+
+                if reason := _check_messages(example):
+                    reject(index, reason)
+                    continue
+
+                messages = example['messages']
+                tokens = count_message_tokens(messages, model)
+                if tokens > limit:
+                    reject(
+                        index, f'Exemplo com {tokens} tokens (máx {limit}).'
+                    )
+                    continue
+
+                report.total_tokens += tokens
+                report.trainable_tokens += sum(
+                    count_tokens(message['content'], model)
+                    for message in messages
+                    if message['role'] == 'assistant'
+                )
+                report.min_tokens = min(report.min_tokens or tokens, tokens)
+                report.max_tokens = max(report.max_tokens or tokens, tokens)
+                distribution[2 ** math.ceil(math.log2(max(tokens, 1)))] += 1
+
+    report.length_distribution = dict(sorted(distribution.items()))
+    return report
@@ -2,6 +2,7 @@ import pytest
 from pydantic import ValidationError
 
 from openiziai.agents import Agent
+from openiziai.rate_limit import RateLimiter
 from openiziai.schemas import GPTModel, Message
 
 
@@ -92,3 +93,22 @@ def test_agent_with_context(openai_chat, valid_task):
         result.response
         == '{"prompt": "Test prompt", "response": "Test response"}'
     )
+
+
+def test_agent_prompt_with_rate_limiter(openai_chat, valid_task):
+    rate_limiter = RateLimiter(requests_per_minute=10)
+    raw = openai_chat.chat.completions.with_raw_response.create.return_value
+    raw.headers = {}
+    raw.parse.return_value = openai_chat.chat.completions.create.return_value
+    agent = Agent(
+        client=openai_chat,
+        task=valid_task,
+        fine_tuned_model='fine-tuned',
+        rate_limiter=rate_limiter,
+    )
+
+    result = agent.prompt(prompt='teste')
+
+    assert result.id == '123'
+    assert agent.rate_limiter is rate_limiter
+    openai_chat.chat.completions.with_raw_response.create.assert_called_once()
@@ -92,6 +92,19 @@ def valid_data_dict():
     return {'data': {'key': 'value'}}
 
 
+@pytest.fixture()
+def valid_train_file(tmp_path):
+    path = tmp_path / 'train.jsonl'
+    example = {
+        'messages': [
+            {'role': 'user', 'content': 'Test prompt'},
+            {'role': 'assistant', 'content': 'Test response'},
+        ]
+    }
+    path.write_text(json.dumps(example) + '\n', encoding='utf-8')
+    return path
+
+
 @pytest.fixture()
 def train_data_tool(openai_chat, valid_task, valid_data_dict):
     return TrainDataTool(
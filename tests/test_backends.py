@@ -0,0 +1,151 @@
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from openai import OpenAI, RateLimitError
+
+from openiziai.agents import Agent
+from openiziai.backends import FakeClient, LLMClient
+from openiziai.fine_tuning import FineTuning
+from openiziai.tools import TrainDataTool
+from openiziai.tools.batch import batch_request, iter_batch_results
+
+
+def test_clients_implement_protocol():
+    assert isinstance(FakeClient(), LLMClient)
+    assert isinstance(MagicMock(spec=OpenAI), LLMClient)
+    assert not isinstance(object(), LLMClient)
+
+
+def test_chat_completion_is_deterministic():
+    messages = [{'role': 'user', 'content': 'Como instalar?'}]
+    expected_choices = 2
+
+    results = [
+        FakeClient(seed=1).chat.completions.create(
+            model='gpt-3.5-turbo', messages=messages, n=expected_choices
+        )
+        for _ in range(2)
+    ]
+
+    assert results[0].usage == results[1].usage
+    assert len(results[0].choices) == expected_choices
+    assert json.loads(results[0].choices[1].message.content) == {
+        'prompt': 'Pergunta 1',
+        'response': 'Resposta 1',
+    }
+
+
+def test_chat_completion_respects_max_tokens():
+    client = FakeClient(completion_tokens=(500, 1000))
+    max_tokens = 100
+
+    result = client.chat.completions.create(
+        model='gpt-3.5-turbo',
+        messages=[{'role': 'user', 'content': 'Oi'}],
+        max_tokens=max_tokens,
+    )
+
+    assert result.usage.completion_tokens == max_tokens
+    assert client.usage['completion_tokens'] == max_tokens
+
+
+def test_chat_completion_simulates_errors():
+    expected_status = 429
+    client = FakeClient(error_rate=1, error_status=expected_status)
+
+    with pytest.raises(RateLimitError) as error:
+        client.chat.completions.with_raw_response.create(
+            model='gpt-3.5-turbo', messages=[]
+        )
+
+    assert error.value.status_code == expected_status
+    assert client.usage == {'requests': 1, 'errors': 1}
+
+
+def test_train_data_tool_with_fake_client(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 20
+    client = FakeClient(latency=(0.001, 0.002))
+    tool = TrainDataTool(client=client, data=valid_data_dict, task=valid_task)
+
+    tool.execute(n_examples, n_batch=4)
+
+    with open(tool.file, encoding='utf-8') as file:
+        assert len(file.readlines()) == n_examples
+    assert client.usage['requests'] == n_examples
+
+
+def test_agent_with_fake_client(valid_task):
+    agent = Agent(
+        client=FakeClient(), task=valid_task, fine_tuned_model='fine-tuned'
+    )
+
+    result = agent.prompt('Como instalar?')
+
+    assert json.loads(result.response)['prompt'] == 'Pergunta 0'
+    assert result.total_tokens
+
+
+def test_fine_tuning_with_fake_client(valid_task, valid_train_file):
+    fine_tuning = FineTuning(
+        client=FakeClient(),
+        task=valid_task,
+        train_file=valid_train_file,
+        cache_ttl=0,
+    )
+
+    fine_tuning.upload_file_to_openai().start()
+
+    statuses = [fine_tuning.status for _ in range(3)]
+    assert statuses == ['QUEUED', 'RUNNING', 'COMPLETED']
+    assert fine_tuning.model.name.startswith('ft:gpt-3.5-turbo')
+
+
+def test_execute_batch_with_fake_client(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 6
+    client = FakeClient()
+    tool = TrainDataTool(client=client, data=valid_data_dict, task=valid_task)
+
+    output_file = tool.execute_batch(n_examples, poll_interval=0)
+
+    with open(output_file, encoding='utf-8') as file:
+        assert len(file.readlines()) == n_examples
+    batch = client.batches.retrieve(tool.batch_id)
+    assert batch.status == 'completed'
+    assert batch.request_counts.completed == n_examples
+    assert not batch.error_file_id
+
+
+def test_fake_batch_writes_failures_to_error_file():
+    client = FakeClient()
+    request = batch_request(
+        'request-0',
+        {
+            'model': 'gpt-3.5-turbo',
+            'messages': [{'role': 'user', 'content': 'Oi'}],
+        },
+    )
+    input_file = client.files.create(
+        file=request.encode('utf-8'), purpose='batch'
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint='/v1/chat/completions',
+        completion_window='24h',
+    )
+    client.error_rate = 1
+
+    while batch.status != 'completed':
+        batch = client.batches.retrieve(batch.id)
+
+    assert not batch.output_file_id
+    assert batch.request_counts.failed == 1
+    [result] = iter_batch_results(client, batch.error_file_id)
+    assert result['custom_id'] == 'request-0'
+    assert result['response']['status_code'] == client.error_status
@@ -0,0 +1,66 @@
+import tracemalloc
+
+from benchmarks.__main__ import compare
+from benchmarks.suites import (
+    bench_agent_prompt,
+    bench_context,
+    bench_train_data,
+    measure,
+)
+
+
+def test_suites_report_results(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 4
+
+    results = [
+        *bench_train_data(n_examples, [1, 2], (0.0, 0.0)),
+        *bench_agent_prompt(2, [0, 3]),
+        *bench_context([0, 3]),
+    ]
+
+    assert [result['name'] for result in results] == [
+        'train_data',
+        'train_data',
+        'agent_prompt',
+        'agent_prompt',
+        'context',
+        'context',
+    ]
+    assert all(result['peak_memory_bytes'] > 0 for result in results)
+    assert results[0]['examples_per_second'] > 0
+
+
+def test_measure_times_without_tracemalloc():
+    expected_size = 1024
+    tracing = []
+
+    def func():
+        tracing.append(tracemalloc.is_tracing())
+        return bytearray(expected_size)
+
+    elapsed, peak = measure(func)
+
+    assert tracing == [False, False, True]
+    assert elapsed > 0
+    assert peak >= expected_size
+
+
+def test_compare_reports_regressions():
+    baseline = {
+        'results': [
+            {'name': 'train_data', 'n_batch': 1, 'examples_per_second': 100},
+            {'name': 'context', 'history_size': 10, 'save_seconds': 1.0},
+        ]
+    }
+    current = {
+        'results': [
+            {'name': 'train_data', 'n_batch': 1, 'examples_per_second': 50},
+            {'name': 'context', 'history_size': 10, 'save_seconds': 1.05},
+        ]
+    }
+
+    regressions = compare(baseline, current, threshold=0.1)
+
+    assert len(regressions) == 1
+    assert 'examples_per_second' in regressions[0]
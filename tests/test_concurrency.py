@@ -0,0 +1,135 @@
+import pytest
+from pydantic import ValidationError
+
+from openiziai.backends import FakeClient
+from openiziai.concurrency import AdaptiveConcurrency
+from openiziai.metrics import Event, EventType
+from openiziai.tools import TrainDataTool
+
+START = Event(type=EventType.REQUEST_START)
+
+
+def _success(latency=0.1):
+    return Event(type=EventType.REQUEST_END, latency=latency)
+
+
+def test_increases_after_stable_round():
+    concurrency = AdaptiveConcurrency()
+    initial = 2
+    concurrency.limiter(initial)
+
+    for _ in range(initial + 1):
+        concurrency(START)
+    for _ in range(initial):
+        concurrency(_success())
+
+    assert concurrency.concurrency == initial + 1
+    assert [change.reason for change in concurrency.changes] == [
+        'start',
+        'increase',
+    ]
+
+
+@pytest.mark.trio()
+async def test_decreases_once_per_window_on_rate_limit():
+    concurrency = AdaptiveConcurrency(decrease=0.5)
+    initial = 8
+    limiter = concurrency.limiter(initial)
+    in_flight = 3
+    for i in range(in_flight):
+        limiter.acquire_on_behalf_of_nowait(i)
+    error = Event(type=EventType.REQUEST_ERROR, error='RateLimitError')
+
+    concurrency(error)
+    concurrency(error)
+
+    assert concurrency.concurrency == initial // 2
+    assert concurrency.changes[-1].reason == 'RateLimitError'
+
+
+def test_keeps_limit_without_waiting_requests():
+    concurrency = AdaptiveConcurrency()
+    initial = 2
+    concurrency.limiter(initial)
+
+    for _ in range(10):
+        concurrency(START)
+        concurrency(_success())
+
+    assert concurrency.concurrency == initial
+    assert len(concurrency.changes) == 1
+
+
+def test_decreases_on_latency_spike():
+    concurrency = AdaptiveConcurrency(smoothing=1, latency_tolerance=2)
+    initial = 4
+    concurrency.limiter(initial)
+
+    concurrency(_success(0.1))
+    concurrency(_success(1.0))
+
+    assert concurrency.concurrency == initial // 2
+    assert concurrency.changes[-1].reason == 'latency'
+
+
+def test_respects_limits():
+    concurrency = AdaptiveConcurrency(min_concurrency=2, max_concurrency=3)
+    expected_max = 3
+
+    concurrency.limiter(10)
+    for _ in range(10):
+        concurrency(_success())
+
+    assert concurrency.concurrency == expected_max
+    concurrency(Event(type=EventType.REQUEST_ERROR, error='APITimeoutError'))
+    assert concurrency.concurrency == concurrency.min_concurrency
+
+
+def test_ignores_other_errors():
+    concurrency = AdaptiveConcurrency()
+    initial = 4
+    concurrency.limiter(initial)
+
+    concurrency(Event(type=EventType.REQUEST_ERROR, error='BadRequestError'))
+
+    assert concurrency.concurrency == initial
+
+
+def test_min_must_not_exceed_max():
+    with pytest.raises(ValidationError):
+        AdaptiveConcurrency(min_concurrency=4, max_concurrency=2)
+
+
+def test_train_data_tool_with_adaptive_concurrency(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 40
+    n_batch = 4
+    concurrency = AdaptiveConcurrency(max_concurrency=8, latency_tolerance=10)
+    tool = TrainDataTool(
+        client=FakeClient(latency=(0.002, 0.002)),
+        data=valid_data_dict,
+        task=valid_task,
+        adaptive_concurrency=concurrency,
+    )
+
+    split_batches = TrainDataTool._split_batches
+    splits = []
+
+    def spy(self, n_examples, n_batch):
+        splits.append(n_batch)
+        return split_batches(self, n_examples, n_batch)
+
+    monkeypatch.setattr(TrainDataTool, '_split_batches', spy)
+
+    tool.execute(n_examples, n_batch, max_concurrency=1)
+
+    with open(tool.file, encoding='utf-8') as file:
+        assert len(file.readlines()) == n_examples
+    assert splits == [n_batch]
+    assert concurrency.changes[0].concurrency == 1
+    assert concurrency.concurrency <= n_batch
+    assert max(change.concurrency for change in concurrency.changes) == (
+        n_batch
+    )
@@ -5,6 +5,7 @@ import pytest
 from openai import OpenAI
 from pydantic import ValidationError
 
+from openiziai.backends import FINE_TUNING_STATUSES, FakeClient
 from openiziai.fine_tuning import FineTuning
 
 
@@ -36,7 +37,7 @@ def test_size_validation_failure(openai_fine_tuning, valid_task):
 
 def test_upload_file_to_openai(fine_tuning):
     with patch('builtins.open', mock_open(read_data='data')):
-        fine_tuning.upload_file_to_openai()
+        fine_tuning.upload_file_to_openai(validate=False)
 
         assert fine_tuning.file_id == 'file-id'
 
@@ -48,7 +49,7 @@ def test_file_id_without_uploaded(fine_tuning):
 
 def test_start_fine_tuning(fine_tuning):
     with patch('builtins.open', mock_open(read_data='data')):
-        fine_tuning.upload_file_to_openai().start()
+        fine_tuning.upload_file_to_openai(validate=False).start()
         assert fine_tuning.job_id == 'job-id'
 
 
@@ -59,7 +60,7 @@ def test_job_id_without_started_fine_tuning(fine_tuning):
 
 def test_retrieve_fine_tuning_status_with_completed(fine_tuning):
     with patch('builtins.open', mock_open(read_data='data')):
-        fine_tuning.upload_file_to_openai().start()
+        fine_tuning.upload_file_to_openai(validate=False).start()
         assert fine_tuning.status == 'COMPLETED'
 
 
@@ -77,7 +78,7 @@ def test_repr_class(fine_tuning, valid_task, openai_fine_tuning):
 
 def test_retrieve_fine_tuned_model(fine_tuning, valid_task):
     with patch('builtins.open', mock_open(read_data='data')):
-        fine_tuning.upload_file_to_openai().start()
+        fine_tuning.upload_file_to_openai(validate=False).start()
         assert fine_tuning.model.name == 'fine-tuned'
         assert fine_tuning.model.task == valid_task
         assert fine_tuning.model.base_model == 'gpt-3.5-turbo'
@@ -116,7 +117,124 @@ def test_retrieve_model_without_completed_job(valid_task):
     )
 
     with patch('builtins.open', mock_open(read_data='data')):
-        fine_tuning.upload_file_to_openai().start()
+        fine_tuning.upload_file_to_openai(validate=False).start()
 
         assert fine_tuning.status == 'FAILED'
         assert not fine_tuning.model
+
+
+@pytest.fixture()
+def fake_fine_tuning(valid_task, valid_train_file):
+    fine_tuning = FineTuning(
+        client=FakeClient(), task=valid_task, train_file=valid_train_file
+    )
+    return fine_tuning.upload_file_to_openai().start()
+
+
+def test_status_is_cached(fake_fine_tuning):
+    statuses = [fake_fine_tuning.status for _ in range(10)]
+
+    assert set(statuses) == {'QUEUED'}
+    assert fake_fine_tuning.client.usage['job_requests'] == 1
+
+
+def test_wait_fires_callbacks_on_transitions(fake_fine_tuning):
+    transitions = []
+    messages = []
+    expected_requests = 6
+
+    with patch('openiziai.fine_tuning.time.sleep') as sleep:
+        model = fake_fine_tuning.wait(
+            poll_interval=1,
+            on_status=lambda old, new: transitions.append((old, new)),
+            on_event=lambda event: messages.append(event.message),
+        )
+
+    assert model.name.startswith('ft:gpt-3.5-turbo')
+    assert transitions == [
+        (None, 'QUEUED'),
+        ('QUEUED', 'RUNNING'),
+        ('RUNNING', 'COMPLETED'),
+    ]
+    assert messages == [
+        'Status: validating_files',
+        'Status: queued',
+        'Status: running',
+        'Status: succeeded',
+    ]
+    assert [e.message for e in fake_fine_tuning.events] == messages
+    assert [c.args[0] for c in sleep.call_args_list] == [1, 1]
+    assert fake_fine_tuning.client.usage['job_requests'] == expected_requests
+
+
+def test_wait_backs_off_without_changes(fine_tuning):
+    client = fine_tuning.client
+    client.fine_tuning.jobs.retrieve.side_effect = [
+        MagicMock(status='running', fine_tuned_model=None)
+    ] * 4 + [MagicMock(status='succeeded', fine_tuned_model='fine-tuned')]
+    client.fine_tuning.jobs.list_events.return_value = MagicMock(
+        data=[], has_more=False
+    )
+
+    with patch('builtins.open', mock_open(read_data='data')):
+        fine_tuning.upload_file_to_openai(validate=False).start()
+    with patch('openiziai.fine_tuning.time.sleep') as sleep:
+        model = fine_tuning.wait(poll_interval=1, max_poll_interval=4)
+
+    assert model.name == 'fine-tuned'
+    assert [c.args[0] for c in sleep.call_args_list] == [1, 2, 4, 4]
+
+
+def test_wait_backs_off_with_new_events_only(fine_tuning):
+    expected_events = 5
+    client = fine_tuning.client
+    client.fine_tuning.jobs.retrieve.side_effect = [
+        MagicMock(status='running', fine_tuned_model=None)
+    ] * 4 + [MagicMock(status='succeeded', fine_tuned_model='fine-tuned')]
+    client.fine_tuning.jobs.list_events.side_effect = [
+        MagicMock(data=[MagicMock(id=f'event-{i}')], has_more=False)
+        for i in range(expected_events)
+    ]
+
+    with patch('builtins.open', mock_open(read_data='data')):
+        fine_tuning.upload_file_to_openai(validate=False).start()
+    with patch('openiziai.fine_tuning.time.sleep') as sleep:
+        fine_tuning.wait(poll_interval=1, max_poll_interval=8)
+
+    assert len(fine_tuning.events) == expected_events
+    assert [c.args[0] for c in sleep.call_args_list] == [1, 2, 4, 8]
+
+
+def test_wait_paginates_new_events(fake_fine_tuning):
+    with (
+        patch('openiziai.fine_tuning.EVENTS_PAGE_SIZE', 1),
+        patch('openiziai.fine_tuning.time.sleep'),
+    ):
+        fake_fine_tuning.wait()
+
+    assert len(fake_fine_tuning.events) == len(FINE_TUNING_STATUSES)
+
+
+def test_wait_timeout(fine_tuning):
+    fine_tuning.client.fine_tuning.jobs.retrieve.return_value = MagicMock(
+        status='running'
+    )
+    fine_tuning.client.fine_tuning.jobs.list_events.return_value = MagicMock(
+        data=[], has_more=False
+    )
+
+    with patch('builtins.open', mock_open(read_data='data')):
+        fine_tuning.upload_file_to_openai(validate=False).start()
+    with (
+        patch('openiziai.fine_tuning.time.sleep'),
+        pytest.raises(TimeoutError, match='RUNNING'),
+    ):
+        fine_tuning.wait(timeout=-1)
+
+
+@pytest.mark.trio()
+async def test_await_job(fake_fine_tuning):
+    model = await fake_fine_tuning.await_job(poll_interval=0)
+
+    assert model.name.startswith('ft:gpt-3.5-turbo')
+    assert fake_fine_tuning.status == 'COMPLETED'
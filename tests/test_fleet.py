@@ -0,0 +1,151 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from openai import APIConnectionError, RateLimitError
+
+from openiziai.backends import FakeClient
+from openiziai.fleet import FineTuningFleet, FineTuningSpec
+
+FINAL_STATUSES = {'succeeded', 'failed', 'cancelled'}
+
+
+@pytest.fixture()
+def specs(valid_task, valid_train_file):
+    return [
+        FineTuningSpec(
+            train_file=valid_train_file,
+            task=valid_task,
+            hyperparameters={'n_epochs': n_epochs},
+        )
+        for n_epochs in range(1, 6)
+    ]
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    now = [0.0]
+
+    def sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(
+        'openiziai.fleet.time',
+        SimpleNamespace(monotonic=lambda: now[0], sleep=sleep),
+    )
+    return now
+
+
+def active_jobs(client):
+    return sum(
+        job.status not in FINAL_STATUSES for job in client._jobs.values()
+    )
+
+
+def test_fleet_respects_max_jobs(specs, monkeypatch, clock):
+    client = FakeClient()
+    max_jobs = 2
+    create_job = FakeClient._create_job
+    active = []
+    epochs = []
+
+    def tracked(self, **kwargs):
+        active.append(active_jobs(self) + 1)
+        epochs.append(kwargs['hyperparameters']['n_epochs'])
+        return create_job(self, **kwargs)
+
+    monkeypatch.setattr(FakeClient, '_create_job', tracked)
+    transitions = []
+    fleet = FineTuningFleet(
+        client=client,
+        max_jobs=max_jobs,
+        on_status=lambda spec, old, new: transitions.append(new),
+    )
+
+    results = list(fleet.run(specs))
+
+    assert len(results) == len(specs)
+    assert all(r.model.name.startswith('ft:gpt-3.5-turbo') for r in results)
+    assert {r.status for r in results} == {'COMPLETED'}
+    assert max(active) == max_jobs
+    assert transitions.count('COMPLETED') == len(specs)
+    assert sorted(epochs) == [
+        spec.hyperparameters['n_epochs'] for spec in specs
+    ]
+
+
+def test_fleet_backs_off_on_job_limit(specs, monkeypatch, clock):
+    client = FakeClient()
+    create_job = FakeClient._create_job
+    rejected = []
+
+    def limited(self, **kwargs):
+        if active_jobs(self):
+            rejected.append(clock[0])
+            raise RateLimitError(
+                'Limite de jobs ativos.',
+                response=MagicMock(status_code=429),
+                body=None,
+            )
+        return create_job(self, **kwargs)
+
+    monkeypatch.setattr(FakeClient, '_create_job', limited)
+
+    fleet = FineTuningFleet(client=client, poll_interval=1)
+    results = list(fleet.run(specs))
+
+    assert len(results) == len(specs)
+    assert all(r.model for r in results)
+    # O limite não volta ao máximo quando um job termina: cada nova
+    # tentativa acima do limite espera o dobro da anterior.
+    gaps = [b - a for a, b in zip(rejected, rejected[1:])]
+    assert all(b > a for a, b in zip(gaps, gaps[1:]))
+
+
+def test_fleet_retries_poll_errors(specs, monkeypatch, clock):
+    retrieve_job = FakeClient._retrieve_job
+    calls = []
+
+    def flaky(self, job_id):
+        calls.append(job_id)
+        if len(calls) % 2:
+            raise APIConnectionError(request=MagicMock())
+        return retrieve_job(self, job_id)
+
+    monkeypatch.setattr(FakeClient, '_retrieve_job', flaky)
+
+    results = list(FineTuningFleet(client=FakeClient()).run(specs))
+
+    assert len(results) == len(specs)
+    assert all(r.model for r in results)
+
+
+def test_fleet_gives_up_after_poll_failures(specs, monkeypatch, clock):
+    max_poll_failures = 3
+    calls = []
+
+    def failing(self, job_id):
+        calls.append(job_id)
+        raise APIConnectionError(request=MagicMock())
+
+    monkeypatch.setattr(FakeClient, '_retrieve_job', failing)
+    fleet = FineTuningFleet(
+        client=FakeClient(), max_poll_failures=max_poll_failures
+    )
+
+    results = list(fleet.run(specs[:2]))
+
+    assert [r.model for r in results] == [None, None]
+    assert all(r.job_id and r.error for r in results)
+    assert sorted(calls) == sorted(
+        [r.job_id for r in results] * max_poll_failures
+    )
+
+
+def test_fleet_reports_upload_errors(specs, tmp_path, clock):
+    missing = specs[0].model_copy(update={'train_file': tmp_path / 'none'})
+
+    results = list(FineTuningFleet(client=FakeClient()).run([missing]))
+
+    assert results[0].model is None
+    assert results[0].error
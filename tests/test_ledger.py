@@ -0,0 +1,164 @@
+import json
+import threading
+
+import pytest
+from openai import InternalServerError
+
+from openiziai.agents import Agent
+from openiziai.backends import FakeClient
+from openiziai.ledger import BudgetExceeded, UsageLedger
+from openiziai.tools import TrainDataTool
+
+MESSAGES = [{'role': 'user', 'content': 'Como instalar?'}]
+
+
+def test_record_persists_and_reloads(tmp_path):
+    path = tmp_path / 'usage.jsonl'
+    ledger = UsageLedger(path=path, session='session-1')
+    expected_tokens = 450
+
+    ledger.record('gpt-4o', 100, 50, task='docs', job='job-1')
+    ledger.record('gpt-3.5-turbo', 200, 100, task='docs', job='job-2')
+
+    reloaded = UsageLedger(path=path)
+    assert reloaded.total_tokens == expected_tokens
+    assert reloaded.total_cost == pytest.approx(ledger.total_cost)
+    assert reloaded.usage(by='task') == {
+        'docs': {
+            'requests': 2,
+            'prompt_tokens': 300,
+            'completion_tokens': 150,
+            'cost': pytest.approx(ledger.total_cost),
+        }
+    }
+    assert set(reloaded.usage(by='job')) == {'job-1', 'job-2'}
+    with open(path, encoding='utf-8') as file:
+        assert json.loads(file.readline())['session'] == 'session-1'
+
+
+def test_reserve_respects_caps():
+    ledger = UsageLedger(max_tokens=100)
+
+    reservation = ledger.reserve('gpt-4o', 40, 40)
+    with pytest.raises(BudgetExceeded):
+        ledger.reserve('gpt-4o', 10, 20)
+
+    ledger.release(reservation)
+    ledger.reserve('gpt-4o', 10, 20)
+
+
+def test_reserve_respects_cost_cap():
+    ledger = UsageLedger(max_cost=0.01)
+    ledger.record('gpt-4', 100, 100)
+
+    with pytest.raises(BudgetExceeded):
+        ledger.reserve('gpt-4', 100, 100)
+
+
+def test_reserve_refuses_unknown_price_with_cost_cap():
+    ledger = UsageLedger(max_cost=1.0)
+
+    with pytest.raises(BudgetExceeded, match='desconhecido'):
+        ledger.reserve('unknown-model', 100, 100)
+    assert UsageLedger(max_tokens=1000).reserve('unknown-model', 100, 100)
+
+
+def test_reserve_uses_custom_prices():
+    ledger = UsageLedger(
+        max_cost=0.01, prices={'unknown-model': (100.0, 100.0)}
+    )
+
+    ledger.reserve('unknown-model', 25, 25)
+    with pytest.raises(BudgetExceeded, match='Limite'):
+        ledger.reserve('unknown-model', 50, 50)
+
+
+def test_chat_completion_records_usage():
+    client = FakeClient()
+    ledger = UsageLedger()
+
+    result = ledger.chat_completion(
+        client.chat.completions.create,
+        task='docs',
+        model='gpt-3.5-turbo',
+        messages=MESSAGES,
+        max_tokens=100,
+    )
+
+    assert ledger.total_tokens == result.usage.total_tokens
+    assert ledger.usage()['gpt-3.5-turbo']['requests'] == 1
+
+
+def test_chat_completion_releases_reservation_on_error():
+    ledger = UsageLedger(max_tokens=1000)
+
+    with pytest.raises(InternalServerError):
+        ledger.chat_completion(
+            FakeClient(error_rate=1).chat.completions.create,
+            model='gpt-3.5-turbo',
+            messages=MESSAGES,
+            max_tokens=900,
+        )
+
+    ledger.reserve('gpt-3.5-turbo', 100, 900)
+    assert ledger.total_tokens == 0
+
+
+def test_record_is_thread_safe(tmp_path):
+    path = tmp_path / 'usage.jsonl'
+    ledger = UsageLedger(path=path)
+    n_threads = 8
+    n_records = 50
+
+    def run():
+        for _ in range(n_records):
+            ledger.record('gpt-4o', 1, 1)
+
+    threads = [threading.Thread(target=run) for _ in range(n_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert ledger.total_tokens == n_threads * n_records * 2
+    with open(path, encoding='utf-8') as file:
+        assert len(file.readlines()) == n_threads * n_records
+
+
+def test_train_data_tool_stops_at_budget(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 20
+    ledger = UsageLedger(max_tokens=2000)
+    tool = TrainDataTool(
+        client=FakeClient(completion_tokens=(100, 100)),
+        data=valid_data_dict,
+        task=valid_task,
+        ledger=ledger,
+    )
+
+    tool.execute(n_examples, n_batch=2, max_tokens=100)
+
+    with open(tool.file, encoding='utf-8') as file:
+        n_written = len(file.readlines())
+    assert 0 < n_written < n_examples
+    assert tool.n_examples == n_written
+    assert ledger.usage(by='task')['Test role']['requests'] == n_written
+    assert ledger.total_tokens <= ledger.max_tokens
+
+
+def test_agent_refuses_prompt_over_budget(valid_task):
+    client = FakeClient()
+    ledger = UsageLedger(max_tokens=100)
+    agent = Agent(
+        client=client,
+        task=valid_task,
+        fine_tuned_model='fine-tuned',
+        ledger=ledger,
+    )
+
+    with pytest.raises(BudgetExceeded):
+        agent.prompt('Como instalar?', max_tokens=1000)
+
+    assert not client.usage
@@ -0,0 +1,126 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+from openai import InternalServerError
+
+from openiziai.agents import Agent
+from openiziai.backends import FakeClient
+from openiziai.metrics import (
+    Event,
+    EventType,
+    HistogramHook,
+    ProgressHook,
+    emit,
+)
+from openiziai.replay import ReplayClient, ReplayMiss
+from openiziai.tools import TrainDataTool
+
+
+def test_histogram_hook_percentiles():
+    hook = HistogramHook(base=0.001, growth=2)
+    latencies = [0.001, 0.002, 0.004, 0.008]
+    expected_p50 = 0.002
+    expected_p99 = 0.008
+
+    for latency in latencies:
+        hook(Event(type=EventType.REQUEST_END, latency=latency))
+
+    assert hook.percentile(50) == expected_p50
+    assert hook.percentile(99) == expected_p99
+    assert hook.counts == {'request_end': len(latencies)}
+
+
+def test_histogram_hook_without_events():
+    summary = HistogramHook().summary()
+
+    assert summary['latency'] == {'p50': None, 'p90': None, 'p99': None}
+    assert summary['examples_per_second'] is None
+
+
+def test_progress_hook_updates_bar():
+    hook = ProgressHook()
+    total = 10
+    done = 4
+
+    with patch('openiziai.metrics.tqdm') as tqdm:
+        emit([hook], EventType.RUN_START, total=total, done=done)
+        emit([hook], EventType.EXAMPLE_WRITTEN)
+        emit([hook], EventType.REQUEST_ERROR, error='RateLimitError')
+        emit([hook], EventType.RUN_END)
+
+    tqdm.assert_called_once_with(
+        total=total, initial=done, desc='Exemplos', unit='ex'
+    )
+    bar = tqdm.return_value
+    bar.update.assert_called_once_with()
+    assert bar.set_postfix.call_args.kwargs['errors'] == 1
+    bar.close.assert_called_once_with()
+
+
+def test_train_data_tool_emits_events(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 6
+    histogram = HistogramHook()
+    tool = TrainDataTool(
+        client=FakeClient(latency=(0.001, 0.002)),
+        data=valid_data_dict,
+        task=valid_task,
+        hooks=[histogram],
+    )
+
+    tool.execute(n_examples, n_batch=2)
+
+    summary = histogram.summary()
+    assert summary['counts'] == {
+        'run_start': 1,
+        'request_start': n_examples,
+        'request_end': n_examples,
+        'example_written': n_examples,
+        'run_end': 1,
+    }
+    assert summary['counts'] == tool.metrics
+    assert summary['tokens']['completion_tokens'] > 0
+    assert summary['latency']['p50'] > 0
+    assert summary['examples_per_second'] > 0
+
+
+def test_train_data_tool_emits_run_end_on_failure(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    histogram = HistogramHook()
+    tool = TrainDataTool(
+        client=ReplayClient(path=tmp_path / 'replay', mode='replay'),
+        data=valid_data_dict,
+        task=valid_task,
+        hooks=[histogram],
+    )
+
+    with pytest.raises(ExceptionGroup) as error:
+        tool.execute(4, n_batch=1)
+
+    assert error.group_contains(ReplayMiss)
+    assert histogram.summary()['counts']['run_end'] == 1
+    assert not tool.n_examples
+
+
+def test_agent_emits_request_error(valid_task):
+    hook = MagicMock()
+    agent = Agent(
+        client=FakeClient(error_rate=1),
+        task=valid_task,
+        fine_tuned_model='fine-tuned',
+        hooks=[hook],
+    )
+
+    with pytest.raises(InternalServerError):
+        agent.prompt('Como instalar?')
+
+    events = [args[0][0] for args in hook.call_args_list]
+    assert [event.type for event in events] == [
+        EventType.REQUEST_START,
+        EventType.REQUEST_ERROR,
+    ]
+    assert events[-1].error == 'InternalServerError'
@@ -0,0 +1,114 @@
+import pytest
+from openai import BadRequestError, InternalServerError
+
+from openiziai.backends import FakeClient
+from openiziai.pool import ClientPool, PoolMember
+from openiziai.rate_limit import RateLimiter
+from openiziai.tools import TrainDataTool
+
+MESSAGES = [{'role': 'user', 'content': 'Como instalar?'}]
+
+
+def _create(pool, n_requests):
+    for _ in range(n_requests):
+        pool.chat.completions.create(model='gpt-3.5-turbo', messages=MESSAGES)
+
+
+def test_distributes_by_weight():
+    pool = ClientPool(
+        members=[
+            PoolMember(client=FakeClient(), weight=3),
+            PoolMember(client=FakeClient()),
+        ]
+    )
+    n_requests = 40
+    expected_requests = [30, 10]
+
+    _create(pool, n_requests)
+
+    assert [m['requests'] for m in pool.status] == expected_requests
+
+
+def test_prefers_member_with_capacity():
+    exhausted = RateLimiter(requests_per_minute=1)
+    exhausted.acquire()
+    pool = ClientPool(
+        members=[
+            PoolMember(client=FakeClient(), rate_limiter=exhausted),
+            PoolMember(client=FakeClient(), rate_limiter=RateLimiter()),
+        ]
+    )
+    n_requests = 5
+
+    _create(pool, n_requests)
+
+    assert [m['requests'] for m in pool.status] == [0, n_requests]
+
+
+def test_failing_member_leaves_rotation(monkeypatch):
+    failing = FakeClient(error_rate=1)
+    pool = ClientPool(
+        members=[
+            PoolMember(client=failing, name='failing', weight=10),
+            PoolMember(client=FakeClient(), name='healthy'),
+        ],
+        failure_threshold=2,
+        cooldown=30,
+    )
+    n_requests = 10
+
+    _create(pool, n_requests)
+
+    failing_status, healthy_status = pool.status
+    assert failing_status['open']
+    assert failing_status['requests'] == pool.failure_threshold
+    assert healthy_status['requests'] == n_requests
+
+    now = 1e9
+    monkeypatch.setattr('openiziai.pool.time.monotonic', lambda: now)
+    failing.error_rate = 0
+    _create(pool, 1)
+    assert not pool.status[0]['open']
+
+
+def test_raises_when_all_members_fail():
+    pool = ClientPool(
+        members=[
+            PoolMember(client=FakeClient(error_rate=1)),
+            PoolMember(client=FakeClient(error_rate=1)),
+        ]
+    )
+
+    with pytest.raises(InternalServerError):
+        _create(pool, 1)
+
+    assert [m['errors'] for m in pool.status] == [1, 1]
+
+
+def test_does_not_failover_on_client_errors():
+    pool = ClientPool(
+        members=[
+            PoolMember(client=FakeClient(error_rate=1, error_status=400)),
+            PoolMember(client=FakeClient()),
+        ]
+    )
+
+    with pytest.raises(BadRequestError):
+        _create(pool, 1)
+
+    assert pool.status[1]['requests'] == 0
+
+
+def test_train_data_tool_with_pool(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 20
+    clients = [FakeClient(), FakeClient(seed=1)]
+    pool = ClientPool(members=[PoolMember(client=c) for c in clients])
+    tool = TrainDataTool(client=pool, data=valid_data_dict, task=valid_task)
+
+    tool.execute(n_examples, n_batch=4)
+
+    assert sum(c.usage['requests'] for c in clients) == n_examples
+    assert all(c.usage['requests'] for c in clients)
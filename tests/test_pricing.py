@@ -0,0 +1,39 @@
+import pytest
+
+from openiziai.pricing import (
+    FINE_TUNED_PRICES,
+    MODEL_PRICES,
+    estimate_cost,
+    model_price,
+)
+
+
+def test_model_price_uses_longest_prefix():
+    assert model_price('gpt-4o-mini-2024-07-18') == MODEL_PRICES['gpt-4o-mini']
+    assert model_price('gpt-4o-2024-08-06') == MODEL_PRICES['gpt-4o']
+
+
+def test_model_price_of_fine_tuned_model():
+    price = model_price('ft:gpt-4o-mini-2024-07-18:org::abc')
+
+    assert price == FINE_TUNED_PRICES['gpt-4o-mini']
+    assert price > MODEL_PRICES['gpt-4o-mini']
+
+
+def test_model_price_of_fine_tuned_model_without_price():
+    assert model_price('ft:gpt-4-turbo:org::abc') is None
+
+
+def test_model_price_unknown_model():
+    assert model_price('unknown-model') is None
+    assert estimate_cost('unknown-model', 100, 100) is None
+
+
+def test_estimate_cost():
+    expected_cost = 2.0
+
+    cost = estimate_cost(
+        'unknown-model', 1_000_000, 500_000, prices=(1.0, 2.0)
+    )
+
+    assert cost == pytest.approx(expected_cost)
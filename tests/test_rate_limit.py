@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from openai import RateLimitError
+
+from openiziai.rate_limit import RateLimiter
+
+
+@pytest.fixture()
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=0.0, sleeps=[])
+
+    def sleep(seconds):
+        clock.sleeps.append(seconds)
+        clock.now += seconds
+
+    monkeypatch.setattr(
+        'openiziai.rate_limit.time',
+        SimpleNamespace(monotonic=lambda: clock.now, sleep=sleep),
+    )
+    return clock
+
+
+def test_acquire_waits_for_requests_per_minute(clock):
+    limiter = RateLimiter(requests_per_minute=2)
+    expected_wait = 30
+
+    limiter.acquire()
+    limiter.acquire()
+    assert not clock.sleeps
+
+    limiter.acquire()
+    assert clock.sleeps == [expected_wait]
+
+
+def test_acquire_waits_for_tokens_per_minute(clock):
+    limiter = RateLimiter(tokens_per_minute=120)
+    expected_wait = 15
+
+    limiter.acquire(90)
+    limiter.acquire(60)
+
+    assert clock.sleeps == [expected_wait]
+
+
+def test_acquire_without_limits(clock):
+    limiter = RateLimiter()
+
+    for _ in range(100):
+        limiter.acquire(1000)
+
+    assert not clock.sleeps
+
+
+def test_update_from_headers(clock):
+    limiter = RateLimiter(requests_per_minute=10, tokens_per_minute=1000)
+    expected_capacity = 20
+    expected_level = 5
+    expected_tokens = 1000
+
+    limiter.update(
+        headers={
+            'x-ratelimit-limit-requests': '20',
+            'x-ratelimit-remaining-requests': '5',
+        }
+    )
+
+    assert limiter._buckets['requests'].capacity == expected_capacity
+    assert limiter._buckets['requests'].level == expected_level
+    assert limiter._buckets['tokens'].level == expected_tokens
+
+
+def test_update_refunds_unused_tokens(clock):
+    limiter = RateLimiter(tokens_per_minute=1000)
+    expected_level = 900
+
+    limiter.acquire(500)
+    limiter.update(usage=MagicMock(total_tokens=100), reserved_tokens=500)
+
+    assert limiter._buckets['tokens'].level == expected_level
+
+
+def test_chat_completion_updates_limits(clock):
+    limiter = RateLimiter(requests_per_minute=100, tokens_per_minute=10000)
+    expected_level = 42
+    client = MagicMock()
+    raw = client.chat.completions.with_raw_response.create.return_value
+    raw.headers = {'x-ratelimit-remaining-tokens': '42'}
+    raw.parse.return_value.usage = MagicMock(total_tokens=10)
+
+    result = limiter.chat_completion(
+        client,
+        model='gpt',
+        messages=[{'role': 'user', 'content': 'teste'}],
+        max_tokens=100,
+    )
+
+    assert result == raw.parse.return_value
+    assert limiter._buckets['tokens'].level == expected_level
+    client.chat.completions.with_raw_response.create.assert_called_once()
+
+
+def test_chat_completion_exhausts_buckets_on_rate_limit(clock):
+    limiter = RateLimiter(requests_per_minute=100)
+    client = MagicMock()
+    client.chat.completions.with_raw_response.create.side_effect = (
+        RateLimitError(
+            'rate limit', response=MagicMock(status_code=429), body=None
+        )
+    )
+
+    with pytest.raises(RateLimitError):
+        limiter.chat_completion(client, messages=[], max_tokens=10)
+
+    assert limiter._buckets['requests'].level <= 0
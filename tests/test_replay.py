@@ -0,0 +1,118 @@
+from functools import partial
+
+import pytest
+
+from openiziai.backends import FakeClient, LLMClient
+from openiziai.rate_limit import RateLimiter
+from openiziai.replay import ReplayClient, ReplayMiss, request_key
+from openiziai.tools import TrainDataTool
+from openiziai.tools.context_selection import RandomContextSelector
+
+MESSAGES = [{'role': 'user', 'content': 'Como instalar?'}]
+REQUEST = {'model': 'gpt-3.5-turbo', 'messages': MESSAGES, 'max_tokens': 100}
+
+
+def test_request_key_normalizes_request():
+    assert request_key(**REQUEST) == request_key(**REQUEST, n=1, seed=1)
+    assert request_key(**REQUEST) != request_key(**REQUEST, temperature=0.5)
+    assert request_key(**REQUEST) != request_key(**REQUEST, n=2)
+
+
+def test_record_then_replay(tmp_path):
+    inner = FakeClient()
+    client = ReplayClient(client=inner, path=tmp_path, mode='record')
+    first = client.chat.completions.create(**REQUEST)
+    second = client.chat.completions.create(**REQUEST)
+
+    replay = ReplayClient(path=tmp_path, mode='replay')
+
+    assert replay.chat.completions.create(**REQUEST) == first
+    assert replay.chat.completions.create(**REQUEST) == second
+    with pytest.raises(ReplayMiss):
+        replay.chat.completions.create(**REQUEST)
+    assert len(replay) == len([first, second])
+    assert replay.stats == {'replayed': 2}
+    assert inner.usage['requests'] == len([first, second])
+
+
+def test_auto_records_only_missing_requests(tmp_path):
+    ReplayClient(client=FakeClient(), path=tmp_path).chat.completions.create(
+        **REQUEST
+    )
+    inner = FakeClient()
+    client = ReplayClient(client=inner, path=tmp_path)
+
+    client.chat.completions.create(**REQUEST)
+    client.chat.completions.create(**REQUEST, temperature=0.5)
+
+    assert client.stats == {'replayed': 1, 'recorded': 1}
+    assert inner.usage['requests'] == 1
+
+
+def test_replay_with_rate_limiter(tmp_path):
+    limiter = RateLimiter(requests_per_minute=100)
+    recorded = limiter.chat_completion(
+        ReplayClient(client=FakeClient(), path=tmp_path), **REQUEST
+    )
+
+    replayed = limiter.chat_completion(
+        ReplayClient(path=tmp_path, mode='replay'), **REQUEST
+    )
+
+    assert replayed == recorded
+
+
+def test_record_mode_requires_client(tmp_path):
+    with pytest.raises(ValueError, match='precisa de um `client`'):
+        ReplayClient(path=tmp_path, mode='record')
+
+
+def test_train_data_tool_replays_pipeline(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 6
+
+    def run(client):
+        tool = TrainDataTool(
+            client=client,
+            data=valid_data_dict,
+            task=valid_task,
+            context_selector=partial(RandomContextSelector, seed=42),
+        )
+        tool.execute(n_examples, n_batch=1)
+        with open(tool.file, encoding='utf-8') as file:
+            return file.read()
+
+    recorded = run(ReplayClient(client=FakeClient(), path=tmp_path / 'r'))
+    replayed = run(ReplayClient(path=tmp_path / 'r', mode='replay'))
+
+    assert replayed == recorded
+    assert len(recorded.splitlines()) == n_examples
+
+
+def test_replay_mode_without_client_is_llm_client(tmp_path):
+    client = ReplayClient(path=tmp_path, mode='replay')
+
+    assert isinstance(client, LLMClient)
+    with pytest.raises(ReplayMiss, match='files.create'):
+        client.files.create(file=b'{}', purpose='batch')
+
+
+def test_execute_batch_through_replay_client(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 4
+    inner = FakeClient()
+    tool = TrainDataTool(
+        client=ReplayClient(client=inner, path=tmp_path / 'r'),
+        data=valid_data_dict,
+        task=valid_task,
+    )
+
+    output_file = tool.execute_batch(n_examples, poll_interval=0)
+
+    with open(output_file, encoding='utf-8') as file:
+        assert len(file.readlines()) == n_examples
+    assert inner.batches.retrieve(tool.batch_id).status == 'completed'
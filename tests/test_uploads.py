@@ -0,0 +1,210 @@
+import hashlib
+import io
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+from openai import NotFoundError
+
+from openiziai.backends import FakeClient
+from openiziai.fine_tuning import FineTuning
+from openiziai.uploads import UploadCache, file_sha256, multipart_upload
+
+PART_SIZE = 10
+
+
+@pytest.fixture()
+def train_file(tmp_path):
+    path = tmp_path / 'train.jsonl'
+    path.write_bytes(
+        b''.join(
+            b'{"messages": [{"role": "assistant", "content": "%d"}]}\n' % i
+            for i in range(20)
+        )
+    )
+    return path
+
+
+@pytest.fixture()
+def n_parts(train_file):
+    return -(-train_file.stat().st_size // PART_SIZE)
+
+
+def test_multipart_upload(train_file, n_parts):
+    client = FakeClient()
+
+    file_id = multipart_upload(
+        client, train_file, part_size=PART_SIZE, max_workers=3
+    )
+
+    assert client._files[file_id] == train_file.read_bytes()
+    assert client.usage['requests'] == n_parts + 2
+    assert not train_file.with_name('train.jsonl.upload.json').exists()
+
+
+def test_multipart_upload_retries_parts(train_file, monkeypatch):
+    client = FakeClient(error_status=500)
+    create_part = FakeClient._create_upload_part
+    attempts = []
+
+    def flaky(self, upload_id, *, data):
+        attempts.append(upload_id)
+        self.error_rate = 1.0 if len(attempts) % 2 else 0.0
+        try:
+            return create_part(self, upload_id, data=data)
+        finally:
+            self.error_rate = 0.0
+
+    monkeypatch.setattr(FakeClient, '_create_upload_part', flaky)
+    with patch('openiziai.uploads.time.sleep') as sleep:
+        file_id = multipart_upload(
+            client, train_file, part_size=PART_SIZE, max_workers=1
+        )
+
+    assert client._files[file_id] == train_file.read_bytes()
+    assert client.usage['errors'] == sleep.call_count == len(attempts) / 2
+
+
+def test_multipart_upload_resumes(train_file, n_parts, monkeypatch):
+    client = FakeClient()
+    create_part = FakeClient._create_upload_part
+    n_sent = 3
+
+    def interrupted(self, upload_id, *, data):
+        if self.usage['requests'] > n_sent:
+            raise KeyboardInterrupt
+        return create_part(self, upload_id, data=data)
+
+    with monkeypatch.context() as m:
+        m.setattr(FakeClient, '_create_upload_part', interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            multipart_upload(
+                client, train_file, part_size=PART_SIZE, max_workers=1
+            )
+
+    state = train_file.with_name('train.jsonl.upload.json')
+    assert len(json.loads(state.read_text())['parts']) == n_sent
+    requests = client.usage['requests']
+
+    file_id = multipart_upload(client, train_file, part_size=PART_SIZE)
+
+    assert client._files[file_id] == train_file.read_bytes()
+    assert client.usage['requests'] - requests == n_parts - n_sent + 1
+
+
+def test_multipart_upload_streams_parts(train_file, monkeypatch):
+    create_part = FakeClient._create_upload_part
+    sent = []
+
+    def tracked(self, upload_id, *, data):
+        sent.append(data)
+        return create_part(self, upload_id, data=data)
+
+    monkeypatch.setattr(FakeClient, '_create_upload_part', tracked)
+    client = FakeClient()
+
+    file_id = multipart_upload(client, train_file, part_size=PART_SIZE)
+
+    assert client._files[file_id] == train_file.read_bytes()
+    assert all(isinstance(data, io.RawIOBase) for data in sent)
+    assert all(data.closed for data in sent)
+
+
+def test_multipart_upload_ignores_expired_state(train_file, n_parts):
+    client = FakeClient()
+    state = train_file.with_name('train.jsonl.upload.json')
+    stat = train_file.stat()
+    state.write_text(
+        json.dumps({
+            'upload_id': 'upload-expired',
+            'expires_at': int(time.time()) - 1,
+            'size': stat.st_size,
+            'mtime': stat.st_mtime,
+            'part_size': PART_SIZE,
+            'parts': {},
+        })
+    )
+
+    file_id = multipart_upload(client, train_file, part_size=PART_SIZE)
+
+    assert client._files[file_id] == train_file.read_bytes()
+    assert client.usage['requests'] == n_parts + 2
+
+
+def test_multipart_upload_drops_state_of_dead_upload(train_file, monkeypatch):
+    client = FakeClient()
+    create_part = FakeClient._create_upload_part
+
+    def cancelled(self, upload_id, *, data):
+        self._uploads[upload_id] = self._uploads[upload_id].model_copy(
+            update={'status': 'cancelled'}
+        )
+        return create_part(self, upload_id, data=data)
+
+    with monkeypatch.context() as m:
+        m.setattr(FakeClient, '_create_upload_part', cancelled)
+        with pytest.raises(NotFoundError):
+            multipart_upload(client, train_file, part_size=PART_SIZE)
+
+    assert not train_file.with_name('train.jsonl.upload.json').exists()
+    file_id = multipart_upload(client, train_file, part_size=PART_SIZE)
+    assert client._files[file_id] == train_file.read_bytes()
+
+
+def test_fine_tuning_uses_multipart_for_large_files(valid_task, train_file):
+    fine_tuning = FineTuning(
+        client=FakeClient(),
+        task=valid_task,
+        train_file=train_file,
+        multipart_threshold=PART_SIZE,
+    )
+
+    with patch('openiziai.fine_tuning.multipart_upload') as upload:
+        upload.return_value = 'file-multipart'
+        fine_tuning.upload_file_to_openai()
+
+    assert fine_tuning.file_id == 'file-multipart'
+    upload.assert_called_once_with(
+        fine_tuning.client, train_file, max_workers=4
+    )
+
+
+def test_file_sha256(train_file):
+    expected = hashlib.sha256(train_file.read_bytes()).hexdigest()
+
+    assert file_sha256(train_file, chunk_size=PART_SIZE) == expected
+
+
+def test_upload_cache_skips_identical_files(valid_task, train_file, tmp_path):
+    client = FakeClient()
+    cache_file = tmp_path / 'uploads.json'
+
+    def upload():
+        return FineTuning(
+            client=client,
+            task=valid_task,
+            train_file=train_file,
+            upload_cache=UploadCache(path=cache_file),
+        ).upload_file_to_openai()
+
+    first = upload()
+    requests = client.usage['requests']
+    second = upload()
+
+    assert second.file_id == first.file_id
+    assert client.usage['requests'] == requests
+    assert len(client._files) == 1
+
+
+def test_upload_cache_discards_missing_files(train_file, tmp_path):
+    cache = UploadCache(path=tmp_path / 'uploads.json')
+    digest = file_sha256(train_file)
+    cache.put(digest, 'file-missing', train_file.stat().st_size)
+
+    assert cache.get(FakeClient(), digest) is None
+    assert not len(cache)
+    assert (
+        UploadCache(path=tmp_path / 'uploads.json').get(FakeClient(), digest)
+        is None
+    )
@@ -3,7 +3,13 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from openiziai.utils import exponential_backoff
+from openiziai import utils
+from openiziai.utils import (
+    count_message_tokens,
+    count_tokens,
+    estimate_request_tokens,
+    exponential_backoff,
+)
 
 
 @pytest.mark.trio()
@@ -67,3 +73,39 @@ async def test_exponential_backoff_success_after_retry():
     result = await decorated_func()
     assert result == 'success'
     assert attempts == max_attempt
+
+
+def test_estimate_request_tokens():
+    messages = [{'role': 'user', 'content': 'teste'}]
+    max_tokens = 100
+    n = 2
+
+    tokens = estimate_request_tokens(messages, max_tokens, n)
+
+    assert tokens == count_message_tokens(messages) + max_tokens * n
+    assert count_message_tokens(messages) > 0
+
+
+@pytest.mark.trio()
+async def test_exponential_backoff_no_retry():
+    mock_func = MagicMock(side_effect=ValueError('Failure'))
+
+    @exponential_backoff(retries=3, base_delay=0.1, no_retry=(ValueError,))
+    async def func():
+        await mock_func()
+
+    with pytest.raises(ValueError, match='Failure'):
+        await func()
+    assert mock_func.call_count == 1
+
+
+def test_count_tokens_warns_once_without_tiktoken(monkeypatch, caplog):
+    monkeypatch.setattr(utils, 'tiktoken', None)
+    utils._warn_estimate.cache_clear()
+    expected_tokens = 3
+
+    tokens = [count_tokens('a' * 10) for _ in range(3)]
+
+    assert tokens == [expected_tokens] * 3
+    assert len(caplog.records) == 1
+    assert 'tiktoken' in caplog.records[0].getMessage()
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from openiziai.fine_tuning import FineTuning
+from openiziai.validation import context_limit, validate_train_file
+
+
+def example(prompt='Como instalar?', response='pip install openiziai'):
+    return {
+        'messages': [
+            {'role': 'system', 'content': 'Short backstory'},
+            {'role': 'user', 'content': prompt},
+            {'role': 'assistant', 'content': response},
+        ]
+    }
+
+
+@pytest.fixture()
+def train_file(tmp_path):
+    lines = [
+        json.dumps(example()),
+        '{"messages": [',
+        json.dumps({'messages': example()['messages'][:2]}),
+        json.dumps(example(response='x' * 400)),
+        '',
+        json.dumps({'messages': [{'role': 'bot', 'content': 'Oi'}]}),
+        json.dumps(example()),
+    ]
+    path = tmp_path / 'train.jsonl'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+
+def test_validate_train_file(train_file):
+    expected_examples = 6
+    expected_bad_lines = [1, 2, 5]
+    expected_valid = 3
+
+    report = validate_train_file(train_file)
+
+    assert report.n_examples == expected_examples
+    assert report.bad_lines == expected_bad_lines
+    assert report.errors[2] == 'Exemplo sem mensagem do assistant.'
+    assert report.errors[5] == "Role inválido: 'bot'."
+    assert not report.is_valid
+    assert report.total_tokens > report.trainable_tokens > 0
+    assert sum(report.length_distribution.values()) == expected_valid
+    assert report.min_tokens < report.max_tokens
+    assert report.mean_tokens == report.total_tokens / expected_valid
+
+
+def test_validate_train_file_token_limit(train_file):
+    expected_line = 3
+
+    report = validate_train_file(train_file, max_tokens=50)
+
+    assert expected_line in report.bad_lines
+    assert report.errors[expected_line].startswith('Exemplo com')
+
+
+def test_validate_empty_file(tmp_path):
+    path = tmp_path / 'train.jsonl'
+    path.touch()
+
+    assert not validate_train_file(path).is_valid
+
+
+def test_context_limit():
+    expected_mini = 65536
+    expected_default = 16385
+
+    assert context_limit('gpt-4o-mini-2024-07-18') == expected_mini
+    assert context_limit('unknown') == expected_default
+
+
+def test_upload_validates_train_file(
+    openai_fine_tuning, valid_task, train_file
+):
+    fine_tuning = FineTuning(
+        client=openai_fine_tuning, task=valid_task, train_file=train_file
+    )
+
+    with pytest.raises(ValueError, match='3 de 6 exemplos inválidos'):
+        fine_tuning.upload_file_to_openai()
+
+    assert fine_tuning.report.bad_lines == [1, 2, 5]
+    assert not openai_fine_tuning.files.create.called
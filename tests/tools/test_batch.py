@@ -0,0 +1,46 @@
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from openiziai.tools.batch import batch_request, wait_for_batch
+
+
+def test_batch_request():
+    body = {'model': 'gpt', 'messages': []}
+
+    request = json.loads(batch_request('request-1', body))
+
+    assert request == {
+        'custom_id': 'request-1',
+        'method': 'POST',
+        'url': '/v1/chat/completions',
+        'body': body,
+    }
+
+
+def test_wait_for_batch_backs_off_while_status_is_unchanged():
+    client = MagicMock()
+    client.batches.retrieve.side_effect = [
+        MagicMock(status='validating'),
+        MagicMock(status='in_progress'),
+        MagicMock(status='in_progress'),
+        MagicMock(status='in_progress'),
+        MagicMock(status='completed'),
+    ]
+
+    with patch('openiziai.tools.batch.time.sleep') as sleep:
+        batch = wait_for_batch(
+            client, 'batch-id', poll_interval=1, max_poll_interval=3
+        )
+
+    assert batch.status == 'completed'
+    assert [c.args[0] for c in sleep.call_args_list] == [1, 1, 2, 3]
+
+
+def test_wait_for_batch_timeout():
+    client = MagicMock()
+    client.batches.retrieve.return_value = MagicMock(status='in_progress')
+
+    with pytest.raises(TimeoutError):
+        wait_for_batch(client, 'batch-id', poll_interval=0, timeout=0)
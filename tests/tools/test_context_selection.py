@@ -0,0 +1,78 @@
+import pytest
+from pydantic import ValidationError
+
+from openiziai.tools import MMRContextSelector, RandomContextSelector
+
+
+def test_random_selector_returns_all_while_pool_is_small():
+    selector = RandomContextSelector()
+    texts = [f'exemplo {i}' for i in range(3)]
+    for text in texts:
+        selector.add(text)
+
+    assert selector.select(8) == texts
+
+
+def test_random_selector_samples_k_examples():
+    selector = RandomContextSelector(seed=1)
+    k = 4
+    for i in range(20):
+        selector.add(f'exemplo {i}')
+
+    selected = selector.select(k)
+
+    assert len(selected) == k
+    assert len(set(selected)) == k
+
+
+def test_random_selector_memory_is_bounded():
+    pool_size = 10
+    selector = RandomContextSelector(pool_size=pool_size, seed=1)
+    for i in range(1000):
+        selector.add(f'exemplo {i}')
+
+    assert len(selector._pool) == pool_size
+
+
+def test_random_selector_respects_max_tokens():
+    selector = RandomContextSelector()
+    expected_len = 2
+    for _ in range(5):
+        selector.add('a' * 40)
+
+    assert len(selector.select(5, max_tokens=25)) == expected_len
+
+
+def test_mmr_selector_prefers_diverse_examples():
+    selector = MMRContextSelector(diversity=0.7)
+    texts = [
+        'como instalar a biblioteca openiziai',
+        'como instalar a biblioteca openiziai com pip',
+        'como criar um agente especializado',
+        'como instalar a biblioteca openiziai no python',
+    ]
+    for text in texts:
+        selector.add(text)
+
+    selected = selector.select(2)
+
+    assert selected == [texts[2], texts[3]]
+
+
+def test_mmr_selector_evicts_old_examples():
+    pool_size = 3
+    selector = MMRContextSelector(pool_size=pool_size)
+    for i in range(5):
+        selector.add(f'exemplo {i}')
+
+    assert selector.select(10) == ['exemplo 2', 'exemplo 3', 'exemplo 4']
+    assert selector._df.total() == pool_size * 2
+
+
+def test_mmr_selector_empty():
+    assert MMRContextSelector().select(8) == []
+
+
+def test_mmr_invalid_diversity():
+    with pytest.raises(ValidationError):
+        MMRContextSelector(diversity=2)
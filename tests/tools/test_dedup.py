@@ -0,0 +1,62 @@
+import pytest
+from pydantic import ValidationError
+
+from openiziai.tools import NearDuplicateIndex
+
+
+def test_add_rejects_near_duplicates():
+    index = NearDuplicateIndex()
+    text = (
+        'Como instalar a biblioteca openiziai no meu projeto python? '
+        'Basta executar pip install openiziai no terminal do seu ambiente '
+        'virtual e importar a biblioteca no seu código.'
+    )
+
+    assert index.add(text)
+    assert not index.add(text + ' Simples!')
+    assert index.rejected == 1
+    assert len(index) == 1
+
+
+def test_add_accepts_different_texts():
+    index = NearDuplicateIndex()
+    expected_len = 2
+
+    assert index.add('Como criar um agente especializado com o openiziai?')
+    assert index.add('Qual o tamanho máximo do arquivo de fine tuning?')
+    assert len(index) == expected_len
+    assert not index.rejected
+
+
+def test_is_duplicate_does_not_index():
+    index = NearDuplicateIndex()
+    text = 'O que é uma task no openiziai?'
+
+    assert not index.is_duplicate(text)
+    index.add(text)
+
+    assert index.is_duplicate(text)
+    assert len(index) == 1
+
+
+def test_signature_is_deterministic():
+    text = 'Texto de teste para assinatura'
+
+    assert NearDuplicateIndex(seed=1).signature(text) == (
+        NearDuplicateIndex(seed=1).signature(text)
+    )
+
+
+def test_invalid_bands():
+    with pytest.raises(ValidationError):
+        NearDuplicateIndex(num_perm=64, bands=10)
+
+
+def test_index_scales_to_many_texts():
+    index = NearDuplicateIndex()
+    n_texts = 2000
+
+    for i in range(n_texts):
+        index.add(f'exemplo número {i} com conteúdo {i * 7919} único')
+
+    assert len(index) + index.rejected == n_texts
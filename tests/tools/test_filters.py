@@ -0,0 +1,94 @@
+import pytest
+
+from openiziai.backends import FakeClient
+from openiziai.tools import (
+    EchoFilter,
+    EmptyFilter,
+    FilterStage,
+    LanguageFilter,
+    LengthFilter,
+    TrainDataTool,
+)
+
+PROMPT = 'Como instalar o openiziai?'
+RESPONSE = 'Basta executar o comando pip install openiziai no terminal.'
+
+
+def test_empty_filter():
+    assert EmptyFilter()(PROMPT, RESPONSE)
+    assert not EmptyFilter()(PROMPT, '  ')
+
+
+def test_length_filter():
+    assert LengthFilter(max_tokens=100)(PROMPT, RESPONSE)
+    assert not LengthFilter(max_tokens=2)(PROMPT, RESPONSE)
+    assert not LengthFilter(min_tokens=100)(PROMPT, RESPONSE)
+
+
+def test_echo_filter():
+    assert EchoFilter()(PROMPT, RESPONSE)
+    assert not EchoFilter()(PROMPT, f'{PROMPT.lower()}')
+
+
+def test_language_filter():
+    english = 'You should run the install command and it is done.'
+
+    assert LanguageFilter()(PROMPT, RESPONSE)
+    assert not LanguageFilter()('How to install?', english)
+    assert LanguageFilter(language='en')('How to install?', english)
+    assert LanguageFilter()('openiziai', 'pip install openiziai')
+
+
+def short_response(prompt, response):
+    return len(response) > 10  # noqa: PLR2004
+
+
+@pytest.mark.trio()
+async def test_filter_stage_reports_rejections():
+    stage = FilterStage(filters=[EmptyFilter(), short_response])
+    pairs = [(PROMPT, RESPONSE), (PROMPT, ''), (PROMPT, 'pip')]
+
+    rejections = await stage.check(pairs)
+
+    assert rejections == [None, 'EmptyFilter', 'short_response']
+    assert stage.checked == len(pairs)
+    assert {name: r['rejected'] for name, r in stage.report.items()} == {
+        'EmptyFilter': 1,
+        'short_response': 1,
+    }
+    assert all(r['seconds'] >= 0 for r in stage.report.values())
+
+
+def test_filter_stage_apply_in_process():
+    stage = FilterStage(processes=False)
+
+    assert stage.apply([(PROMPT, RESPONSE), (PROMPT, PROMPT)]) == [
+        None,
+        'EchoFilter',
+    ]
+
+
+def test_train_data_tool_regenerates_rejected_examples(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    n_examples = 4
+    contents = iter(['', 'Resposta'] * n_examples)
+    client = FakeClient(
+        content=lambda i, messages: (
+            f'{{"prompt": "Pergunta {i}", "response": "{next(contents)}"}}'
+        )
+    )
+    tool = TrainDataTool(
+        client=client,
+        data=valid_data_dict,
+        task=valid_task,
+        filters=FilterStage(filters=[EmptyFilter()], processes=False),
+    )
+
+    tool.execute(n_examples, n_batch=1)
+
+    with open(tool.file, encoding='utf-8') as file:
+        assert len(file.readlines()) == n_examples
+    assert tool.metrics['example_rejected'] == n_examples
+    assert tool.filters.report['EmptyFilter']['rejected'] == n_examples
@@ -0,0 +1,52 @@
+import pytest
+
+from openiziai.tools.parsing import parse_pairs
+
+PAIR = {'prompt': 'Como instalar?', 'response': 'pip install openiziai'}
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        '{"prompt": "Como instalar?", "response": "pip install openiziai"}',
+        '{"Prompt": "Como instalar?", "Response": "pip install openiziai"}',
+    ],
+)
+def test_parse_pairs_with_valid_json(content):
+    assert parse_pairs(content) == ([PAIR], False)
+
+
+@pytest.mark.parametrize(
+    'content',
+    [
+        '```json\n{"prompt": "Como instalar?", '
+        '"response": "pip install openiziai"}\n```',
+        "{'prompt': 'Como instalar?', 'response': 'pip install openiziai'}",
+        'Aqui está: {"prompt": "Como instalar?", '
+        '"response": "pip install openiziai"} Espero ter ajudado!',
+    ],
+)
+def test_parse_pairs_repairs_content(content):
+    assert parse_pairs(content) == ([PAIR], True)
+
+
+def test_parse_pairs_with_multiple_objects():
+    content = (
+        '[{"prompt": "Como instalar?", "response": "pip install openiziai"},'
+        " {'prompt': 'E o {contexto}?', 'response': 'Use o ContextHandler'}]"
+    )
+
+    pairs, repaired = parse_pairs(content)
+
+    assert pairs == [
+        PAIR,
+        {'prompt': 'E o {contexto}?', 'response': 'Use o ContextHandler'},
+    ]
+    assert repaired
+
+
+@pytest.mark.parametrize(
+    'content', [None, '', 'Não sei responder.', '{"prompt": "Sem resposta"}']
+)
+def test_parse_pairs_without_pairs(content):
+    assert parse_pairs(content) == ([], False)
@@ -0,0 +1,67 @@
+from openiziai.tools import shard_data
+from openiziai.tools.sharding import distribute
+from openiziai.utils import count_tokens
+
+
+def test_shard_small_data_returns_single_shard(valid_data_dict):
+    assert shard_data(valid_data_dict, 1000) == [valid_data_dict]
+
+
+def test_shard_list_respects_max_tokens():
+    max_tokens = 50
+    data = {'data': [f'item número {i} do dataset' for i in range(100)]}
+
+    shards = shard_data(data, max_tokens)
+
+    assert len(shards) > 1
+    assert [item for s in shards for item in s['data']] == data['data']
+    assert all(count_tokens(str(s['data'])) <= max_tokens for s in shards)
+
+
+def test_shard_nested_dict():
+    max_tokens = 40
+    data = {
+        'data': {
+            'nome': 'openiziai',
+            'docs': [f'documento {i} com texto' for i in range(30)],
+        }
+    }
+
+    shards = shard_data(data, max_tokens)
+
+    assert shards[0]['data']['nome'] == 'openiziai'
+    assert [
+        item for s in shards for item in s['data'].get('docs', [])
+    ] == data['data']['docs']
+
+
+def test_shard_long_text():
+    max_tokens = 10
+    text = 'a' * 200
+
+    shards = shard_data({'data': text}, max_tokens)
+
+    assert ''.join(s['data'] for s in shards) == text
+    assert all(count_tokens(s['data']) <= max_tokens for s in shards)
+
+
+def test_distribute():
+    assert distribute(10, 3) == [4, 3, 3]
+    assert distribute(2, 4) == [1, 0, 1, 0]
+    assert distribute(3, 9) == [1, 0, 0, 1, 0, 0, 1, 0, 0]
+
+
+def test_split_batches_uses_late_shards(train_data_tool):
+    n_examples = 3
+    train_data_tool.data = {
+        'data': [f'documento {i} do dataset' for i in range(30)]
+    }
+    train_data_tool.shard_max_tokens = 10
+    shards = shard_data(train_data_tool.data, 10)
+
+    batches = train_data_tool._split_batches(n_examples, 2)
+
+    used = [shards.index(data) for batch in batches for data, _ in batch]
+    assert len(shards) > n_examples
+    assert sum(quota for batch in batches for _, quota in batch) == n_examples
+    assert max(used) >= len(shards) * 2 // 3
@@ -1,12 +1,23 @@
+import asyncio
 import json
 import shutil
+import threading
+import time
 from pathlib import Path
-from unittest.mock import AsyncMock, call
+from unittest.mock import AsyncMock, MagicMock, call, patch
 
 import pytest
+import trio
 from pydantic import ValidationError
 
-from openiziai.tools import TrainDataTool
+from openiziai.backends import FakeClient
+from openiziai.rate_limit import RateLimiter
+from openiziai.tools import (
+    MMRContextSelector,
+    NearDuplicateIndex,
+    TrainDataTool,
+)
+from openiziai.utils import count_message_tokens
 
 
 @pytest.mark.trio()
@@ -23,13 +34,12 @@ async def test_create_examples(train_data_tool):
             {'role': 'assistant', 'content': 'Test response'},
         ]
     }
-    expected_messages = 10 * [expected_message]
 
     await train_data_tool.create_examples(
         n_examples, temperature, max_tokens, max_context_length, sender
     )
 
-    assert sender.send.await_args_list == [call(expected_messages)]
+    assert sender.send.await_args_list == n_examples * [call(expected_message)]
 
 
 @pytest.mark.trio()
@@ -105,3 +115,432 @@ def test_repr(train_data_tool, valid_task):
         f'file=None'
         ')'
     )
+
+
+@pytest.mark.trio()
+async def test_create_train_data_runs_batches_concurrently(
+    train_data_tool, openai_chat
+):
+    delay = 0.05
+    n_examples = 8
+    n_batch = 4
+    max_concurrency = 2
+    in_flight = 0
+    peak = 0
+    lock = threading.Lock()
+    response = openai_chat.chat.completions.create.return_value
+
+    def slow_create(**kwargs):
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(delay)
+        with lock:
+            in_flight -= 1
+        return response
+
+    openai_chat.chat.completions.create.side_effect = slow_create
+
+    start = time.monotonic()
+    await train_data_tool.create_train_data(
+        n_examples, n_batch, max_concurrency=max_concurrency
+    )
+    elapsed = time.monotonic() - start
+
+    assert peak == max_concurrency
+    assert elapsed < n_examples * delay
+    shutil.rmtree(Path().cwd() / 'data' / 'train')
+
+
+@pytest.mark.trio()
+async def test_create_train_data_with_resume(train_data_tool, tmp_path):
+    n_examples = 5
+    n_done = 3
+    example = {
+        'messages': [
+            {'role': 'system', 'content': 'Short backstory'},
+            {'role': 'user', 'content': 'Old prompt'},
+            {'role': 'assistant', 'content': 'Old response'},
+        ]
+    }
+    resume_file = tmp_path / 'train.jsonl'
+    resume_file.write_text(
+        n_done * (json.dumps(example) + '\n') + '{"messages": [',
+        encoding='utf-8',
+    )
+
+    output_file = await train_data_tool.create_train_data(
+        n_examples, 1, resume=resume_file
+    )
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert output_file == str(resume_file)
+    assert len(lines) == n_examples
+    assert lines[:n_done] == n_done * [example]
+    assert (
+        train_data_tool.client.chat.completions.create.call_count
+        == n_examples - n_done
+    )
+    assert train_data_tool.n_examples == n_examples
+
+
+@pytest.mark.trio()
+async def test_create_train_file_with_flush_policy(train_data_tool, tmp_path):
+    train_data_tool.flush_every = 2
+    train_data_tool.fsync = True
+    train_data_tool._file = tmp_path / 'train.jsonl'
+    n_examples = 5
+    expected_fsyncs = 3
+    sender, receiver = trio.open_memory_channel(n_examples)
+    async with sender:
+        for i in range(n_examples):
+            await sender.send({'example': i})
+
+    with patch('openiziai.tools.train_data.os.fsync') as fsync:
+        await train_data_tool.create_train_file(receiver)
+
+    with open(train_data_tool._file, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert lines == [{'example': i} for i in range(n_examples)]
+    assert fsync.call_count == expected_fsyncs
+
+
+@pytest.mark.trio()
+async def test_create_train_data_with_rate_limiter(
+    train_data_tool, openai_chat
+):
+    n_examples = 4
+    completions = openai_chat.chat.completions
+    raw = completions.with_raw_response.create.return_value
+    raw.headers = {}
+    raw.parse.return_value = completions.create.return_value
+    train_data_tool.rate_limiter = RateLimiter(requests_per_minute=100)
+
+    output_file = await train_data_tool.create_train_data(n_examples, 2)
+
+    assert completions.with_raw_response.create.call_count == n_examples
+    assert not completions.create.called
+    assert len(Path(output_file).read_text().splitlines()) == n_examples
+    shutil.rmtree(Path().cwd() / 'data' / 'train')
+
+
+@pytest.mark.trio()
+async def test_create_examples_regenerates_duplicates(
+    train_data_tool, openai_chat
+):
+    sender = AsyncMock()
+    n_examples = 3
+    prompts = ['Primeira pergunta', 'Segunda pergunta', 'Terceira pergunta']
+    responses = [prompts[0], prompts[0], prompts[1], prompts[1], prompts[2]]
+    openai_chat.chat.completions.create.side_effect = [
+        MagicMock(
+            choices=[
+                MagicMock(
+                    message=MagicMock(
+                        content=json.dumps({
+                            'prompt': prompt,
+                            'response': f'Resposta da {prompt.lower()}',
+                        })
+                    )
+                )
+            ]
+        )
+        for prompt in responses
+    ]
+    train_data_tool.deduplicator = NearDuplicateIndex()
+
+    await train_data_tool.create_examples(n_examples, 0.5, 100, 8, sender)
+
+    sent = [
+        args[0][0]['messages'][1]['content']
+        for args in sender.send.await_args_list
+    ]
+    assert sent == prompts
+    assert train_data_tool.deduplicator.rejected == len(responses) - n_examples
+
+
+@pytest.mark.trio()
+async def test_n_examples_counts_written_examples(train_data_tool, tmp_path):
+    train_data_tool.deduplicator = NearDuplicateIndex()
+    expected_examples = 1
+
+    output_file = await train_data_tool.create_train_data(
+        5, 1, resume=tmp_path / 'train.jsonl'
+    )
+
+    with open(output_file, encoding='utf-8') as file:
+        assert len(file.readlines()) == expected_examples
+    assert train_data_tool.n_examples == expected_examples
+
+
+@pytest.mark.trio()
+async def test_create_examples_with_context_selector(
+    train_data_tool, openai_chat
+):
+    sender = AsyncMock()
+    n_examples = 6
+    max_context_length = 2
+    train_data_tool.context_selector = MMRContextSelector
+
+    await train_data_tool.create_examples(
+        n_examples, 0.5, 100, max_context_length, sender
+    )
+
+    calls = openai_chat.chat.completions.create.call_args_list
+    last_messages = calls[-1].kwargs['messages']
+    assert len(last_messages) == 1 + max_context_length
+    assert json.loads(last_messages[-1]['content']) == {
+        'prompt': 'Test prompt',
+        'response': 'Test response',
+    }
+
+
+def test_plan_projects_tokens_without_api_calls(train_data_tool, openai_chat):
+    n_examples = 4
+    n_batch = 2
+    completion_tokens = 50
+    system_tokens = count_message_tokens([
+        {'role': 'system', 'content': train_data_tool._system_prompt()}
+    ])
+    expected_prompt_tokens = n_batch * (
+        system_tokens + system_tokens + completion_tokens + 4
+    )
+    expected_duration = 4
+
+    plan = train_data_tool.plan(
+        n_examples,
+        n_batch,
+        max_tokens=100,
+        completion_tokens=completion_tokens,
+        requests_per_minute=60,
+        prices=(1.0, 1.0),
+    )
+
+    assert plan.n_requests == n_examples
+    assert plan.prompt_tokens == expected_prompt_tokens
+    assert plan.completion_tokens == n_examples * completion_tokens
+    assert plan.total_tokens == (
+        expected_prompt_tokens + n_examples * completion_tokens
+    )
+    assert plan.cost == pytest.approx(plan.total_tokens / 1_000_000)
+    assert plan.min_duration == pytest.approx(expected_duration)
+    assert not openai_chat.chat.completions.create.called
+
+
+def test_plan_uses_rate_limiter_limits(train_data_tool):
+    train_data_tool.rate_limiter = RateLimiter(tokens_per_minute=1000)
+
+    plan = train_data_tool.plan(10, 2, max_tokens=100)
+
+    assert plan.min_duration == pytest.approx(
+        (plan.prompt_tokens + 10 * 100) / 1000 * 60
+    )
+
+
+@pytest.mark.trio()
+async def test_create_train_data_with_shards(train_data_tool, openai_chat):
+    n_examples = 6
+    train_data_tool.data = {
+        'data': [f'documento {i} do dataset' for i in range(12)]
+    }
+    train_data_tool.shard_max_tokens = 20
+
+    output_file = await train_data_tool.create_train_data(n_examples, 2)
+
+    calls = openai_chat.chat.completions.create.call_args_list
+    systems = {call.kwargs['messages'][0]['content'] for call in calls}
+    assert len(Path(output_file).read_text().splitlines()) == n_examples
+    assert train_data_tool.n_examples == n_examples
+    assert len(systems) > 1
+    assert all(
+        'documento 11' not in s or 'documento 0' not in s for s in systems
+    )
+    shutil.rmtree(Path().cwd() / 'data' / 'train')
+
+
+@pytest.fixture()
+def openai_batch(openai_chat):
+    requests = []
+
+    def upload(file, purpose):
+        requests.extend(json.loads(line) for line in file)
+        return MagicMock(id='file-input')
+
+    def results(file_id):
+        lines = [
+            json.dumps({
+                'custom_id': request['custom_id'],
+                'response': {
+                    'status_code': 200,
+                    'body': {
+                        'choices': [
+                            {
+                                'message': {
+                                    'content': json.dumps({
+                                        'prompt': f'Prompt {i}',
+                                        'response': f'Response {i}',
+                                    })
+                                }
+                            }
+                        ]
+                    },
+                },
+                'error': None,
+            })
+            for i, request in enumerate(requests)
+        ]
+        lines.append(
+            json.dumps({
+                'custom_id': 'failed',
+                'response': None,
+                'error': {'message': 'error'},
+            })
+        )
+        response = MagicMock()
+        response.__enter__.return_value.iter_lines.return_value = lines
+        return response
+
+    openai_chat.files.create.side_effect = upload
+    openai_chat.files.with_streaming_response.content.side_effect = results
+    openai_chat.batches.create.return_value = MagicMock(id='batch-id')
+    openai_chat.batches.retrieve.side_effect = [
+        MagicMock(status='in_progress'),
+        MagicMock(status='completed', output_file_id='file-output'),
+    ]
+    openai_chat.requests = requests
+    return openai_chat
+
+
+def test_execute_batch(train_data_tool, openai_batch):
+    n_examples = 4
+
+    output_file = train_data_tool.execute_batch(n_examples, poll_interval=0)
+
+    with open(output_file, 'r', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert len(openai_batch.requests) == n_examples
+    assert openai_batch.requests[0]['url'] == '/v1/chat/completions'
+    assert openai_batch.requests[0]['body']['model'] == train_data_tool.model
+    assert [line['messages'][1]['content'] for line in lines] == [
+        f'Prompt {i}' for i in range(n_examples)
+    ]
+    assert train_data_tool.batch_id == 'batch-id'
+    assert train_data_tool.n_examples == n_examples
+    assert not openai_batch.chat.completions.create.called
+    shutil.rmtree(Path().cwd() / 'data' / 'train')
+
+
+def test_execute_batch_without_output(train_data_tool, openai_batch):
+    openai_batch.batches.retrieve.side_effect = [
+        MagicMock(status='failed', output_file_id=None)
+    ]
+
+    with pytest.raises(RuntimeError, match='terminou sem resultados'):
+        train_data_tool.execute_batch(4, batch_id='batch-id')
+
+    assert not openai_batch.batches.create.called
+    shutil.rmtree(Path().cwd() / 'data' / 'train')
+
+
+def test_execute_batch_without_examples(train_data_tool, openai_batch):
+    output_file = train_data_tool.execute_batch(0, poll_interval=0)
+
+    assert Path(output_file).read_text(encoding='utf-8') == ''
+    assert not openai_batch.files.create.called
+    assert not openai_batch.batches.create.called
+    with pytest.raises(ValueError, match='maior que zero'):
+        train_data_tool.submit_batch(0)
+    shutil.rmtree(Path().cwd() / 'data' / 'train')
+
+
+@pytest.mark.trio()
+async def test_create_examples_with_samples_per_request(
+    train_data_tool, openai_chat
+):
+    sender = AsyncMock()
+    n_examples = 5
+    samples_per_request = 2
+    expected_requests = 3
+    result = openai_chat.chat.completions.create.return_value
+    result.choices = samples_per_request * result.choices
+    train_data_tool.samples_per_request = samples_per_request
+
+    await train_data_tool.create_examples(n_examples, 0.5, 100, 8, sender)
+
+    create = openai_chat.chat.completions.create
+    assert create.call_count == expected_requests
+    assert create.call_args.kwargs['n'] == samples_per_request
+    assert sender.send.await_count == n_examples
+
+
+def test_plan_with_samples_per_request(train_data_tool):
+    n_examples = 10
+    train_data_tool.samples_per_request = 5
+
+    plan = train_data_tool.plan(n_examples, 1, max_tokens=100)
+    single = train_data_tool.model_copy(update={'samples_per_request': 1})
+    single_plan = single.plan(n_examples, 1, max_tokens=100)
+
+    assert plan.n_examples == n_examples
+    assert plan.n_requests == n_examples / train_data_tool.samples_per_request
+    assert plan.completion_tokens == single_plan.completion_tokens
+    assert plan.prompt_tokens < single_plan.prompt_tokens
+
+
+@pytest.mark.trio()
+async def test_create_examples_repairs_malformed_output(
+    train_data_tool, openai_chat
+):
+    sender = AsyncMock()
+    n_examples = 2
+    contents = [
+        "```\n{'prompt': 'Primeira', 'response': 'Resposta'}\n```",
+        'Não consegui gerar o exemplo.',
+        '{"prompt": "Segunda", "response": "Resposta"}',
+    ]
+    openai_chat.chat.completions.create.side_effect = [
+        MagicMock(choices=[MagicMock(message=MagicMock(content=content))])
+        for content in contents
+    ]
+
+    await train_data_tool.create_examples(n_examples, 0.5, 100, 8, sender)
+
+    sent = [
+        args[0][0]['messages'][1]['content']
+        for args in sender.send.await_args_list
+    ]
+    assert sent == ['Primeira', 'Segunda']
+    assert train_data_tool.metrics == {
+        'request_start': len(contents),
+        'request_end': len(contents),
+        'parse_repair': 1,
+        'parse_failure': 1,
+        'retry': len(contents) - n_examples,
+    }
+
+
+def test_acreate_train_data_runs_on_asyncio(
+    valid_task, valid_data_dict, tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    client = FakeClient()
+    n_examples = 4
+    n_tools = 2
+    tools = [
+        TrainDataTool(client=client, data=valid_data_dict, task=valid_task)
+        for _ in range(n_tools)
+    ]
+
+    async def main():
+        return await asyncio.gather(
+            *(tool.acreate_train_data(n_examples, n_batch=2) for tool in tools)
+        )
+
+    files = asyncio.run(main())
+
+    for file in files:
+        with open(file, encoding='utf-8') as f:
+            assert len(f.readlines()) == n_examples
+    assert client.usage['requests'] == n_examples * n_tools